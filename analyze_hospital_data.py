@@ -5,28 +5,220 @@ Analyzes prescription data, inventory, and disease outbreaks in real-time
 """
 
 import pandas as pd
-import json
+import argparse
+import contextlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from data_sources import resolve_source
+
+from opd_aggregates import PrescriptionAggregates
+from outbreak_detection import COLUMNS as OUTBREAK_COLUMNS, WINDOW_DAYS, OutbreakDetector, backfill_start
+from prescription_partitions import PrescriptionPartitions
+from report_engine import DISEASE_ALERT_ICONS, build_report, iter_json_sections, render_json, render_text
+from report_snapshot import ReportSnapshot, day_over_day
+from report_writer import FORMATS as REPORT_FORMATS, report_path, write_report
+from stock_forecast import COLUMNS as FORECAST_COLUMNS, DEFAULT_WINDOW_DAYS as FORECAST_WINDOW_DAYS, StockForecaster
+
+# Rows per chunk when splitting the log into partitions without --chunksize
+PARTITION_CHUNK_ROWS = 100000
+
 class HospitalAnalytics:
     """Analyze hospital OPD data and generate insights"""
     
-    def __init__(self, data_path="d:\\Civil-Hosp-Data-Maintenance\\data"):
-        self.data_path = Path(data_path)
+    def __init__(self, data_path=None, chunksize=None, snapshot_path=None, detect_outbreaks=False):
+        # Directory(ies), SQLite database or Parquet dataset; see data_sources.resolve_source
+        self.source = resolve_source(data_path)
+        # When set, the prescription log is streamed in chunks of this many rows
+        self.chunksize = chunksize
+        # When set, closed days are read from this snapshot and only newer records are folded in
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        # When set, disease trends and alerts are computed from the case stream instead of read from the CSV
+        self.detect_outbreaks = detect_outbreaks
         self.load_data()
     
+    def iter_prescription_chunks(self, files=None, usecols=PrescriptionAggregates.COLUMNS):
+        """Yield the prescription log in fixed-size chunks (or whole files) across all files"""
+        if files is None and self.partitions is None:
+            if self.chunksize:
+                yield from self.source.iter_chunks('prescriptions', self.chunksize, usecols)
+            else:
+                yield self.source.read('prescriptions', usecols)
+            return
+        
+        for path in (self.partitions.files() if files is None else files):
+            reader = pd.read_csv(
+                path,
+                chunksize=self.chunksize,
+                usecols=(lambda column: column in usecols) if usecols else None
+            )
+            if self.chunksize:
+                yield from reader
+            else:
+                yield reader
+    
+    @property
+    def rx_stats(self):
+        """All-time prescription tallies, computed on first use"""
+        if self._rx_stats is None:
+            if self.snapshot_path is not None:
+                self._rx_stats = self._stats_from_snapshot()
+            elif self.prescriptions is not None:
+                self._rx_stats = PrescriptionAggregates.from_frame(self.prescriptions)
+            else:
+                self._rx_stats = PrescriptionAggregates.from_chunks(self.iter_prescription_chunks())
+        return self._rx_stats
+    
+    @property
+    def stock_forecast(self):
+        """Consumption-rate forecaster over the prescription log, built on first use"""
+        if self._forecast is None:
+            chunks = self._window_chunks(FORECAST_WINDOW_DAYS, FORECAST_COLUMNS)
+            # Current stock from medicine_inventory.csv; sources without it fall back to the
+            # Current_Stock and Reorder_Level columns of the inventory alert sheet
+            if self.source.exists('medicine_inventory'):
+                stock = self.source.read('medicine_inventory')
+            else:
+                stock = self.inventory
+            self._forecast = StockForecaster.from_history(chunks, stock, window_days=FORECAST_WINDOW_DAYS)
+        return self._forecast
+    
+    @property
+    def outbreaks(self):
+        """Sliding-window outbreak detector over the prescription log, backfilled on first use"""
+        if self._outbreaks is None:
+            self._outbreaks = OutbreakDetector.backfill(self._outbreak_chunks())
+        return self._outbreaks
+    
+    def _outbreak_chunks(self):
+        """Prescription chunks the outbreak window needs (only the last 30 days of partitions)"""
+        return self._window_chunks(WINDOW_DAYS, OUTBREAK_COLUMNS)
+    
+    def _window_chunks(self, window_days, usecols):
+        """Prescription chunks a window ending at the latest record needs; partitioned logs open only its partitions"""
+        if self.prescriptions is not None:
+            return [self.prescriptions]
+        if self.partitions is not None and self.partitions.partitions:
+            latest = max(entry['max_date'] for entry in self.partitions.partitions.values())
+            files = self.partitions.files_between(backfill_start(latest, window_days), None)
+            return self.iter_prescription_chunks(files=files, usecols=usecols)
+        return self.iter_prescription_chunks(usecols=usecols)
+    
+    def _stats_from_snapshot(self):
+        """Load the snapshot, fold in records since its watermark and save it again"""
+        today = pd.Timestamp.today().strftime('%Y-%m-%d')
+        snapshot = ReportSnapshot.load(self.snapshot_path) or ReportSnapshot()
+        log_path = self.source.path('prescriptions') if self.source.kind == 'local' else None
+        if self.partitions is None and log_path is not None:
+            # Only the tail of the flat log past the saved offset is read
+            new_records = snapshot.read_log(log_path, today, PrescriptionAggregates.COLUMNS)
+        else:
+            new_records = self.prescriptions_between(snapshot.watermark, None)
+        open_stats = snapshot.advance(new_records, today)
+        snapshot.save(self.snapshot_path)
+        self._snapshot = snapshot
+        return snapshot.totals.copy().merge(open_stats)
+    
+    def day_over_day(self):
+        """Today's prescription tallies compared with yesterday's"""
+        today = pd.Timestamp.today()
+        yesterday = (today - timedelta(days=1)).strftime('%Y-%m-%d')
+        current = PrescriptionAggregates.from_frame(self.today_prescriptions())
+        
+        self.rx_stats  # loads (and advances) the snapshot when one is configured
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.watermark == today.strftime('%Y-%m-%d'):
+            # The snapshot already holds every closed day, yesterday included
+            if snapshot.last_day_date == yesterday:
+                previous = snapshot.last_day
+            else:
+                previous = PrescriptionAggregates()
+        else:
+            previous = PrescriptionAggregates.from_frame(self.prescriptions_between(yesterday, yesterday))
+        
+        return {'previous_date': yesterday, **day_over_day(current, previous)}
+    
+    def prescriptions_between(self, start_date=None, end_date=None):
+        """
+        Prescriptions dated within [start_date, end_date] (ISO strings)
+        
+        With a partitioned log only the partitions overlapping the range are
+        opened, so the cost does not grow with the length of the history.
+        """
+        if self.partitions is not None:
+            return self.partitions.read_between(start_date, end_date)
+        
+        def in_range(frame):
+            dates = frame['Date'].astype(str)
+            mask = pd.Series(True, index=frame.index)
+            if start_date is not None:
+                mask &= dates >= str(start_date)
+            if end_date is not None:
+                mask &= dates <= str(end_date)
+            return frame[mask]
+        
+        if self.prescriptions is not None:
+            return in_range(self.prescriptions)
+        frames = [in_range(chunk) for chunk in self.iter_prescription_chunks(usecols=None)]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['Date'])
+    
+    def today_prescriptions(self):
+        """Today's prescriptions, fetched once per day and reused by every report"""
+        today = pd.Timestamp.today().strftime('%Y-%m-%d')
+        if self._today_rx is None or self._today_rx[0] != today:
+            self._today_rx = (today, self.prescriptions_between(today, today))
+        return self._today_rx[1]
+    
+    def write_partitions(self, granularity='month'):
+        """Split the flat prescription log into date partitions with a manifest"""
+        local_root = self.source.local_root()
+        if local_root is None:
+            raise ValueError(f"Partitions need a local data directory, not {self.source.describe()}")
+        chunks = self.source.iter_chunks('prescriptions', self.chunksize or PARTITION_CHUNK_ROWS)
+        self.partitions = PrescriptionPartitions.write(
+            chunks, local_root / "prescriptions", granularity, source_path=self.source.path('prescriptions')
+        )
+        return self.partitions
+    
+    def _open_partitions(self, local_root):
+        """The partitioned log, split again first if the flat log changed since it was written"""
+        partitions = PrescriptionPartitions.open(local_root / "prescriptions")
+        source_path = self.source.path('prescriptions')
+        if partitions is not None and source_path is not None and partitions.is_stale(source_path):
+            print(f"⚠ {source_path.name} changed since it was partitioned; repartitioning by {partitions.granularity}")
+            partitions = self.write_partitions(partitions.granularity)
+        return partitions
+    
     def load_data(self):
-        """Load all CSV files"""
+        """Load every table from the data source; a failure is reported and re-raised"""
+        self._rx_stats = None
+        self._snapshot = None
+        self._forecast = None
+        self._outbreaks = None
+        self._today_rx = None
+        self._report = None
         try:
-            self.patients = pd.read_csv(self.data_path / "opd_patients_100.csv")
-            self.prescriptions = pd.read_csv(self.data_path / "prescription_log_daily.csv")
-            self.inventory = pd.read_csv(self.data_path / "inventory_alerts.csv")
-            self.diseases = pd.read_csv(self.data_path / "disease_outbreak_30day.csv")
-            self.kpis = pd.read_csv(self.data_path / "kpi_dashboard.csv")
+            self.patients = self.source.read('patients')
+            local_root = self.source.local_root()
+            self.partitions = self._open_partitions(local_root) if local_root else None
+            if self.chunksize or self.partitions is not None or self.snapshot_path is not None:
+                # Streaming/partitioned mode: never hold the full log, tallies are built on demand
+                self.prescriptions = None
+            else:
+                self.prescriptions = self.source.read('prescriptions')
+            self.inventory = self.source.read('inventory')
+            self.diseases = self.source.read('diseases')
+            if self.detect_outbreaks:
+                self.diseases = self.outbreaks.summary(reference=self.diseases)
+            self.kpis = self.source.read('kpis')
             print("✓ All data loaded successfully")
         except Exception as e:
             print(f"✗ Error loading data: {e}")
+            # Callers (and batch workers) must see the real failure, not a half-loaded object
+            raise
     
     def generate_daily_report(self):
         """Generate daily operations report"""
@@ -36,7 +228,7 @@ class HospitalAnalytics:
         
         # Prescription summary
         today = pd.Timestamp.today().strftime('%Y-%m-%d')
-        today_rx = self.prescriptions[self.prescriptions['Date'] == today]
+        today_rx = self.today_prescriptions()
         print(f"\n📋 TODAY'S PRESCRIPTIONS ({today})")
         print(f"   Total: {len(today_rx)} patients")
         if len(today_rx) > 0:
@@ -65,9 +257,9 @@ class HospitalAnalytics:
         
         # Disease alerts
         print("\n🦠 DISEASE MONITORING")
-        alerts = self.diseases[self.diseases['Alert_Status'].isin(['Orange', 'Yellow'])]
+        alerts = self.diseases[self.diseases['Alert_Status'].isin(list(DISEASE_ALERT_ICONS))]
         for _, disease in alerts.iterrows():
-            status_icon = "🟠" if disease['Alert_Status'] == 'Orange' else "🟡"
+            status_icon = DISEASE_ALERT_ICONS[disease['Alert_Status']]
             print(f"   {status_icon} {disease['Disease_Name']}")
             print(f"      - Cases (30-day): {disease['Cases_Last_30Days']}")
             print(f"      - Daily avg: {disease['Daily_Average']:.2f}")
@@ -155,27 +347,41 @@ class HospitalAnalytics:
         print("="*60)
         
         print("\nTop Prescribed Medicines:")
-        top_meds = self.prescriptions['Prescribed_Medicine'].value_counts().head(5)
-        for med, count in top_meds.items():
+        top_meds = self.rx_stats.ranked(self.rx_stats.medicine, 5)
+        for med, count in top_meds:
             print(f"   - {med}: {count} prescriptions")
         
         print("\nSeverity Distribution:")
-        severity_dist = self.prescriptions['Severity'].value_counts()
-        for severity, count in severity_dist.items():
-            pct = (count / len(self.prescriptions)) * 100
+        severity_dist = self.rx_stats.ranked(self.rx_stats.severity)
+        for severity, count in severity_dist:
+            pct = (count / self.rx_stats.total) * 100
             print(f"   - {severity}: {count} ({pct:.1f}%)")
         
         print("\nTop Doctors by Workload:")
-        doc_load = self.prescriptions['Doctor_Name'].value_counts().head(5)
-        for doc, count in doc_load.items():
+        doc_load = self.rx_stats.ranked(self.rx_stats.doctor, 5)
+        for doc, count in doc_load:
             print(f"   - {doc}: {count} patients")
     
+    def report(self):
+        """Typed report with every metric, computed once in a single pass per dataset"""
+        if self._report is None:
+            self._report = build_report(self)
+        return self._report
+    
     def generate_report_json(self):
         """Generate JSON report for API/Dashboard"""
+        return render_json(self.report())
+    
+    def write_report_json(self, path, fmt='pretty', compress=None):
+        """Stream the JSON report to path section by section (pretty, compact or NDJSON, optionally gzipped)"""
+        return write_report(iter_json_sections(self.report()), path, fmt=fmt, compress=compress)
+    
+    def _scan_report_json(self):
+        """JSON report built with one mask per metric (kept for timing comparisons)"""
         report = {
             'timestamp': datetime.now().isoformat(),
             'summary': {
-                'total_patients_today': len(self.prescriptions[self.prescriptions['Date'] == pd.Timestamp.today().strftime('%Y-%m-%d')]),
+                'total_patients_today': len(self.today_prescriptions()),
                 'medicines_safe': len(self.inventory[self.inventory['Alert_Color'] == 'Green']),
                 'medicines_warning': len(self.inventory[self.inventory['Alert_Color'] == 'Yellow']),
                 'medicines_critical': len(self.inventory[self.inventory['Alert_Color'] == 'Red']),
@@ -192,28 +398,220 @@ class HospitalAnalytics:
     
     def generate_full_report(self):
         """Generate complete analysis report"""
-        self.generate_daily_report()
-        self.analyze_stock_prediction()
-        self.analyze_disease_patterns()
-        self.prescription_insights()
-        self.generate_kpi_summary()
+        print(render_text(self.report()))
+    
+    def compare_report_timings(self, repeat=5):
+        """
+        Time the per-section scanning path against the single-pass engine
         
-        print("\n" + "="*60)
-        print("END OF REPORT")
-        print("="*60)
+        Returns:
+            Dictionary with the best-of-repeat seconds for each path
+        """
+        def best_of(run):
+            timings = []
+            for _ in range(repeat):
+                self._report = None
+                self._today_rx = None
+                start = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+        
+        def scanning_path():
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                self.generate_daily_report()
+                self.analyze_stock_prediction()
+                self.analyze_disease_patterns()
+                self.prescription_insights()
+                self.generate_kpi_summary()
+            self._scan_report_json()
+        
+        def engine_path():
+            report = build_report(self)
+            render_text(report)
+            render_json(report)
+        
+        return {'scanning': best_of(scanning_path), 'engine': best_of(engine_path)}
+
+
+def facility_names(facilities):
+    """Report names for facility directories, qualified by parent directory when names clash"""
+    paths = [Path(facility).resolve() for facility in facilities]
+    names = [path.name for path in paths]
+    return [
+        f"{path.parent.name}_{path.name}" if names.count(path.name) > 1 else path.name
+        for path in paths
+    ]
+
+
+def run_facility_report(data_path, output_dir, chunksize=None, facility=None, report_format='pretty',
+                        compress=False):
+    """
+    Generate one facility's text and JSON reports (runs inside a worker process)
+    
+    Returns:
+        Dictionary with the facility's summary counts and mergeable prescription tallies
+    """
+    facility = facility or Path(data_path).name
+    output_dir = Path(output_dir)
+    
+    with open(output_dir / f"{facility}_report.txt", 'w', encoding='utf-8') as out:
+        with contextlib.redirect_stdout(out):
+            analytics = HospitalAnalytics(data_path, chunksize=chunksize)
+            analytics.generate_full_report()
+    
+    analytics.write_report_json(
+        output_dir / report_path(f"{facility}_report", report_format, compress), report_format, compress
+    )
+    
+    report = analytics.generate_report_json()
+    return {
+        'facility': facility,
+        'summary': report['summary'],
+        'kpi_status': report['kpi_status'],
+        'rx_stats': analytics.rx_stats,
+        'stock_forecast': analytics.stock_forecast,
+    }
+
+
+def merge_network_summary(results):
+    """Combine per-facility aggregates into a network-wide summary without rereading raw data"""
+    rx_stats = PrescriptionAggregates()
+    forecast = StockForecaster()
+    summary = {}
+    kpi_status = {}
+    for result in results:
+        rx_stats.merge(result['rx_stats'])
+        forecast.merge(result['stock_forecast'])
+        for key, value in result['summary'].items():
+            summary[key] = summary.get(key, 0) + value
+        for key, value in result['kpi_status'].items():
+            kpi_status[key] = kpi_status.get(key, 0) + value
+    
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'facilities': sorted(result['facility'] for result in results),
+        'summary': summary,
+        'kpi_status': kpi_status,
+        'prescriptions': {
+            'total': rx_stats.total,
+            'top_medicines': dict(rx_stats.ranked(rx_stats.medicine, 10)),
+            'top_diseases': dict(rx_stats.ranked(rx_stats.disease, 10)),
+            'severity_distribution': dict(rx_stats.ranked(rx_stats.severity)),
+            'top_doctors': dict(rx_stats.ranked(rx_stats.doctor, 10)),
+        },
+        'stock_forecast': forecast.forecast().to_dict('records'),
+        'per_facility': {
+            result['facility']: {**result['summary'], 'prescriptions': result['rx_stats'].total}
+            for result in results
+        },
+    }
+
+
+def run_batch(facilities, output_dir, workers=None, chunksize=None, report_format='pretty', compress=False):
+    """Generate every facility's reports in a process pool, then the merged network summary"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    workers = workers or min(len(facilities), os.cpu_count() or 1)
+    
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(run_facility_report, facility, output_dir, chunksize, name, report_format, compress): facility
+            for facility, name in zip(facilities, facility_names(facilities))
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+                results.append(result)
+                print(f"✓ {result['facility']}: report written")
+            except Exception as e:
+                print(f"✗ {futures[future]}: {e}")
+    
+    network = merge_network_summary(results)
+    network_path = write_report(
+        network.items(), output_dir / report_path("network_summary", report_format, compress), report_format, compress
+    )
+    print(f"\n✓ Network summary saved: {network_path}")
+    return network
 
 
 def main():
     """Run analysis"""
+    parser = argparse.ArgumentParser(description="Civil Hospital OPD data analysis")
+    parser.add_argument(
+        "--data-path",
+        help="OPD data location: directories (separated by the OS path separator), a SQLite "
+             "database or a Parquet directory (default: $OPD_DATA_SOURCE, then data/ and the repo root)"
+    )
+    parser.add_argument(
+        "--chunksize", type=int,
+        help="Stream the prescription log in chunks of this many rows (flat memory for large logs)"
+    )
+    parser.add_argument(
+        "--write-partitions", choices=['month', 'day'],
+        help="Split prescription_log_daily.csv into date partitions under prescriptions/ and exit"
+    )
+    parser.add_argument(
+        "--facilities", nargs='+', metavar="DATA_DIR",
+        help="Batch mode: generate reports for each facility data directory in parallel"
+    )
+    parser.add_argument("--workers", type=int, help="Worker processes for batch mode (default: CPU count)")
+    parser.add_argument("--output-dir", default="reports", help="Where batch mode writes its reports")
+    parser.add_argument(
+        "--snapshot", metavar="PATH",
+        help="Keep closed days' tallies in this snapshot file and only fold in newer records"
+    )
+    parser.add_argument(
+        "--detect-outbreaks", action="store_true",
+        help="Compute disease trends and alerts from the prescription log instead of disease_outbreak_30day.csv"
+    )
+    parser.add_argument(
+        "--report-format", choices=REPORT_FORMATS, default='pretty',
+        help="JSON report layout: indented, compact, or one JSON object per line (default: pretty)"
+    )
+    parser.add_argument("--gzip", action="store_true", help="Gzip the JSON reports")
+    parser.add_argument(
+        "--compare-timings", action="store_true",
+        help="Time the per-section scanning report path against the single-pass engine and exit"
+    )
+    args = parser.parse_args()
+    
+    if args.facilities:
+        run_batch(
+            args.facilities, args.output_dir, workers=args.workers, chunksize=args.chunksize,
+            report_format=args.report_format, compress=args.gzip
+        )
+        return
+    
     try:
-        analytics = HospitalAnalytics()
+        options = {
+            'data_path': args.data_path,
+            'chunksize': args.chunksize,
+            'snapshot_path': args.snapshot,
+            'detect_outbreaks': args.detect_outbreaks,
+        }
+        analytics = HospitalAnalytics(**options)
+        
+        if args.write_partitions:
+            partitions = analytics.write_partitions(args.write_partitions)
+            print(f"✓ Wrote {len(partitions.partitions)} {args.write_partitions} partitions to {partitions.root}")
+            return
+        
+        if args.compare_timings:
+            timings = analytics.compare_report_timings()
+            print(f"Per-section scans: {timings['scanning'] * 1000:.2f} ms")
+            print(f"Single-pass engine: {timings['engine'] * 1000:.2f} ms")
+            print(f"Speedup: {timings['scanning'] / timings['engine']:.1f}x")
+            return
+        
         analytics.generate_full_report()
         
         # Save JSON report
-        report = analytics.generate_report_json()
-        with open('hospital_analysis_report.json', 'w') as f:
-            json.dump(report, f, indent=2, default=str)
-        print("\n✓ JSON report saved: hospital_analysis_report.json")
+        path = analytics.write_report_json(
+            report_path('hospital_analysis_report', args.report_format, args.gzip), args.report_format, args.gzip
+        )
+        print(f"\n✓ JSON report saved: {path}")
         
     except Exception as e:
         print(f"✗ Error: {e}")
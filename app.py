@@ -1,171 +1,8 @@
 import streamlit as st
-import pandas as pd
-import json
-from datetime import datetime, timedelta
-import plotly.express as px
-import plotly.graph_objects as go
-from pathlib import Path
-import numpy as np
 
-# ============= HEALTH RISK PREDICTION FUNCTIONS =============
-def calculate_bmi(weight_kg, height_cm):
-    """Calculate BMI from weight and height"""
-    height_m = height_cm / 100
-    return weight_kg / (height_m ** 2)
-
-def predict_health_risks(age, weight, height, systolic_bp, diastolic_bp, cholesterol, glucose, exercise_freq, smoking, diet_quality):
-    """
-    Predict health risks based on user metrics using rule-based and simple ML logic
-    Returns: dict with risk scores (0-100) for different conditions
-    """
-    
-    # Calculate BMI
-    bmi = calculate_bmi(weight, height)
-    
-    # Initialize risk scores
-    risks = {
-        'Diabetes': 0,
-        'Heart_Disease': 0,
-        'Hypertension': 0,
-        'High_Cholesterol': 0
-    }
-    
-    # ===== DIABETES RISK =====
-    # Base risk from age
-    risks['Diabetes'] += min(age * 0.5, 30)
-    
-    # BMI factor: overweight/obese increases risk
-    if bmi >= 30:
-        risks['Diabetes'] += 35
-    elif bmi >= 25:
-        risks['Diabetes'] += 20
-    
-    # Glucose factor: fasting glucose > 100 indicates prediabetes
-    if glucose >= 126:
-        risks['Diabetes'] += 40
-    elif glucose >= 100:
-        risks['Diabetes'] += 25
-    
-    # Exercise reduces risk
-    exercise_map = {'Rarely': 0, '1x/week': 5, '2x/week': 10, '3x/week': 15, '4x/week': 20, '5x/week': 25}
-    risks['Diabetes'] -= exercise_map.get(exercise_freq, 0)
-    
-    # ===== HYPERTENSION RISK =====
-    # Blood pressure is primary factor
-    if systolic_bp >= 180 or diastolic_bp >= 120:
-        risks['Hypertension'] = 85
-    elif systolic_bp >= 160 or diastolic_bp >= 100:
-        risks['Hypertension'] = 70
-    elif systolic_bp >= 140 or diastolic_bp >= 90:
-        risks['Hypertension'] = 55
-    elif systolic_bp >= 130 or diastolic_bp >= 80:
-        risks['Hypertension'] = 35
-    else:
-        risks['Hypertension'] = 15
-    
-    # Age and BMI contribute
-    risks['Hypertension'] += min(age * 0.3, 20)
-    if bmi >= 30:
-        risks['Hypertension'] += 15
-    
-    # ===== HEART DISEASE RISK =====
-    # Multiple factors
-    risks['Heart_Disease'] += min(age * 0.6, 35)
-    
-    # Blood pressure is significant
-    if systolic_bp >= 140 or diastolic_bp >= 90:
-        risks['Heart_Disease'] += 25
-    
-    # BMI factor
-    if bmi >= 30:
-        risks['Heart_Disease'] += 20
-    elif bmi >= 25:
-        risks['Heart_Disease'] += 10
-    
-    # Cholesterol factor
-    if cholesterol >= 240:
-        risks['Heart_Disease'] += 30
-    elif cholesterol >= 200:
-        risks['Heart_Disease'] += 15
-    
-    # Smoking significantly increases risk
-    if smoking.lower() == 'yes':
-        risks['Heart_Disease'] += 40
-    elif smoking.lower() == 'former':
-        risks['Heart_Disease'] += 20
-    
-    # Exercise reduces risk
-    exercise_reduction = exercise_map.get(exercise_freq, 0)
-    risks['Heart_Disease'] -= min(exercise_reduction, 20)
-    
-    # ===== HIGH CHOLESTEROL RISK =====
-    # Direct cholesterol measurement
-    if cholesterol >= 240:
-        risks['High_Cholesterol'] = 80
-    elif cholesterol >= 200:
-        risks['High_Cholesterol'] = 55
-    elif cholesterol >= 180:
-        risks['High_Cholesterol'] = 35
-    else:
-        risks['High_Cholesterol'] = 15
-    
-    # BMI and exercise affect cholesterol
-    if bmi >= 30:
-        risks['High_Cholesterol'] += 15
-    risks['High_Cholesterol'] -= exercise_map.get(exercise_freq, 0)
-    
-    # Diet quality factor
-    diet_map = {'Poor': 15, 'Fair': 10, 'Good': 0, 'Excellent': -5}
-    risks['High_Cholesterol'] += diet_map.get(diet_quality, 0)
-    
-    # Cap all risks at 100
-    for condition in risks:
-        risks[condition] = max(0, min(100, round(risks[condition])))
-    
-    return risks
-
-def get_risk_level(risk_score):
-    """Categorize risk level"""
-    if risk_score >= 70:
-        return "🔴 HIGH"
-    elif risk_score >= 40:
-        return "🟡 MODERATE"
-    else:
-        return "🟢 LOW"
-
-def generate_recommendations(risks, age, bmi, systolic_bp, cholesterol, glucose, smoking, exercise_freq):
-    """Generate personalized recommendations based on risk scores"""
-    recommendations = {}
-    
-    if risks['Diabetes'] >= 70:
-        recommendations['Diabetes'] = "⚠️ HIGH RISK: Consult endocrinologist, monitor blood glucose daily, reduce refined carbs, increase physical activity to 30+ min/day"
-    elif risks['Diabetes'] >= 40:
-        recommendations['Diabetes'] = "🟡 MODERATE RISK: Get blood glucose test, reduce sugar intake, exercise 150 min/week, maintain healthy BMI"
-    else:
-        recommendations['Diabetes'] = "🟢 LOW RISK: Maintain current lifestyle, annual diabetes screening"
-    
-    if risks['Heart_Disease'] >= 70:
-        recommendations['Heart_Disease'] = "⚠️ HIGH RISK: Schedule cardiology consultation, monitor BP daily, reduce sodium, limit saturated fats, consider medication"
-    elif risks['Heart_Disease'] >= 40:
-        recommendations['Heart_Disease'] = "🟡 MODERATE RISK: Increase aerobic exercise, reduce red meat, manage stress, monthly BP checks"
-    else:
-        recommendations['Heart_Disease'] = "🟢 LOW RISK: Continue healthy habits, annual cardiac screening"
-    
-    if risks['Hypertension'] >= 70:
-        recommendations['Hypertension'] = "⚠️ HIGH RISK: Immediate BP monitoring, consult cardiologist, reduce salt to <2g/day, limit alcohol, daily exercise"
-    elif risks['Hypertension'] >= 40:
-        recommendations['Hypertension'] = "🟡 MODERATE RISK: Weekly BP monitoring, reduce salt, increase potassium-rich foods, reduce caffeine"
-    else:
-        recommendations['Hypertension'] = "🟢 LOW RISK: Monthly BP checks, maintain current salt intake"
-    
-    if risks['High_Cholesterol'] >= 70:
-        recommendations['High_Cholesterol'] = "⚠️ HIGH RISK: Consult lipidologist, consider statin therapy, increase fiber (oats, beans), reduce fried foods"
-    elif risks['High_Cholesterol'] >= 40:
-        recommendations['High_Cholesterol'] = "🟡 MODERATE RISK: Increase soluble fiber, reduce saturated fats, increase exercise, retest in 3 months"
-    else:
-        recommendations['High_Cholesterol'] = "🟢 LOW RISK: Maintain healthy diet, annual cholesterol screening"
-    
-    return recommendations
+from opd_data import TableSet
+from startup_timing import timed_import
+from views import PAGES
 
 # Set page configuration
 st.set_page_config(
@@ -433,29 +270,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Load data
-@st.cache_data
-def load_data():
-    data_path = Path("data")
-    files = {
-        'patients': pd.read_csv("opd_patients_100.csv"),
-        'prescriptions': pd.read_csv(data_path / "prescription_log_daily.csv"),
-        'inventory': pd.read_csv(data_path / "inventory_alerts.csv"),
-        'diseases': pd.read_csv(data_path / "disease_outbreak_30day.csv"),
-        'kpis': pd.read_csv(data_path / "kpi_dashboard.csv"),
-        'doctors': pd.read_csv(data_path / "doctor_reference.csv"),
-        'medicines': pd.read_csv(data_path / "medicine_reference.csv"),
-        'diseases_ref': pd.read_csv(data_path / "disease_reference.csv"),
-        'severity_ref': pd.read_csv(data_path / "severity_reference.csv"),
-    }
-    return files
-
-try:
-    data = load_data()
-except Exception as e:
-    st.error(f"Error loading data: {e}")
-    st.stop()
-
 # Sidebar Navigation
 st.sidebar.markdown("""
 <div style="text-align: center; margin-bottom: 15px;">
@@ -477,15 +291,7 @@ st.sidebar.divider()
 
 page = st.sidebar.radio(
     "Navigate to:",
-    [
-        "📊 Dashboard",
-        "➕ Data Entry",
-        "📦 Inventory",
-        "🦠 Disease Monitor",
-        "🏥 Health Risk Assessment",
-        "📈 Analytics",
-        "⚙️ Settings"
-    ]
+    list(PAGES)
 )
 
 st.sidebar.divider()
@@ -496,863 +302,20 @@ st.sidebar.info("""
 **Medicines**: 8 types
 """)
 
-# ============= PAGE 1: DASHBOARD =============
-if page == "📊 Dashboard":
-    # Medical Logo
-    st.markdown("""
-    <div style="text-align: center; margin-bottom: 20px;">
-        <svg width="120" height="120" viewBox="0 0 200 200" xmlns="http://www.w3.org/2000/svg">
-            <!-- Outer Circle -->
-            <circle cx="100" cy="100" r="95" fill="#f0f9ff" stroke="#667eea" stroke-width="3"/>
-            
-            <!-- Inner Decorative Circle -->
-            <circle cx="100" cy="100" r="85" fill="none" stroke="#764ba2" stroke-width="2" opacity="0.3"/>
-            
-            <!-- Medical Cross - Main -->
-            <g id="medical-cross">
-                <!-- Vertical Bar -->
-                <rect x="85" y="55" width="30" height="90" fill="#667eea" rx="5"/>
-                <!-- Horizontal Bar -->
-                <rect x="55" y="85" width="90" height="30" fill="#667eea" rx="5"/>
-            </g>
-            
-            <!-- Heartbeat Pattern -->
-            <g id="heartbeat" opacity="0.2">
-                <line x1="140" y1="130" x2="155" y2="130" stroke="#ff6b6b" stroke-width="2" stroke-linecap="round"/>
-                <polyline points="155,130 165,115 175,140 185,130" fill="none" stroke="#ff6b6b" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
-            </g>
-            
-            <!-- Pulse Dots -->
-            <circle cx="50" cy="100" r="3" fill="#764ba2" opacity="0.4"/>
-            <circle cx="150" cy="100" r="3" fill="#764ba2" opacity="0.4"/>
-            <circle cx="100" cy="50" r="3" fill="#764ba2" opacity="0.4"/>
-            <circle cx="100" cy="150" r="3" fill="#764ba2" opacity="0.4"/>
-        </svg>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    st.title("🏥 Hospital OPD Dashboard")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.markdown("""
-        <div class="metric-card" style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);">
-        <p style="margin: 0; color: rgba(255,255,255,0.9); font-size: 14px;">👥 Total Patients</p>
-        <p style="margin: 10px 0 0 0; color: white; font-size: 28px; font-weight: 800;">100</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
-        <div class="metric-card" style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);">
-        <p style="margin: 0; color: rgba(255,255,255,0.9); font-size: 14px;">💊 Medicines</p>
-        <p style="margin: 10px 0 0 0; color: white; font-size: 28px; font-weight: 800;">8</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown("""
-        <div class="metric-card" style="background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);">
-        <p style="margin: 0; color: rgba(255,255,255,0.9); font-size: 14px;">👨‍⚕️ Doctors</p>
-        <p style="margin: 10px 0 0 0; color: white; font-size: 28px; font-weight: 800;">6</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        st.markdown("""
-        <div class="metric-card" style="background: linear-gradient(135deg, #43e97b 0%, #38f9d7 100%);">
-        <p style="margin: 0; color: rgba(255,255,255,0.9); font-size: 14px;">🦠 Diseases</p>
-        <p style="margin: 10px 0 0 0; color: white; font-size: 28px; font-weight: 800;">8</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    st.divider()
-    
-    # Summary Cards
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown("""
-        <div class="alert-success">
-        <h3>✅ SAFE MEDICINES</h3>
-        <p class="stat-number">7</p>
-        <p class="desc-text">All medicines above reorder level</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
-        <div class="alert-warning">
-        <h3>⚠️ MONITOR</h3>
-        <p class="stat-number">1</p>
-        <p class="desc-text">ORS + Zinc: 31 days remaining</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown("""
-        <div class="alert-danger">
-        <h3>🚨 ALERTS</h3>
-        <p class="stat-number">3</p>
-        <p class="desc-text">Disease outbreaks being monitored</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    st.divider()
-    
-    # Key Metrics
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("📦 Inventory Status")
-        inv_summary = data['inventory'][['Medicine_Name', 'Alert_Color', 'Days_to_Stockout']].copy()
-        
-        color_map = {'Green': '🟢', 'Yellow': '🟡', 'Red': '🔴'}
-        inv_summary['Status'] = inv_summary['Alert_Color'].map(color_map) + ' ' + inv_summary['Alert_Color']
-        
-        for _, row in inv_summary.iterrows():
-            col_a, col_b, col_c = st.columns([2, 1, 1])
-            with col_a:
-                st.text(row['Medicine_Name'])
-            with col_b:
-                st.text(row['Status'])
-            with col_c:
-                st.text(f"{row['Days_to_Stockout']:.0f}d")
-    
-    with col2:
-        st.subheader("🦠 Disease Alerts")
-        disease_alerts = data['diseases'][['Disease_Name', 'Alert_Status', 'Cases_Last_30Days']].copy()
-        disease_alerts = disease_alerts[disease_alerts['Alert_Status'].isin(['Orange', 'Yellow', 'Green'])].head(5)
-        
-        alert_map = {'Orange': '🟠', 'Yellow': '🟡', 'Green': '🟢'}
-        disease_alerts['Icon'] = disease_alerts['Alert_Status'].map(alert_map)
-        
-        for _, row in disease_alerts.iterrows():
-            col_a, col_b, col_c = st.columns([2, 1, 1])
-            with col_a:
-                st.text(row['Disease_Name'])
-            with col_b:
-                st.text(f"{row['Icon']} {row['Alert_Status']}")
-            with col_c:
-                st.text(f"{row['Cases_Last_30Days']} cases")
-    
-    st.divider()
-    
-    # Charts
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("📊 Severity Distribution")
-        severity_counts = data['patients']['Severity'].value_counts()
-        fig = px.pie(
-            values=severity_counts.values,
-            names=severity_counts.index,
-            color_discrete_map={'Mild': '#00d084', 'Moderate': '#ff9500', 'Severe': '#ff3838', 'Critical': '#d63031'},
-            title="Patient Severity Distribution"
-        )
-        fig.update_traces(textposition='inside', textinfo='percent+label', marker=dict(line=dict(color='white', width=2)))
-        fig.update_layout(font=dict(size=12, color='white'), paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with col2:
-        st.subheader("🏥 Top Diseases")
-        top_diseases = data['patients']['Disease'].value_counts().head(6)
-        fig = px.bar(
-            x=top_diseases.values,
-            y=top_diseases.index,
-            orientation='h',
-            title="Top 6 Diseases",
-            labels={'x': 'Cases', 'y': 'Disease'},
-            color=top_diseases.values,
-            color_continuous_scale=['#ff3838', '#ff6b35', '#ff9500', '#ffc107', '#00d084', '#00a652']
-        )
-        fig.update_traces(marker=dict(line=dict(color='white', width=2)))
-        fig.update_layout(
-            font=dict(size=12),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            showlegend=False,
-            xaxis=dict(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)'),
-            yaxis=dict(showgrid=False)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+# Load only what the selected page declares, then hand off to its module
+spec = PAGES[page]
 
-# ============= PAGE 2: DATA ENTRY =============
-elif page == "➕ Data Entry":
-    st.title("➕ Patient Data Entry")
-    st.info("Fast & efficient patient registration system (< 2 minutes per patient)")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("1️⃣ Patient Information")
-        cnic = st.text_input("CNIC", placeholder="30161-3658505-6")
-        age = st.number_input("Age", min_value=0, max_value=120, value=30)
-        gender = st.selectbox("Gender", ["M", "F"])
-    
-    with col2:
-        st.subheader("2️⃣ Clinical Information")
-        disease_code = st.selectbox(
-            "Disease Code",
-            data['diseases_ref']['Disease_Code'].values,
-            format_func=lambda x: f"{x} - {data['diseases_ref'][data['diseases_ref']['Disease_Code']==x]['Disease_Name'].values[0] if len(data['diseases_ref'][data['diseases_ref']['Disease_Code']==x]) > 0 else 'Unknown'}"
-        )
-        
-        # Get disease details
-        disease_info = data['diseases_ref'][data['diseases_ref']['Disease_Code'] == disease_code]
-        if len(disease_info) > 0:
-            disease_name = disease_info.iloc[0]['Disease_Name']
-            best_medicine = disease_info.iloc[0]['Most_Effective_Medicine']
-            st.success(f"✓ Disease: {disease_name}")
-            st.info(f"💊 Recommended Medicine: {best_medicine}")
-    
-    st.divider()
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.subheader("3️⃣ Severity")
-        severity_map = {
-            'M': 'Mild (Green)',
-            'MOD': 'Moderate (Yellow)',
-            'SEV': 'Severe (Orange)',
-            'CRI': 'Critical (Red)'
-        }
-        severity = st.selectbox(
-            "Severity Level",
-            ["M", "MOD", "SEV", "CRI"],
-            format_func=lambda x: f"{x} - {severity_map[x]}"
-        )
-    
-    with col2:
-        st.subheader("4️⃣ Medicine")
-        medicine = st.selectbox("Select Medicine", data['medicines']['Medicine_Name'].values)
-        
-        # Get medicine details
-        med_info = data['medicines'][data['medicines']['Medicine_Name'] == medicine]
-        if len(med_info) > 0:
-            st.text(f"Dosage: {med_info.iloc[0]['Standard_Dosage']}")
-    
-    with col3:
-        st.subheader("5️⃣ Quantity")
-        quantity = st.number_input("Quantity", min_value=1, value=1)
-    
-    st.divider()
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("6️⃣ Doctor Assignment")
-        doctor = st.selectbox("Assign Doctor", data['doctors']['Doctor_Name'].values)
-        doctor_spec = data['doctors'][data['doctors']['Doctor_Name'] == doctor].iloc[0]['Specialization']
-        st.text(f"Specialty: {doctor_spec}")
-    
-    with col2:
-        st.subheader("7️⃣ Additional Notes")
-        notes = st.text_area("Notes (optional)", height=80)
-    
-    st.divider()
-    
-    # Save Button
-    col1, col2, col3 = st.columns([1, 1, 2])
-    
-    with col1:
-        if st.button("✅ SAVE", use_container_width=True):
-            # Validate
-            if not cnic or len(cnic) < 10:
-                st.error("❌ Invalid CNIC")
-            elif not age or age < 0 or age > 120:
-                st.error("❌ Invalid Age")
-            else:
-                st.success("✅ Patient registered successfully!")
-                st.balloons()
-                
-                # Show summary
-                st.json({
-                    "CNIC": cnic,
-                    "Age": age,
-                    "Gender": gender,
-                    "Disease": disease_name,
-                    "Medicine": medicine,
-                    "Severity": severity,
-                    "Doctor": doctor,
-                    "Timestamp": datetime.now().isoformat()
-                })
-    
-    with col2:
-        if st.button("🔄 RESET", use_container_width=True):
-            st.rerun()
-
-# ============= PAGE 3: INVENTORY =============
-elif page == "📦 Inventory":
-    st.title("📦 Inventory Management")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    green_count = len(data['inventory'][data['inventory']['Alert_Color'] == 'Green'])
-    yellow_count = len(data['inventory'][data['inventory']['Alert_Color'] == 'Yellow'])
-    red_count = len(data['inventory'][data['inventory']['Alert_Color'] == 'Red'])
-    
-    with col1:
-        st.metric("🟢 Safe", green_count)
-    with col2:
-        st.metric("🟡 Caution", yellow_count)
-    with col3:
-        st.metric("🔴 Critical", red_count)
-    with col4:
-        st.metric("📊 Total", len(data['inventory']))
-    
-    st.divider()
-    
-    # Detailed Inventory Table
-    st.subheader("Detailed Inventory Status")
-    
-    inv_display = data['inventory'][['Medicine_Name', 'Current_Stock', 'Days_to_Stockout', 'Alert_Color', 'Action_Required']].copy()
-    inv_display['Status'] = inv_display['Alert_Color'].map({'Green': '🟢', 'Yellow': '🟡', 'Red': '🔴'})
-    inv_display = inv_display[['Status', 'Medicine_Name', 'Current_Stock', 'Days_to_Stockout', 'Action_Required']]
-    inv_display.columns = ['Status', 'Medicine', 'Stock', 'Days Left', 'Action']
-    
-    st.dataframe(inv_display, use_container_width=True, hide_index=True)
-    
-    st.divider()
-    
-    # Stock Predictions
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("⚠️ Medicines Needing Orders")
-        to_order = data['inventory'][data['inventory']['Alert_Color'].isin(['Yellow', 'Red'])]
-        for _, row in to_order.iterrows():
-            color_icon = "🟡" if row['Alert_Color'] == 'Yellow' else "🔴"
-            st.markdown(f"""
-            {color_icon} **{row['Medicine_Name']}**
-            - Current: {row['Current_Stock']} units
-            - Days left: {row['Days_to_Stockout']:.0f}
-            - Order: {row['Recommended_Order_Qty']} units
-            - {row['Action_Required']}
-            """)
-    
-    with col2:
-        st.subheader("📈 Stock Trend")
-        stock_data = data['inventory'][['Medicine_Name', 'Days_to_Stockout']].sort_values('Days_to_Stockout')
-        fig = px.bar(
-            x=stock_data['Days_to_Stockout'],
-            y=stock_data['Medicine_Name'],
-            orientation='h',
-            title="Days Until Stockout",
-            labels={'x': 'Days', 'y': 'Medicine'},
-            color=stock_data['Days_to_Stockout'],
-            color_continuous_scale=['red', 'yellow', 'green']
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-# ============= PAGE 4: DISEASE MONITOR =============
-elif page == "🦠 Disease Monitor":
-    st.title("🦠 Disease Outbreak Monitoring (30-Day)")
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        green_d = len(data['diseases'][data['diseases']['Alert_Status'] == 'Green'])
-        st.metric("🟢 Normal", green_d)
-    
-    with col2:
-        yellow_d = len(data['diseases'][data['diseases']['Alert_Status'].isin(['Yellow', 'Orange'])])
-        st.metric("⚠️ Alert", yellow_d)
-    
-    with col3:
-        total_cases = data['diseases']['Cases_Last_30Days'].sum()
-        st.metric("🦠 Total Cases", total_cases)
-    
-    st.divider()
-    
-    # Disease Summary
-    st.subheader("Disease Status Summary")
-    
-    disease_display = data['diseases'][['Disease_Name', 'Cases_Last_30Days', 'Daily_Average', 'Trend', 'Alert_Status']].copy()
-    disease_display['Status_Icon'] = disease_display['Alert_Status'].map({
-        'Green': '🟢', 'Yellow': '🟡', 'Orange': '🟠', 'Red': '🔴'
-    })
-    disease_display = disease_display[['Status_Icon', 'Disease_Name', 'Cases_Last_30Days', 'Daily_Average', 'Trend']]
-    disease_display.columns = ['Alert', 'Disease', 'Cases (30d)', 'Daily Avg', 'Trend']
-    
-    st.dataframe(disease_display, use_container_width=True, hide_index=True)
-    
-    st.divider()
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("🚨 HIGH ALERT DISEASES")
-        alerts = data['diseases'][data['diseases']['Alert_Status'].isin(['Orange', 'Red'])]
-        if len(alerts) > 0:
-            for _, row in alerts.iterrows():
-                st.markdown(f"""
-                🟠 **{row['Disease_Name']}**
-                - Cases: {row['Cases_Last_30Days']} (Daily avg: {row['Daily_Average']:.2f})
-                - Severity: {row['Severity_Distribution']}
-                - Trend: {row['Trend']}
-                - Most affected: {row['Most_Affected_Age']}
-                """)
-        else:
-            st.success("✓ No high alert diseases")
-    
-    with col2:
-        st.subheader("📊 Disease Cases (30-Day)")
-        disease_chart_data = data['diseases'].nlargest(8, 'Cases_Last_30Days')
-        fig = px.bar(
-            x=disease_chart_data['Cases_Last_30Days'],
-            y=disease_chart_data['Disease_Name'],
-            orientation='h',
-            title="Top Diseases by Case Count",
-            labels={'x': 'Cases', 'y': 'Disease'}
-        )
-        st.plotly_chart(fig, use_container_width=True)
+for library in spec.libraries:
+    timed_import(library)
+page_module = timed_import(spec.module)
 
-# ============= PAGE 7: ANALYTICS =============
-elif page == "📈 Analytics":
-    st.title("📈 Analytics & Performance")
-    
-    st.subheader("KPI Dashboard")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.metric("👥 Patients/Day", "3.3", "-33% vs target")
-    
-    with col2:
-        st.metric("✅ Prescription Accuracy", "97%", "-2% vs target")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.metric("📦 Stock Availability", "87.5%", "-8% vs target")
-    
-    with col2:
-        st.metric("⏱️ Avg Wait Time", "22 min", "+7 min vs target")
-    
-    st.divider()
-    
-    # KPI Detailed Table
-    st.subheader("All KPIs")
-    
-    kpi_display = data['kpis'][['KPI_Name', 'Current_Value', 'Target_Value', 'Status', 'Alert_Level']].copy()
-    kpi_display['Status_Icon'] = kpi_display['Alert_Level'].map({
-        'Green': '🟢', 'Yellow': '🟡', 'Red': '🔴'
-    })
-    kpi_display = kpi_display[['Status_Icon', 'KPI_Name', 'Current_Value', 'Target_Value']]
-    kpi_display.columns = ['Status', 'KPI', 'Current', 'Target']
-    
-    st.dataframe(kpi_display, use_container_width=True, hide_index=True)
-    
-    st.divider()
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("Disease Severity Distribution")
-        severity_data = data['patients']['Severity'].value_counts()
-        fig = px.pie(
-            values=severity_data.values,
-            names=severity_data.index,
-            title="Patient Severity Breakdown",
-            color_discrete_map={'Mild': '#28a745', 'Moderate': '#ffc107', 'Severe': '#fd7e14', 'Critical': '#dc3545'}
-        )
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with col2:
-        st.subheader("Top Prescribed Medicines")
-        med_data = data['patients']['Prescribed_Medicine'].value_counts().head(8)
-        fig = px.bar(
-            x=med_data.values,
-            y=med_data.index,
-            orientation='h',
-            title="Most Prescribed Medicines",
-            labels={'x': 'Count', 'y': 'Medicine'}
-        )
-        st.plotly_chart(fig, use_container_width=True)
-    
-    st.divider()
-    
-    st.subheader("Doctor Performance")
-    doctor_stats = pd.DataFrame()
-    for doctor in data['doctors']['Doctor_Name'].values:
-        count = len(data['patients'][data['patients'].get('Doctor_Name', '') == doctor] if 'Doctor_Name' in data['patients'].columns else [])
-        if count == 0:
-            count = data['prescriptions'][data['prescriptions']['Doctor_Name'] == doctor].shape[0]
-        doctor_stats = pd.concat([
-            doctor_stats,
-            pd.DataFrame({'Doctor': [doctor], 'Patients': [count]})
-        ], ignore_index=True)
-    
-    fig = px.bar(
-        x=doctor_stats['Doctor'],
-        y=doctor_stats['Patients'],
-        title="Patients per Doctor",
-        labels={'Doctor': 'Doctor Name', 'Patients': 'Number of Patients'}
-    )
-    st.plotly_chart(fig, use_container_width=True)
-
-# ============= PAGE 6: HEALTH RISK ASSESSMENT =============
-elif page == "🏥 Health Risk Assessment":
-    # Medical Logo
-    st.markdown("""
-    <div style="text-align: center; margin-bottom: 20px;">
-        <svg width="100" height="100" viewBox="0 0 200 200" xmlns="http://www.w3.org/2000/svg">
-            <circle cx="100" cy="100" r="95" fill="#f0f9ff" stroke="#667eea" stroke-width="3"/>
-            <circle cx="100" cy="100" r="85" fill="none" stroke="#764ba2" stroke-width="2" opacity="0.3"/>
-            <rect x="85" y="55" width="30" height="90" fill="#667eea" rx="5"/>
-            <rect x="55" y="85" width="90" height="30" fill="#667eea" rx="5"/>
-            <g id="heartbeat" opacity="0.2">
-                <line x1="140" y1="130" x2="155" y2="130" stroke="#ff6b6b" stroke-width="2" stroke-linecap="round"/>
-                <polyline points="155,130 165,115 175,140 185,130" fill="none" stroke="#ff6b6b" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
-            </g>
-            <circle cx="50" cy="100" r="3" fill="#764ba2" opacity="0.4"/>
-            <circle cx="150" cy="100" r="3" fill="#764ba2" opacity="0.4"/>
-            <circle cx="100" cy="50" r="3" fill="#764ba2" opacity="0.4"/>
-            <circle cx="100" cy="150" r="3" fill="#764ba2" opacity="0.4"/>
-        </svg>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    st.title("🏥 Health Risk Assessment & Analysis")
-    st.info("HealthNexus AI: Comprehensive health risk prediction and personalized recommendations")
-    
-    # Load existing assessments
-    assessments_path = Path("data") / "health_risk_assessments.csv"
-    if assessments_path.exists():
-        assessments = pd.read_csv(assessments_path)
-    else:
-        assessments = pd.DataFrame()
-    
-    # Navigation tabs
-    tab1, tab2, tab3 = st.tabs(["📝 New Assessment", "📊 Assessment History", "📈 Risk Trends"])
-    
-    # ===== TAB 1: NEW ASSESSMENT =====
-    with tab1:
-        st.markdown("""
-        <div class="input-card">
-        <h3 style="color: #667eea; margin-top: 0;">👤 Patient Information</h3>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            patient_id = st.text_input("Patient ID", "P" + str(len(assessments) + 1).zfill(3))
-            age = st.number_input("Age (years)", 18, 100, 45)
-        with col2:
-            cnic = st.text_input("CNIC", "12345678901234")
-            weight = st.number_input("Weight (kg)", 30.0, 200.0, 75.0)
-        with col3:
-            doctor = st.selectbox("Assigned Doctor", data['doctors']['Doctor_Name'].values if 'doctors' in data else ["Dr. Ahmed"])
-            height = st.number_input("Height (cm)", 100.0, 220.0, 170.0)
-        
-        st.divider()
-        
-        st.markdown("""
-        <div class="input-card">
-        <h3 style="color: #667eea; margin-top: 0;">🩺 Vital Signs</h3>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            systolic = st.number_input("Systolic BP (mmHg)", 80, 220, 120)
-        with col2:
-            diastolic = st.number_input("Diastolic BP (mmHg)", 40, 140, 80)
-        with col3:
-            cholesterol = st.number_input("Cholesterol (mg/dL)", 100, 400, 200)
-        with col4:
-            glucose = st.number_input("Fasting Glucose (mg/dL)", 50, 250, 100)
-        
-        st.divider()
-        
-        st.markdown("""
-        <div class="input-card">
-        <h3 style="color: #667eea; margin-top: 0;">🏃 Lifestyle Factors</h3>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            exercise = st.selectbox("Exercise Frequency", ["Rarely", "1x/week", "2x/week", "3x/week", "4x/week", "5x/week"])
-        with col2:
-            smoking = st.selectbox("Smoking Status", ["No", "Yes", "Former"])
-        with col3:
-            diet = st.selectbox("Diet Quality", ["Poor", "Fair", "Good", "Excellent"])
-        with col4:
-            alcohol = st.selectbox("Alcohol Consumption", ["None", "Light", "Moderate", "Heavy"])
-        
-        st.divider()
-        
-        # Calculate risks
-        if st.button("🔍 Analyze Health Risks", use_container_width=True, type="primary"):
-            bmi = calculate_bmi(weight, height)
-            risks = predict_health_risks(age, weight, height, systolic, diastolic, cholesterol, glucose, exercise, smoking, diet)
-            recommendations = generate_recommendations(risks, age, bmi, systolic, cholesterol, glucose, smoking, exercise)
-            
-            # Display Risk Scores
-            st.subheader("📊 Risk Assessment Results")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("#### Individual Risk Scores")
-                
-                for condition, score in risks.items():
-                    condition_display = condition.replace('_', ' ')
-                    risk_level = get_risk_level(score)
-                    
-                    # Determine which risk box class to use
-                    if score >= 70:
-                        box_class = "risk-box-high"
-                        icon = "🔴"
-                    elif score >= 40:
-                        box_class = "risk-box-moderate"
-                        icon = "🟡"
-                    else:
-                        box_class = "risk-box-low"
-                        icon = "🟢"
-                    
-                    st.markdown(f"""
-                    <div class="{box_class}">
-                    <strong>{icon} {condition_display}</strong><br/>
-                    Risk Score: <strong style="font-size: 20px;">{score}%</strong> | {risk_level}
-                    </div>
-                    """, unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown("#### Overall Assessment")
-                avg_risk = sum(risks.values()) / len(risks)
-                overall_level = get_risk_level(avg_risk)
-                
-                st.markdown(f"""
-                <div class="assessment-result" style="text-align: center;">
-                <h2 style="color: #667eea; margin-bottom: 15px;">📊 Average Risk Score</h2>
-                <h1 style="font-size: 52px; margin: 15px 0; color: #764ba2;">{avg_risk:.1f}%</h1>
-                <h3 style="color: #667eea; font-size: 20px;">{overall_level}</h3>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            st.divider()
-            
-            # Recommendations
-            st.subheader("💡 Personalized Recommendations")
-            
-            for condition, recommendation in recommendations.items():
-                condition_display = condition.replace('_', ' ')
-                st.markdown(f"""
-                <div class="recommendation-box">
-                <strong style="font-size: 16px; color: #0066ff;">💊 {condition_display}</strong><br/>
-                <span style="color: #333; font-size: 14px; line-height: 1.6;">{recommendation}</span>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            st.divider()
-            
-            # Save Assessment
-            st.subheader("💾 Save Assessment")
-            
-            if st.button("Save Assessment to Database", use_container_width=True):
-                new_assessment = {
-                    'Assessment_ID': f"A{str(len(assessments) + 1).zfill(3)}",
-                    'Date': datetime.now().strftime("%Y-%m-%d"),
-                    'Patient_ID': patient_id,
-                    'CNIC': cnic,
-                    'Age': age,
-                    'Weight_kg': weight,
-                    'Height_cm': height,
-                    'BMI': round(bmi, 2),
-                    'Systolic_BP': systolic,
-                    'Diastolic_BP': diastolic,
-                    'Cholesterol_mg_dL': cholesterol,
-                    'Glucose_mg_dL': glucose,
-                    'Exercise_Frequency': exercise,
-                    'Smoking_Status': smoking,
-                    'Diet_Quality': diet,
-                    'Alcohol_Consumption': alcohol,
-                    'Diabetes_Risk': risks['Diabetes'],
-                    'Heart_Disease_Risk': risks['Heart_Disease'],
-                    'Hypertension_Risk': risks['Hypertension'],
-                    'Cholesterol_Risk': risks['High_Cholesterol'],
-                    'Overall_Risk_Level': overall_level.replace('🔴', '').replace('🟡', '').replace('🟢', '').strip(),
-                    'Primary_Recommendation': list(recommendations.values())[0],
-                    'Secondary_Recommendation': list(recommendations.values())[1] if len(recommendations) > 1 else "",
-                    'Doctor_Name': doctor,
-                    'Status': 'Complete'
-                }
-                
-                new_df = pd.DataFrame([new_assessment])
-                if assessments_path.exists():
-                    existing = pd.read_csv(assessments_path)
-                    combined = pd.concat([existing, new_df], ignore_index=True)
-                else:
-                    combined = new_df
-                
-                combined.to_csv(assessments_path, index=False)
-                st.success("✅ Assessment saved successfully!")
-                st.balloons()
-    
-    # ===== TAB 2: ASSESSMENT HISTORY =====
-    with tab2:
-        st.markdown("""
-        <div class="info-card-light">
-        <h3 style="color: #667eea; margin-top: 0;">📋 Patient Assessment History</h3>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        if len(assessments) > 0:
-            # Display options
-            col1, col2 = st.columns(2)
-            with col1:
-                display_cols = st.multiselect(
-                    "Select columns to display",
-                    ['Patient_ID', 'Date', 'Age', 'BMI', 'Diabetes_Risk', 'Heart_Disease_Risk', 'Hypertension_Risk', 'Cholesterol_Risk', 'Overall_Risk_Level'],
-                    default=['Patient_ID', 'Date', 'Diabetes_Risk', 'Heart_Disease_Risk', 'Hypertension_Risk', 'Overall_Risk_Level']
-                )
-            with col2:
-                risk_filter = st.selectbox("Filter by Risk Level", ["All", "🟢 LOW", "🟡 MODERATE", "🔴 HIGH"])
-            
-            # Filter data
-            filtered = assessments.copy()
-            if risk_filter != "All":
-                filtered = filtered[filtered['Overall_Risk_Level'].str.contains(risk_filter.split()[0], na=False)]
-            
-            st.dataframe(filtered[display_cols], use_container_width=True, hide_index=True)
-            
-            # Export button
-            csv = filtered.to_csv(index=False)
-            st.download_button(
-                label="📥 Download Assessment History",
-                data=csv,
-                file_name="health_risk_assessments.csv",
-                mime="text/csv"
-            )
-        else:
-            st.info("No assessments recorded yet. Create one in the 'New Assessment' tab.")
-    
-    # ===== TAB 3: RISK TRENDS =====
-    with tab3:
-        st.markdown("""
-        <div class="info-card-light">
-        <h3 style="color: #667eea; margin-top: 0;">📈 Risk Score Trends Over Time</h3>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        if len(assessments) > 0 and 'Date' in assessments.columns:
-            assessments['Date'] = pd.to_datetime(assessments['Date'])
-            assessments = assessments.sort_values('Date')
-            
-            # Select patient for trend analysis
-            patient_list = assessments['Patient_ID'].unique()
-            selected_patient = st.selectbox("Select Patient for Trend Analysis", patient_list)
-            
-            patient_data = assessments[assessments['Patient_ID'] == selected_patient]
-            
-            if len(patient_data) > 0:
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    # Risk trend chart
-                    fig = go.Figure()
-                    
-                    for condition in ['Diabetes_Risk', 'Heart_Disease_Risk', 'Hypertension_Risk', 'Cholesterol_Risk']:
-                        condition_name = condition.replace('_Risk', '').replace('_', ' ')
-                        fig.add_trace(go.Scatter(
-                            x=patient_data['Date'],
-                            y=patient_data[condition],
-                            name=condition_name,
-                            mode='lines+markers'
-                        ))
-                    
-                    fig.update_layout(
-                        title=f"Risk Score Trends - {selected_patient}",
-                        xaxis_title="Date",
-                        yaxis_title="Risk Score (%)",
-                        hovermode='x unified',
-                        height=400
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                with col2:
-                    # Metrics comparison
-                    st.markdown("""
-                    <div class="info-card-light">
-                    <h4 style="color: #667eea; margin: 0;">📊 Latest Assessment Metrics</h4>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    latest = patient_data.iloc[-1]
-                    
-                    metrics_cols = st.columns(4)
-                    with metrics_cols[0]:
-                        st.metric("Diabetes", f"{latest['Diabetes_Risk']:.0f}%")
-                    with metrics_cols[1]:
-                        st.metric("Heart Disease", f"{latest['Heart_Disease_Risk']:.0f}%")
-                    with metrics_cols[2]:
-                        st.metric("Hypertension", f"{latest['Hypertension_Risk']:.0f}%")
-                    with metrics_cols[3]:
-                        st.metric("Cholesterol", f"{latest['Cholesterol_Risk']:.0f}%")
-        else:
-            st.info("No trend data available. Create multiple assessments for a patient to see trends.")
+try:
+    data = TableSet(spec.datasets)
+except Exception as e:
+    st.error(f"Error loading data: {e}")
+    st.stop()
 
-# ============= PAGE 8: SETTINGS =============
-elif page == "⚙️ Settings":
-    st.title("⚙️ System Settings")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("📊 System Information")
-        st.info(f"""
-        **System Status**: ✅ Active
-        **Database**: Loaded
-        **Last Sync**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-        **Version**: 1.0
-        **Environment**: Production
-        """)
-    
-    with col2:
-        st.subheader("📈 Data Statistics")
-        st.info(f"""
-        **Total Patients**: {len(data['patients'])}
-        **Total Medicines**: {len(data['medicines'])}
-        **Total Doctors**: {len(data['doctors'])}
-        **Prescription Records**: {len(data['prescriptions'])}
-        **Disease Types**: {len(data['diseases'])}
-        """)
-    
-    st.divider()
-    
-    st.subheader("🔐 Data Management")
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        if st.button("📥 Reload Data", use_container_width=True):
-            st.cache_data.clear()
-            st.success("✅ Data reloaded")
-            st.rerun()
-    
-    with col2:
-        if st.button("📄 Export Report", use_container_width=True):
-            st.success("✅ Report exported")
-    
-    with col3:
-        if st.button("📋 View Logs", use_container_width=True):
-            st.info("✓ Logs displayed below")
-    
-    st.divider()
-    
-    st.subheader("📝 Application Logs")
-    logs = f"""
-    [2026-02-12 10:30:00] System started
-    [2026-02-12 10:30:05] Data loaded successfully
-    [2026-02-12 10:30:10] Dashboard initialized
-    [2026-02-12 10:30:15] All modules ready
-    [2026-02-12] ✓ System operational
-    """
-    st.code(logs, language="text")
+page_module.render(data)
 
 # Footer
 st.divider()
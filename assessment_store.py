@@ -0,0 +1,257 @@
+"""
+Indexed assessment store
+Health risk assessments stay in their CSV file, mirrored into an in-memory
+SQLite table with indexes so history filters, paging and exports never have to
+touch the whole frame
+"""
+import io
+import sqlite3
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+TABLE = "assessments"
+
+# (index name, indexed expression) - risk level compares case-insensitively
+INDEXES = [
+    ("idx_assessments_risk_level", "Overall_Risk_Level COLLATE NOCASE"),
+    ("idx_assessments_date", "Date"),
+    ("idx_assessments_doctor", "Doctor_Name"),
+    ("idx_assessments_patient", "Patient_ID, Date"),
+]
+
+LOAD_CHUNK_ROWS = 10000
+
+# Declared SQLite types of the numeric assessment columns; every other column
+# (IDs, CNIC, dates, categories, free text) is TEXT
+COLUMN_TYPES = {
+    'Age': "INTEGER",
+    'Weight_kg': "REAL",
+    'Height_cm': "REAL",
+    'BMI': "REAL",
+    'Systolic_BP': "INTEGER",
+    'Diastolic_BP': "INTEGER",
+    'Cholesterol_mg_dL': "INTEGER",
+    'Glucose_mg_dL': "INTEGER",
+    'Diabetes_Risk': "INTEGER",
+    'Heart_Disease_Risk': "INTEGER",
+    'Hypertension_Risk': "INTEGER",
+    'Cholesterol_Risk': "INTEGER",
+}
+
+
+def column_type(column):
+    return COLUMN_TYPES.get(column, "TEXT")
+
+
+def _sql_types(columns):
+    """to_sql dtype mapping, so the table is created with the declared types whatever the first rows hold"""
+    return {column: column_type(column) for column in columns}
+
+
+class AssessmentStore:
+    """Paged, filtered access to health risk assessments"""
+
+    def __init__(self, csv_path):
+        self.csv_path = Path(csv_path)
+        self.columns = []
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Mirror the CSV into SQLite chunk by chunk, then build the indexes"""
+        if self.csv_path.exists():
+            header = pd.read_csv(self.csv_path, nrows=0).columns
+            text = {column: str for column in header if column_type(column) == "TEXT"}
+            for chunk in pd.read_csv(self.csv_path, chunksize=LOAD_CHUNK_ROWS, dtype=text):
+                if not self.columns:
+                    self.columns = list(chunk.columns)
+                chunk.to_sql(TABLE, self._conn, if_exists="append", index=False, dtype=_sql_types(self.columns))
+
+        if self.columns:
+            self._create_indexes()
+
+    def _create_indexes(self):
+        for name, expression in INDEXES:
+            if expression.split()[0].rstrip(',') not in self.columns:
+                continue
+            self._conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {TABLE} ({expression})')
+        self._conn.commit()
+
+    @staticmethod
+    def _where(risk_level=None, start_date=None, end_date=None, doctor=None, patient_id=None):
+        """Build a WHERE clause that the indexes above can serve"""
+        clauses, params = [], []
+        if risk_level:
+            clauses.append("Overall_Risk_Level = ? COLLATE NOCASE")
+            params.append(risk_level)
+        if start_date:
+            clauses.append("Date >= ?")
+            params.append(str(start_date))
+        if end_date:
+            clauses.append("Date <= ?")
+            params.append(str(end_date))
+        if doctor:
+            clauses.append("Doctor_Name = ?")
+            params.append(doctor)
+        if patient_id:
+            clauses.append("Patient_ID = ?")
+            params.append(patient_id)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def _select(self, columns):
+        selected = [c for c in (columns or self.columns) if c in self.columns]
+        return ", ".join(f'"{c}"' for c in selected) or "*"
+
+    def count(self, **filters):
+        """Number of assessments matching the filters"""
+        if not self.columns:
+            return 0
+        where, params = self._where(**filters)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {TABLE}{where}", params).fetchone()[0]
+
+    def query_page(self, page=1, page_size=50, columns=None, **filters):
+        """
+        Fetch one page of matching assessments, newest first
+
+        Returns:
+            DataFrame with at most page_size rows
+        """
+        if not self.columns:
+            return pd.DataFrame(columns=columns or [])
+        where, params = self._where(**filters)
+        sql = (
+            f"SELECT {self._select(columns)} FROM {TABLE}{where} "
+            f"ORDER BY Date DESC, rowid DESC LIMIT ? OFFSET ?"
+        )
+        offset = max(page - 1, 0) * page_size
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params + [page_size, offset])
+
+    def distinct(self, column):
+        """Sorted distinct values of an indexed column"""
+        if column not in self.columns:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT DISTINCT "{column}" FROM {TABLE} WHERE "{column}" IS NOT NULL ORDER BY 1'
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def search_patients(self, prefix="", limit=20):
+        """Patient IDs starting with prefix, served from the Patient_ID index"""
+        if 'Patient_ID' not in self.columns:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT Patient_ID FROM {TABLE} "
+                f"WHERE Patient_ID >= ? AND Patient_ID < ? ORDER BY Patient_ID LIMIT ?",
+                (prefix, prefix + "\U0010ffff", limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def patient_series(self, patient_id, columns=None):
+        """One patient's assessments in date order, read straight off the (Patient_ID, Date) index"""
+        if 'Patient_ID' not in self.columns:
+            return pd.DataFrame(columns=columns or [])
+        sql = (
+            f"SELECT {self._select(columns)} FROM {TABLE} "
+            f"WHERE Patient_ID = ? ORDER BY Date, rowid"
+        )
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=[str(patient_id)])
+
+    def iter_chunks(self, chunk_size=5000, columns=None, **filters):
+        """
+        Yield matching assessments as DataFrames of at most chunk_size rows, in date order
+
+        Each page is read under the lock by keyset (Date, rowid) and yielded
+        after the lock is released, so a consumer that stops early (or never
+        finishes) can't leave the store locked
+        """
+        if not self.columns:
+            return
+        where, params = self._where(**filters)
+        where = where[len(" WHERE "):] if where else "1"
+        if 'Date' in self.columns:
+            # NULL dates sort first, and are paged by rowid alone
+            phases = [("Date IS NULL", ("rowid",)), ("Date IS NOT NULL", ("Date", "rowid"))]
+        else:
+            phases = [("1", ("rowid",))]
+
+        for condition, key in phases:
+            aliases = [f"_page_key{i}" for i in range(len(key))]
+            keys = ", ".join(f"{column} AS {alias}" for column, alias in zip(key, aliases))
+            order = ", ".join(key)
+            last = None
+            while True:
+                sql = f"SELECT {keys}, {self._select(columns)} FROM {TABLE} WHERE ({where}) AND {condition}"
+                page_params = list(params)
+                if last is not None:
+                    sql += f" AND ({order}) > ({', '.join('?' * len(key))})"
+                    page_params += last
+                sql += f" ORDER BY {order} LIMIT ?"
+                with self._lock:
+                    page = pd.read_sql_query(sql, self._conn, params=page_params + [chunk_size])
+                if page.empty:
+                    break
+                last = [page[alias].tolist()[-1] for alias in aliases]
+                yield page.drop(columns=aliases)
+                if len(page) < chunk_size:
+                    break
+
+    def _arrow_schema(self, columns=None):
+        """Arrow schema of the declared column types, shared by every exported chunk"""
+        import pyarrow as pa
+
+        types = {"INTEGER": pa.int64(), "REAL": pa.float64(), "TEXT": pa.string()}
+        selected = [c for c in (columns or self.columns) if c in self.columns]
+        return pa.schema([(c, types[column_type(c)]) for c in selected])
+
+    def export(self, fmt="csv", chunk_size=5000, **filters):
+        """
+        Serialize matching assessments chunk by chunk
+
+        Args:
+            fmt: 'csv' or 'parquet' (parquet needs pyarrow)
+
+        Returns:
+            bytes of the exported file
+        """
+        buffer = io.BytesIO()
+        if fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            # Fixed up front: a column that is all null in one chunk keeps its type
+            schema = self._arrow_schema()
+            with pq.ParquetWriter(buffer, schema) as writer:
+                for chunk in self.iter_chunks(chunk_size, **filters):
+                    writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        else:
+            header = True
+            for chunk in self.iter_chunks(chunk_size, **filters):
+                buffer.write(chunk.to_csv(index=False, header=header).encode("utf-8"))
+                header = False
+            if header:
+                buffer.write((",".join(self.columns) + "\n").encode("utf-8"))
+        return buffer.getvalue()
+
+    def append(self, record):
+        """Append one assessment to the CSV file and the index"""
+        first_row = not self.columns
+        if first_row:
+            self.columns = list(record)
+        row = pd.DataFrame([record]).reindex(columns=self.columns)
+
+        with self._lock:
+            write_header = not self.csv_path.exists()
+            row.to_csv(self.csv_path, mode="a", header=write_header, index=False)
+            row.to_sql(TABLE, self._conn, if_exists="append", index=False, dtype=_sql_types(self.columns))
+            if first_row:
+                self._create_indexes()
+            self._conn.commit()
@@ -0,0 +1,225 @@
+"""
+Admission control
+Requests are admitted through lanes by endpoint class: reads, writes (which
+queue behind SQLite's single writer) and long-running batch uploads. Each lane
+runs a bounded number of requests at once and lets a bounded number wait for a
+slot; a request that finds the queue full, or waits longer than the queue
+timeout, gets an immediate 503 with Retry-After instead of timing out with
+everyone else. Lanes don't share slots, so a burst of writes can't starve
+reads, and /health and /metrics bypass admission entirely.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from config import settings
+from fast_json import dumps
+from metrics import Histogram
+
+# Never queued or rejected: liveness checks, scrapes, docs and the profiler controls
+EXEMPT_PATHS = ("/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json")
+EXEMPT_PREFIXES = ("/admin/", "/docs/")
+
+# Held for the whole upload, so they get their own small lane
+BATCH_ROUTES = (("POST", "/get-predictions/stream"), ("POST", "/jobs/bulk-import"))
+# Scores without touching the database, so it is admitted with the reads
+READ_ROUTES = (("POST", "/get-predictions"),)
+
+READ_METHODS = ("GET", "HEAD")
+
+# Seconds; admitted requests mostly wait zero, rejected ones up to the queue timeout
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Rejected(Exception):
+    """No slot in the lane: the queue is full or the wait timed out"""
+
+    def __init__(self, lane: str, reason: str):
+        super().__init__(f"{lane} lane {reason}")
+        self.lane = lane
+        self.reason = reason
+
+
+def lane_for(method: str, path: str) -> Optional[str]:
+    """'read', 'write' or 'batch' for a request; None if it bypasses admission"""
+    if path in EXEMPT_PATHS or path.startswith(EXEMPT_PREFIXES) or method == "OPTIONS":
+        return None
+    path = path.rstrip("/") or "/"
+    if (method, path) in BATCH_ROUTES:
+        return "batch"
+    if method in READ_METHODS or (method, path) in READ_ROUTES:
+        return "read"
+    return "write"
+
+
+class AdmissionLane:
+    """
+    At most limit requests in flight and queue_size waiting, first come first served
+
+    Lives on the event loop (no locks): a finishing request hands its slot
+    directly to the oldest waiter
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {"queue_full": 0, "timeout": 0}
+        self._waiters: deque = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> float:
+        """
+        Wait for a slot
+
+        Returns:
+            Seconds spent queued
+
+        Raises:
+            Rejected: queue full, or no slot within the timeout
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return 0.0
+        if len(self._waiters) >= self.queue_size:
+            self.rejected["queue_full"] += 1
+            raise Rejected(self.name, "queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done():
+                # Handed a slot just as the wait ended: pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected["timeout"] += 1
+            raise Rejected(self.name, "timeout")
+        self.admitted += 1
+        return time.perf_counter() - start
+
+    def release(self):
+        """Give the slot to the oldest waiter, or free it"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+class AdmissionController:
+    """The lanes of one process and their metrics"""
+
+    def __init__(self, enabled: bool, limits: Dict[str, int], queue_sizes: Dict[str, int],
+                 timeout: float, retry_after: float):
+        self.enabled = enabled
+        self.retry_after = retry_after
+        self.lanes = {
+            name: AdmissionLane(name, limits[name], queue_sizes[name], timeout) for name in limits
+        }
+        self.waits = Histogram(
+            "healthnexus_admission_wait_seconds",
+            "Time admitted requests spent queued for a slot, by lane",
+            ("lane",), WAIT_BUCKETS
+        )
+
+    def render(self) -> str:
+        """Prometheus text exposition of the lanes"""
+        lanes = sorted(self.lanes.values(), key=lambda lane: lane.name)
+        lines: List[str] = []
+        for name, kind, documentation, value in (
+            ("healthnexus_admission_in_flight", "gauge", "Requests holding a slot, by lane",
+             lambda lane: lane.in_flight),
+            ("healthnexus_admission_queued", "gauge", "Requests waiting for a slot, by lane",
+             lambda lane: lane.queued),
+            ("healthnexus_admission_limit", "gauge", "Slots per lane",
+             lambda lane: lane.limit),
+            ("healthnexus_admission_admitted_total", "counter", "Requests admitted, by lane",
+             lambda lane: lane.admitted),
+        ):
+            lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+            lines += [f'{name}{{lane="{lane.name}"}} {value(lane)}' for lane in lanes]
+        name = "healthnexus_admission_rejected_total"
+        lines += [f"# HELP {name} Requests answered 503 without running, by lane and reason",
+                  f"# TYPE {name} counter"]
+        lines += [
+            f'{name}{{lane="{lane.name}",reason="{reason}"}} {count}'
+            for lane in lanes for reason, count in sorted(lane.rejected.items())
+        ]
+        return "\n".join(lines + self.waits.render()) + "\n"
+
+
+class AdmissionMiddleware:
+    """ASGI middleware holding a lane slot for the whole request, or answering 503"""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        name = lane_for(scope["method"], scope["path"])
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        lane = self.controller.lanes[name]
+        try:
+            waited = await lane.acquire()
+        except Rejected as e:
+            await self._reject(send, e)
+            return
+        self.controller.waits.observe((name,), waited)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.release()
+
+    async def _reject(self, send, rejection: Rejected):
+        body = dumps({"detail": f"Server busy ({rejection.lane} requests); retry later"})
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(self.controller.retry_after)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# Singleton instance
+admission_controller = AdmissionController(
+    enabled=settings.ADMISSION_ENABLED,
+    limits={
+        "read": settings.ADMISSION_READ_LIMIT,
+        "write": settings.ADMISSION_WRITE_LIMIT,
+        "batch": settings.ADMISSION_BATCH_LIMIT,
+    },
+    queue_sizes={
+        "read": settings.ADMISSION_READ_QUEUE,
+        "write": settings.ADMISSION_WRITE_QUEUE,
+        "batch": settings.ADMISSION_BATCH_QUEUE,
+    },
+    timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+    retry_after=settings.ADMISSION_RETRY_AFTER,
+)
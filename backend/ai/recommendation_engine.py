@@ -4,6 +4,9 @@ Generates personalized health advice based on risk predictions
 """
 from typing import Dict
 from validators import get_risk_category
+from fast_json import dumps
+
+NO_RECOMMENDATION = "No specific recommendations available."
 
 
 class RecommendationEngine:
@@ -12,6 +15,16 @@ class RecommendationEngine:
     def __init__(self):
         """Initialize recommendation templates"""
         self.templates = self._load_templates()
+        # Joined advice text and its JSON encoding per condition and risk level, built once
+        self.advice = {
+            condition: {level: " ".join(actions) for level, actions in levels.items()}
+            for condition, levels in self.templates.items()
+        }
+        self._fragments = {
+            condition: {level: dumps(text) for level, text in levels.items()}
+            for condition, levels in self.advice.items()
+        }
+        self._no_recommendation = dumps(NO_RECOMMENDATION)
     
     def _load_templates(self) -> Dict:
         """Load recommendation templates for different conditions and risk levels"""
@@ -104,16 +117,29 @@ class RecommendationEngine:
         recommendations = {}
         
         for condition, score in risk_scores.items():
-            risk_level = get_risk_category(score)
-            
-            if condition in self.templates:
-                advice_list = self.templates[condition][risk_level]
-                recommendations[condition] = " ".join(advice_list)
+            if condition in self.advice:
+                recommendations[condition] = self.advice[condition][get_risk_category(score)]
             else:
-                recommendations[condition] = "No specific recommendations available."
+                recommendations[condition] = NO_RECOMMENDATION
         
         return recommendations
     
+    def recommendations_json(self, risk_scores: Dict[str, float]) -> bytes:
+        """
+        generate_recommendations() output as a JSON object, assembled from pre-encoded advice text
+        
+        Returns:
+            UTF-8 JSON bytes
+        """
+        parts = []
+        for condition, score in risk_scores.items():
+            if condition in self._fragments:
+                fragment = self._fragments[condition][get_risk_category(score)]
+            else:
+                fragment = self._no_recommendation
+            parts.append(dumps(condition) + b":" + fragment)
+        return b"{" + b",".join(parts) + b"}"
+    
     def generate_detailed_recommendations(self, risk_scores: Dict[str, float]) -> Dict:
         """
         Generate detailed recommendations with action items
@@ -131,7 +157,7 @@ class RecommendationEngine:
                 detailed[condition] = {
                     'risk_level': risk_level,
                     'score': score,
-                    'advice': " ".join(actions),
+                    'advice': self.advice[condition][risk_level],
                     'actions': actions,
                     'priority': 'High' if risk_level == 'High' else 'Medium' if risk_level == 'Moderate' else 'Low'
                 }
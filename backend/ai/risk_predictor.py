@@ -3,215 +3,314 @@ AI Risk Prediction Engine
 Uses ML models and rule-based logic to predict health risks
 """
 import numpy as np
-from typing import Dict, Tuple
-from validators import calculate_bmi, parse_blood_pressure
+import pandas as pd
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from config import settings
+from validators import calculate_bmi, get_risk_category, parse_blood_pressure
+
+
+class Tier(NamedTuple):
+    """One scoring step: points (and a factor named in explanations) when test holds"""
+    test: Callable
+    points: int
+    factor: Optional[str] = None
+
+
+class Condition:
+    """
+    Scoring rules and explanation wording of one condition
+
+    Each component is a tuple of tiers; the first tier whose test holds scores.
+    Tests read metrics through _Record (one person, plain values) or _Batch
+    (column arrays), so the same rules drive predict_all_risks and predict_frame.
+    Factor and explanation strings are templates with {0} = BMI, {1} = blood
+    pressure string and {2} = cholesterol.
+    """
+
+    def __init__(self, components: Tuple[Tuple[Tier, ...], ...], explain: Callable[[int, str], str],
+                 level_component: Optional[int] = None):
+        self.components = components
+        # explain(level, factors) -> template; level 2 = High, 1 = Moderate, 0 = Low
+        self.explain = explain
+        # Word the explanation by the tier of this component instead of by risk category
+        self.level_component = level_component
+        # Per component, (test, points, factor, explanation level or None) of each tier, for the per-record path
+        self.plan = tuple(
+            tuple(
+                (tier.test, tier.points, tier.factor, max(2 - rank, 0) if index == level_component else None)
+                for rank, tier in enumerate(tiers)
+            )
+            for index, tiers in enumerate(components)
+        )
+
+
+DIABETES = Condition(
+    components=(
+        # BMI factor (0-30 points)
+        (Tier(lambda m: m.bmi >= 30, 30, "high BMI (≥30)"),
+         Tier(lambda m: m.bmi >= 25, 15, "elevated BMI (25-30)")),
+        # Age factor (0-25 points)
+        (Tier(lambda m: m.age >= 45, 25, "age over 45"),
+         Tier(lambda m: m.age >= 35, 15)),
+        # Lifestyle factors (0-30 points)
+        (Tier(lambda m: m.mentions('sedentary', 'no exercise', '0'), 20, "sedentary lifestyle"),
+         Tier(lambda m: m.mentions('exercise: 1', 'exercise: 2'), 10)),
+        (Tier(lambda m: m.mentions('high sugar', 'poor diet'), 10, "poor diet"),),
+        # Family history (if mentioned)
+        (Tier(lambda m: m.mentions('family history', 'diabetes'), 15, "family history of diabetes"),),
+    ),
+    explain=lambda level, factors: (
+        f"High risk due to: {factors}. BMI is {{0:.1f}}." if level == 2 else
+        f"Moderate risk. Contributing factors: {factors or 'age and BMI in moderate range'}. BMI is {{0:.1f}}."
+        if level == 1 else
+        "Low risk. BMI is {0:.1f} and lifestyle factors are favorable."
+    ),
+)
+
+HEART_DISEASE = Condition(
+    components=(
+        # Blood pressure factor (0-30 points)
+        (Tier(lambda m: (m.systolic >= 140) | (m.diastolic >= 90), 30, "high blood pressure ({1})"),
+         Tier(lambda m: (m.systolic >= 130) | (m.diastolic >= 85), 15, "elevated blood pressure ({1})")),
+        # Cholesterol factor (0-25 points)
+        (Tier(lambda m: m.cholesterol >= 240, 25, "high cholesterol ({2} mg/dL)"),
+         Tier(lambda m: m.cholesterol >= 200, 12, "borderline high cholesterol ({2} mg/dL)")),
+        # Age factor (0-20 points)
+        (Tier(lambda m: m.age >= 55, 20, "age over 55"),
+         Tier(lambda m: m.age >= 45, 10)),
+        # Smoking (0-15 points)
+        (Tier(lambda m: m.mentions('smoking: yes', 'smoker'), 15, "smoking"),),
+        # BMI factor (0-10 points)
+        (Tier(lambda m: m.bmi >= 30, 10, "obesity"),),
+    ),
+    explain=lambda level, factors: (
+        f"High risk. Key factors: {factors}." if level == 2 else
+        "Moderate risk. Blood pressure {1}, cholesterol {2} mg/dL indicate some concern." if level == 1 else
+        "Low risk. Blood pressure and cholesterol levels are within healthy ranges."
+    ),
+)
+
+HIGH_CHOLESTEROL = Condition(
+    components=(
+        # Cholesterol level is the primary factor (0-50 points)
+        (Tier(lambda m: m.cholesterol >= 240, 50, "cholesterol level {2} mg/dL (high)"),
+         Tier(lambda m: m.cholesterol >= 200, 30, "cholesterol level {2} mg/dL (borderline high)"),
+         Tier(lambda m: m.cholesterol >= 180, 15)),
+        # Diet factor (0-25 points)
+        (Tier(lambda m: m.mentions('high fat', 'fried', 'fast food'), 20, "high-fat diet"),
+         Tier(lambda m: m.mentions('poor diet'), 10)),
+        # Exercise factor (0-15 points)
+        (Tier(lambda m: m.mentions('no exercise', 'sedentary'), 15, "lack of exercise"),),
+        # BMI factor (0-10 points)
+        (Tier(lambda m: m.bmi >= 30, 10, "high BMI"),),
+    ),
+    explain=lambda level, factors: (
+        f"Cholesterol level ({{2}} mg/dL) is significantly above recommended range (<200 mg/dL). {factors}."
+        if level == 2 else
+        "Cholesterol level ({2} mg/dL) is above optimal range. Consider dietary modifications." if level == 1 else
+        "Cholesterol level ({2} mg/dL) is within healthy range."
+    ),
+    # Worded by cholesterol level (high, borderline high) rather than by score
+    level_component=0,
+)
+
+CONDITIONS = {'diabetes': DIABETES, 'heart_disease': HEART_DISEASE, 'high_cholesterol': HIGH_CHOLESTEROL}
+
+# Risk category as an explanation level
+LEVELS = {"High": 2, "Moderate": 1, "Low": 0}
+
+
+class _Record:
+    """One person's metrics as the rule tests read them"""
+
+    def __init__(self, metrics: Dict):
+        self.age = metrics['age']
+        self.bmi = calculate_bmi(metrics['weight'], metrics['height'])
+        self.cholesterol = metrics['cholesterol_level']
+        self.bp = metrics['blood_pressure']
+        self.systolic, self.diastolic = parse_blood_pressure(self.bp)
+        self.lifestyle = metrics['lifestyle_info'].lower()
+
+    def mentions(self, *needles: str) -> bool:
+        lifestyle = self.lifestyle
+        for needle in needles:
+            if needle in lifestyle:
+                return True
+        return False
+
+
+class _Batch:
+    """A frame of metrics as column arrays; the rule tests give row masks"""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.age = frame['age'].to_numpy()
+        self.cholesterol = frame['cholesterol_level'].to_numpy(dtype=float)
+        self.bmi = frame['weight'].to_numpy(dtype=float) / (frame['height'].to_numpy(dtype=float) / 100) ** 2
+        self.bp = frame['blood_pressure'].tolist()
+        pressures = np.array([bp.split('/') for bp in self.bp], dtype=int).reshape(-1, 2)
+        self.systolic, self.diastolic = pressures[:, 0], pressures[:, 1]
+        self.lifestyle = [text.lower() for text in frame['lifestyle_info'].tolist()]
+        self._mentions = {}
+
+    def mentions(self, *needles: str) -> np.ndarray:
+        if needles not in self._mentions:
+            self._mentions[needles] = _contains(self.lifestyle, *needles)
+        return self._mentions[needles]
+
+
+def _contains(texts: List[str], *needles: str) -> np.ndarray:
+    """Row mask: text contains any of the needles"""
+    mask = np.zeros(len(texts), dtype=bool)
+    for needle in needles:
+        mask |= np.array([needle in text for text in texts], dtype=bool)
+    return mask
+
+
+def _factor_bits(masks: List[np.ndarray], rows: int) -> np.ndarray:
+    """Pack factor masks into one integer per row (bit k = factor k present)"""
+    bits = np.zeros(rows, dtype=np.int64)
+    for k, mask in enumerate(masks):
+        bits |= mask.astype(np.int64) << k
+    return bits
+
+
+def _joined(factors: List[str], bits: int) -> str:
+    return ', '.join(factor for k, factor in enumerate(factors) if bits >> k & 1)
+
+
+def _render(level: np.ndarray, bits: np.ndarray, template, values) -> List[str]:
+    """Explanation per row, formatting one template per (level, factor set) combination"""
+    codes = level.astype(np.int64) << 16 | bits
+    unique, inverse = np.unique(codes, return_inverse=True)
+    templates = [template(int(code) >> 16, int(code) & 0xFFFF) for code in unique]
+    return [templates[i].format(*row) for i, row in zip(inverse.tolist(), values)]
+
+
+def _score_record(condition: Condition, record: _Record) -> Tuple[float, str]:
+    """(score, explanation) of one person"""
+    score = 0.0
+    factors = []
+    level = None
+    for tiers in condition.plan:
+        for test, points, factor, tier_level in tiers:
+            if test(record):
+                score += points
+                if factor:
+                    factors.append(factor)
+                if tier_level is not None:
+                    level = tier_level
+                break
+    score = min(score, 100.0)
+    if condition.level_component is None:
+        level = LEVELS[get_risk_category(score)]
+    elif level is None:
+        level = 0
+    explanation = condition.explain(level, ', '.join(factors))
+    return score, explanation.format(record.bmi, record.bp, record.cholesterol)
+
+
+def _score_batch(condition: Condition, batch: _Batch, rows: int, explanations: bool):
+    """(scores, explanations or None) of every row, with the rules applied as masks"""
+    score = np.zeros(rows)
+    factors, masks = [], []
+    tier_level = np.zeros(rows, dtype=np.int64)
+    for index, tiers in enumerate(condition.components):
+        taken = np.zeros(rows, dtype=bool)
+        for rank, tier in enumerate(tiers):
+            hit = np.asarray(tier.test(batch), dtype=bool) & ~taken
+            score += np.where(hit, tier.points, 0)
+            if tier.factor:
+                factors.append(tier.factor)
+                masks.append(hit)
+            if index == condition.level_component:
+                tier_level[hit] = max(2 - rank, 0)
+            taken |= hit
+    score = np.minimum(score, 100.0)
+    if not explanations:
+        return score, None
+    if condition.level_component is None:
+        # get_risk_category() as a level
+        level = np.where(
+            score >= settings.MODERATE_RISK_THRESHOLD, 2, np.where(score >= settings.LOW_RISK_THRESHOLD, 1, 0)
+        )
+    else:
+        level = tier_level
+    values = list(zip(batch.bmi.tolist(), batch.bp, batch.cholesterol.tolist()))
+    text = _render(level, _factor_bits(masks, rows),
+                   lambda code_level, bits: condition.explain(code_level, _joined(factors, bits)), values)
+    return score, text
 
 
 class RiskPredictor:
     """Health risk prediction engine"""
-    
+
     def __init__(self):
         """Initialize the predictor with models"""
         # In a production system, load pre-trained models here
         # For demo purposes, we'll use rule-based predictions with ML-style scoring
         self.models_loaded = True
-    
+
     def predict_diabetes_risk(self, metrics: Dict) -> Tuple[float, str]:
         """
         Predict diabetes risk
-        
+
         Returns:
             Tuple of (risk_score, explanation)
         """
-        age = metrics['age']
-        weight = metrics['weight']
-        height = metrics['height']
-        bmi = calculate_bmi(weight, height)
-        lifestyle = metrics['lifestyle_info'].lower()
-        
-        # Calculate risk score based on multiple factors
-        risk_score = 0.0
-        factors = []
-        
-        # BMI factor (0-30 points)
-        if bmi >= 30:
-            risk_score += 30
-            factors.append("high BMI (≥30)")
-        elif bmi >= 25:
-            risk_score += 15
-            factors.append("elevated BMI (25-30)")
-        
-        # Age factor (0-25 points)
-        if age >= 45:
-            risk_score += 25
-            factors.append("age over 45")
-        elif age >= 35:
-            risk_score += 15
-        
-        # Lifestyle factors (0-30 points)
-        if 'sedentary' in lifestyle or 'no exercise' in lifestyle or '0' in lifestyle:
-            risk_score += 20
-            factors.append("sedentary lifestyle")
-        elif 'exercise: 1' in lifestyle or 'exercise: 2' in lifestyle:
-            risk_score += 10
-        
-        if 'high sugar' in lifestyle or 'poor diet' in lifestyle:
-            risk_score += 10
-            factors.append("poor diet")
-        
-        # Family history (if mentioned)
-        if 'family history' in lifestyle or 'diabetes' in lifestyle:
-            risk_score += 15
-            factors.append("family history of diabetes")
-        
-        # Generate explanation
-        if risk_score >= 60:
-            explanation = f"High risk due to: {', '.join(factors)}. BMI is {bmi:.1f}."
-        elif risk_score >= 30:
-            explanation = f"Moderate risk. Contributing factors: {', '.join(factors) if factors else 'age and BMI in moderate range'}. BMI is {bmi:.1f}."
-        else:
-            explanation = f"Low risk. BMI is {bmi:.1f} and lifestyle factors are favorable."
-        
-        return min(risk_score, 100.0), explanation
-    
+        return _score_record(DIABETES, _Record(metrics))
+
     def predict_heart_disease_risk(self, metrics: Dict) -> Tuple[float, str]:
         """
         Predict heart disease risk
-        
+
         Returns:
             Tuple of (risk_score, explanation)
         """
-        age = metrics['age']
-        weight = metrics['weight']
-        height = metrics['height']
-        bmi = calculate_bmi(weight, height)
-        cholesterol = metrics['cholesterol_level']
-        bp_str = metrics['blood_pressure']
-        systolic, diastolic = parse_blood_pressure(bp_str)
-        lifestyle = metrics['lifestyle_info'].lower()
-        
-        risk_score = 0.0
-        factors = []
-        
-        # Blood pressure factor (0-30 points)
-        if systolic >= 140 or diastolic >= 90:
-            risk_score += 30
-            factors.append(f"high blood pressure ({bp_str})")
-        elif systolic >= 130 or diastolic >= 85:
-            risk_score += 15
-            factors.append(f"elevated blood pressure ({bp_str})")
-        
-        # Cholesterol factor (0-25 points)
-        if cholesterol >= 240:
-            risk_score += 25
-            factors.append(f"high cholesterol ({cholesterol} mg/dL)")
-        elif cholesterol >= 200:
-            risk_score += 12
-            factors.append(f"borderline high cholesterol ({cholesterol} mg/dL)")
-        
-        # Age factor (0-20 points)
-        if age >= 55:
-            risk_score += 20
-            factors.append("age over 55")
-        elif age >= 45:
-            risk_score += 10
-        
-        # Smoking (0-15 points)
-        if 'smoking: yes' in lifestyle or 'smoker' in lifestyle:
-            risk_score += 15
-            factors.append("smoking")
-        
-        # BMI factor (0-10 points)
-        if bmi >= 30:
-            risk_score += 10
-            factors.append("obesity")
-        
-        # Generate explanation
-        if risk_score >= 60:
-            explanation = f"High risk. Key factors: {', '.join(factors)}."
-        elif risk_score >= 30:
-            explanation = f"Moderate risk. Blood pressure {bp_str}, cholesterol {cholesterol} mg/dL indicate some concern."
-        else:
-            explanation = f"Low risk. Blood pressure and cholesterol levels are within healthy ranges."
-        
-        return min(risk_score, 100.0), explanation
-    
+        return _score_record(HEART_DISEASE, _Record(metrics))
+
     def predict_cholesterol_risk(self, metrics: Dict) -> Tuple[float, str]:
         """
         Predict high cholesterol risk
-        
+
         Returns:
             Tuple of (risk_score, explanation)
         """
-        cholesterol = metrics['cholesterol_level']
-        age = metrics['age']
-        bmi = calculate_bmi(metrics['weight'], metrics['height'])
-        lifestyle = metrics['lifestyle_info'].lower()
-        
-        risk_score = 0.0
-        factors = []
-        
-        # Cholesterol level is the primary factor (0-50 points)
-        if cholesterol >= 240:
-            risk_score += 50
-            factors.append(f"cholesterol level {cholesterol} mg/dL (high)")
-        elif cholesterol >= 200:
-            risk_score += 30
-            factors.append(f"cholesterol level {cholesterol} mg/dL (borderline high)")
-        elif cholesterol >= 180:
-            risk_score += 15
-        
-        # Diet factor (0-25 points)
-        if 'high fat' in lifestyle or 'fried' in lifestyle or 'fast food' in lifestyle:
-            risk_score += 20
-            factors.append("high-fat diet")
-        elif 'poor diet' in lifestyle:
-            risk_score += 10
-        
-        # Exercise factor (0-15 points)
-        if 'no exercise' in lifestyle or 'sedentary' in lifestyle:
-            risk_score += 15
-            factors.append("lack of exercise")
-        
-        # BMI factor (0-10 points)
-        if bmi >= 30:
-            risk_score += 10
-            factors.append("high BMI")
-        
-        # Generate explanation
-        if cholesterol >= 240:
-            explanation = f"Cholesterol level ({cholesterol} mg/dL) is significantly above recommended range (<200 mg/dL). {', '.join(factors)}."
-        elif cholesterol >= 200:
-            explanation = f"Cholesterol level ({cholesterol} mg/dL) is above optimal range. Consider dietary modifications."
-        else:
-            explanation = f"Cholesterol level ({cholesterol} mg/dL) is within healthy range."
-        
-        return min(risk_score, 100.0), explanation
-    
+        return _score_record(HIGH_CHOLESTEROL, _Record(metrics))
+
     def predict_all_risks(self, metrics: Dict) -> Dict:
         """
         Predict all health risks
-        
+
         Returns:
             Dictionary with risk scores and explanations
         """
-        diabetes_score, diabetes_exp = self.predict_diabetes_risk(metrics)
-        heart_score, heart_exp = self.predict_heart_disease_risk(metrics)
-        cholesterol_score, cholesterol_exp = self.predict_cholesterol_risk(metrics)
-        
-        return {
-            'risk_scores': {
-                'diabetes': round(diabetes_score, 1),
-                'heart_disease': round(heart_score, 1),
-                'high_cholesterol': round(cholesterol_score, 1)
-            },
-            'explanations': {
-                'diabetes': diabetes_exp,
-                'heart_disease': heart_exp,
-                'high_cholesterol': cholesterol_exp
-            }
-        }
+        record = _Record(metrics)
+        scores, explanations = {}, {}
+        for name, condition in CONDITIONS.items():
+            score, explanations[name] = _score_record(condition, record)
+            scores[name] = round(score, 1)
+        return {'risk_scores': scores, 'explanations': explanations}
 
+    def predict_frame(self, frame: pd.DataFrame, explanations: bool = True) -> pd.DataFrame:
+        """
+        Vectorized predict_all_risks for a batch of already validated metrics
+
+        Args:
+            frame: one row per person with the HealthMetrics columns
+            explanations: also build the explanation texts (most of the cost)
+
+        Returns:
+            DataFrame (same index) with the rounded score and, optionally, the
+            explanation of each condition; row for row identical to predict_all_risks
+        """
+        batch = _Batch(frame)
+        scores, texts = {}, {}
+        for name, condition in CONDITIONS.items():
+            score, text = _score_batch(condition, batch, len(frame), explanations)
+            scores[name] = score.round(1)
+            if explanations:
+                texts[f"{name}_explanation"] = text
+        return pd.DataFrame(scores, index=frame.index).assign(**texts)
 
 # Singleton instance
 risk_predictor = RiskPredictor()
@@ -2,19 +2,31 @@
 HealthNexus AI - Main FastAPI Application
 Professional AI-powered health risk prediction system
 """
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, Header, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
+from typing import Optional
 import uuid
 import logging
 
 from config import settings
-from models import HealthDataInput, HealthResponse
+from models import HealthDataInput, HealthResponse, JobRequest
 from validators import validate_health_metrics, calculate_bmi, get_risk_category
 from ai.risk_predictor import risk_predictor
 from ai.recommendation_engine import recommendation_engine
 from db.database import init_db
 from db.crud import db_crud
+from metrics import CONTENT_TYPE, MetricsMiddleware, request_metrics
+from admission import AdmissionMiddleware, admission_controller
+from profiling import ProfilingMiddleware, profiler
+from fast_json import FastJSONResponse, dumps, health_response_body
+from cache import etag_matches, recommendations_cache
+from batch_stream import DuplexStreamingResponse, detect_format, predict_stream, stream_registry
+from db.jobs import FINISHED, job_store
+from db.idempotency import IN_PROGRESS, MAX_KEY_LENGTH, MISMATCH, REPLAY, fingerprint, idempotency_store
+from jobs import export_path, import_path, job_runner, validate_params
 
 # Configure logging
 logging.basicConfig(level=settings.LOG_LEVEL)
@@ -27,6 +39,10 @@ app = FastAPI(
     description=settings.API_DESCRIPTION
 )
 
+# Per-lane concurrency limits; innermost, so 503s still get CORS headers and are counted in metrics
+if admission_controller.enabled:
+    app.add_middleware(AdmissionMiddleware, controller=admission_controller)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -36,6 +52,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request profiles (X-Profile header)
+if profiler.enabled:
+    app.add_middleware(ProfilingMiddleware, control=profiler)
+
+# Request latency histograms; added last so it wraps every other middleware
+if request_metrics.enabled:
+    app.add_middleware(MetricsMiddleware, registry=request_metrics)
+
 
 @app.on_event("startup")
 async def startup_event():
@@ -43,6 +67,14 @@ async def startup_event():
     logger.info("Initializing HealthNexus AI API...")
     init_db()
     logger.info("Database initialized successfully")
+    if settings.JOBS_ENABLED:
+        job_runner.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the job workers; jobs they were running resume on another worker"""
+    job_runner.stop()
 
 
 @app.get("/")
@@ -64,14 +96,95 @@ async def health_check():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus scrape endpoint (404 unless METRICS_ENABLED)"""
+    if not request_metrics.enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics are disabled")
+    body = request_metrics.render()
+    if admission_controller.enabled:
+        body += admission_controller.render()
+    return Response(content=body, media_type=CONTENT_TYPE)
+
+
+def _check_profiler(token: Optional[str]):
+    if not profiler.enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profiling is disabled")
+    if not profiler.authorized(token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid profiling token")
+
+
+@app.post("/admin/profile", status_code=status.HTTP_202_ACCEPTED, include_in_schema=False)
+async def start_profile(seconds: float = 10, hz: Optional[float] = None,
+                        x_profile_token: Optional[str] = Header(None)):
+    """
+    Sample every thread for a time window (capped at PROFILING_MAX_SECONDS)
+    
+    The collapsed stacks are written to PROFILING_DIR when the window ends
+    """
+    _check_profiler(x_profile_token)
+    started = profiler.start_window(seconds, hz)
+    if started is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running")
+    return started
+
+
+@app.get("/admin/profile", include_in_schema=False)
+async def profile_status(x_profile_token: Optional[str] = Header(None)):
+    """Running profile and the most recent profile files"""
+    _check_profiler(x_profile_token)
+    return profiler.status()
+
+
+async def _claim_idempotency_key(key: str, data: HealthDataInput) -> Optional[Response]:
+    """Claim an Idempotency-Key for this request; returns the stored response if it is a retry"""
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"
+        )
+    with request_metrics.span("db.idempotency"):
+        outcome, stored = await run_in_threadpool(
+            idempotency_store.begin, key, fingerprint(data.model_dump(mode="json"))
+        )
+    if outcome == REPLAY:
+        status_code, body = stored
+        return FastJSONResponse(body, status_code=status_code, headers={"Idempotent-Replayed": "true"})
+    if outcome == IN_PROGRESS:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)}
+        )
+    if outcome == MISMATCH:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request body"
+        )
+    return None
+
+
+async def _release_idempotency_key(key: Optional[str]):
+    """Drop the claim of a request that failed, so a retry runs it again"""
+    if key is not None:
+        await run_in_threadpool(idempotency_store.abandon, key)
+
+
 @app.post("/submit-health-data", response_model=HealthResponse, status_code=status.HTTP_200_OK)
-async def submit_health_data(data: HealthDataInput):
+async def submit_health_data(data: HealthDataInput, idempotency_key: Optional[str] = Header(None)):
     """
     Submit health data and receive risk predictions with recommendations
     
     This endpoint combines data submission, prediction, and recommendation generation
-    in a single call for convenience.
+    in a single call for convenience. With an Idempotency-Key header, a retry of
+    the same request gets the first response back (Idempotent-Replayed: true)
+    without being scored or saved again
     """
+    if idempotency_key is not None:
+        replay = await _claim_idempotency_key(idempotency_key, data)
+        if replay is not None:
+            return replay
+    
     try:
         # Generate user_id if not provided
         user_id = data.user_id or str(uuid.uuid4())
@@ -80,7 +193,8 @@ async def submit_health_data(data: HealthDataInput):
         metrics = data.metrics.model_dump()
         
         # Validate metrics
-        is_valid, error_msg = validate_health_metrics(metrics)
+        with request_metrics.span("validate"):
+            is_valid, error_msg = validate_health_metrics(metrics)
         if not is_valid:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -90,13 +204,16 @@ async def submit_health_data(data: HealthDataInput):
         # Calculate BMI
         bmi = calculate_bmi(metrics['weight'], metrics['height'])
         
-        # Save health data to database
-        data_id = db_crud.save_health_data(user_id, metrics, bmi)
+        # Save health data to database (on a thread: a write waiting for SQLite's
+        # lock must not stall reads served by this event loop)
+        with request_metrics.span("db.save_health_data"):
+            data_id = await run_in_threadpool(db_crud.save_health_data, user_id, metrics, bmi)
         if not data_id:
             logger.warning("Failed to save health data to database")
         
         # Get risk predictions
-        predictions = risk_predictor.predict_all_risks(metrics)
+        with request_metrics.span("predict"):
+            predictions = risk_predictor.predict_all_risks(metrics)
         risk_scores = predictions['risk_scores']
         explanations = predictions['explanations']
         
@@ -107,30 +224,41 @@ async def submit_health_data(data: HealthDataInput):
         }
         
         # Save predictions to database
-        prediction_id = db_crud.save_predictions(user_id, risk_scores, explanations)
+        with request_metrics.span("db.save_predictions"):
+            prediction_id = await run_in_threadpool(
+                db_crud.save_predictions, user_id, risk_scores, explanations, data_id
+            )
         
         # Generate recommendations
-        recommendations = recommendation_engine.generate_recommendations(risk_scores)
+        with request_metrics.span("recommend"):
+            recommendations = recommendation_engine.generate_recommendations(risk_scores)
+            recommendations_json = recommendation_engine.recommendations_json(risk_scores)
         
         # Save recommendations to database
         if prediction_id:
-            db_crud.save_recommendations(user_id, prediction_id, recommendations)
+            with request_metrics.span("db.save_recommendations"):
+                await run_in_threadpool(db_crud.save_recommendations, user_id, prediction_id, recommendations)
         
-        # Prepare response
-        response = HealthResponse(
-            user_id=user_id,
-            risk_scores=risk_scores,
-            recommendations=recommendations,
-            explanations=explanations,
-            timestamp=datetime.now()
-        )
+        # Prepare response: built from our own data, so it is encoded directly
+        # (same document as HealthResponse, without re-validating it)
+        with request_metrics.span("serialize"):
+            body = health_response_body(
+                user_id, risk_scores, recommendations_json, explanations, datetime.now()
+            )
+        
+        # Kept for retries with the same key
+        if idempotency_key is not None:
+            with request_metrics.span("db.idempotency"):
+                await run_in_threadpool(idempotency_store.complete, idempotency_key, status.HTTP_200_OK, body)
         
         logger.info(f"Successfully processed health data for user {user_id}")
-        return response
+        return FastJSONResponse(body)
         
     except HTTPException:
+        await _release_idempotency_key(idempotency_key)
         raise
     except Exception as e:
+        await _release_idempotency_key(idempotency_key)
         logger.error(f"Error processing health data: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -153,7 +281,8 @@ async def get_predictions(data: HealthDataInput):
         metrics = data.metrics.model_dump()
         
         # Validate metrics
-        is_valid, error_msg = validate_health_metrics(metrics)
+        with request_metrics.span("validate"):
+            is_valid, error_msg = validate_health_metrics(metrics)
         if not is_valid:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -161,7 +290,8 @@ async def get_predictions(data: HealthDataInput):
             )
         
         # Get risk predictions
-        predictions = risk_predictor.predict_all_risks(metrics)
+        with request_metrics.span("predict"):
+            predictions = risk_predictor.predict_all_risks(metrics)
         risk_scores = predictions['risk_scores']
         explanations = predictions['explanations']
         
@@ -171,13 +301,13 @@ async def get_predictions(data: HealthDataInput):
             for condition, score in risk_scores.items()
         }
         
-        return {
+        return FastJSONResponse({
             "user_id": user_id,
             "risk_scores": risk_scores,
             "explanations": explanations,
             "risk_levels": risk_levels,
             "timestamp": datetime.now().isoformat()
-        }
+        })
         
     except HTTPException:
         raise
@@ -189,16 +319,185 @@ async def get_predictions(data: HealthDataInput):
         )
 
 
+@app.post("/get-predictions/stream")
+async def stream_predictions(request: Request, format: Optional[str] = None, explanations: bool = True):
+    """
+    Risk predictions for a whole cohort, streamed back as NDJSON
+    
+    The body is NDJSON (one {"user_id", "metrics"} or flat metrics object per
+    line) or CSV with a header row of the metric names and an optional user_id
+    column, chosen by Content-Type or ?format=ndjson|csv. Rows are scored in
+    chunks of STREAM_CHUNK_ROWS and each chunk's results are sent as soon as it
+    is done; invalid rows get an error line instead of failing the stream.
+    The last line is a summary; progress can be polled on
+    /get-predictions/stream/{stream_id} with the X-Stream-ID response header
+    """
+    fmt = detect_format(request.headers.get("content-type"), format)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send NDJSON (application/x-ndjson) or CSV (text/csv), or pass ?format=ndjson|csv"
+        )
+    
+    progress = stream_registry.create(fmt)
+    logger.info(f"Started prediction stream {progress.id} ({fmt})")
+    return DuplexStreamingResponse(
+        predict_stream(
+            request.stream(), fmt, progress, settings.STREAM_CHUNK_ROWS, explanations, request.receive
+        ),
+        headers={"X-Stream-ID": progress.id}
+    )
+
+
+@app.get("/get-predictions/stream/{stream_id}")
+async def stream_status(stream_id: str):
+    """
+    Progress of a running or recently finished prediction stream
+    
+    Streams are tracked by the worker process that serves them
+    """
+    progress = stream_registry.get(stream_id)
+    if progress is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No prediction stream {stream_id}"
+        )
+    return FastJSONResponse(progress.to_dict())
+
+
+def _job_view(job: dict) -> dict:
+    """Public fields of a job record"""
+    return {
+        "job_id": job["id"],
+        "type": job["type"],
+        "status": job["status"],
+        "params": job["params"],
+        "processed": job["processed"],
+        "total": job["total"],
+        "progress": round(job["processed"] / job["total"], 4) if job["total"] else None,
+        "result": job["result"],
+        "error": job["error"],
+        "attempts": job["attempts"],
+        "cancel_requested": job["cancel_requested"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+
+
+async def _get_job(job_id: str) -> dict:
+    job = await run_in_threadpool(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No job {job_id}")
+    return job
+
+
+@app.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(data: JobRequest):
+    """
+    Queue a background job and return its ID
+    
+    Types: rescore-all (recompute every stored prediction and recommendation
+    with the current rules and thresholds) and export-user-history
+    (params.user_id; the file is downloaded from /jobs/{job_id}/result).
+    Poll /jobs/{job_id} for progress
+    """
+    error_msg = validate_params(data.type, data.params)
+    if error_msg:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error_msg)
+    job = await run_in_threadpool(job_store.create, data.type, data.params)
+    job_runner.notify()
+    logger.info(f"Queued job {job['id']} ({data.type})")
+    return FastJSONResponse(_job_view(job), status_code=status.HTTP_202_ACCEPTED)
+
+
+@app.post("/jobs/bulk-import", status_code=status.HTTP_202_ACCEPTED)
+async def submit_bulk_import(request: Request, format: Optional[str] = None):
+    """
+    Upload a cohort file (NDJSON or CSV, as for /get-predictions/stream) to be
+    imported by a background job; every valid row is saved with its analysis
+    """
+    fmt = detect_format(request.headers.get("content-type"), format)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send NDJSON (application/x-ndjson) or CSV (text/csv), or pass ?format=ndjson|csv"
+        )
+    
+    # Written to disk as it arrives; the job is queued once the upload is complete
+    name = f"{uuid.uuid4().hex}.{fmt}"
+    path = import_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with open(path, "wb") as f:
+            async for chunk in request.stream():
+                f.write(chunk)
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
+    
+    job = await run_in_threadpool(job_store.create, "bulk-import", {"format": fmt, "file": name})
+    job_runner.notify()
+    logger.info(f"Queued job {job['id']} (bulk-import, {path.stat().st_size} bytes)")
+    return FastJSONResponse(_job_view(job), status_code=status.HTTP_202_ACCEPTED)
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, progress and (when finished) result of a job"""
+    return FastJSONResponse(_job_view(await _get_job(job_id)))
+
+
+@app.delete("/jobs/{job_id}", status_code=status.HTTP_202_ACCEPTED)
+async def cancel_job(job_id: str):
+    """Cancel a job; a running job stops after its current chunk (its committed work is kept)"""
+    job = await _get_job(job_id)
+    if job["status"] in FINISHED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job {job_id} is already {job['status']}")
+    job = await run_in_threadpool(job_store.request_cancel, job_id)
+    return FastJSONResponse(_job_view(job), status_code=status.HTTP_202_ACCEPTED)
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Download the file written by a completed export job"""
+    job = await _get_job(job_id)
+    if job["type"] != "export-user-history":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} has no result file")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job {job_id} is {job['status']}")
+    path = export_path(job_id)
+    if not path.exists():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Export of job {job_id} is gone")
+    return FileResponse(path, media_type="application/x-ndjson", filename=f"history-{job['params']['user_id']}.ndjson")
+
+
 @app.get("/get-recommendations/{user_id}")
-async def get_recommendations(user_id: str):
+async def get_recommendations(user_id: str, if_none_match: Optional[str] = Header(None)):
     """
     Get latest recommendations for a user
     
-    Retrieves the most recent analysis and recommendations from the database
+    Retrieves the most recent analysis and recommendations from the database.
+    Payloads are cached per user until a new analysis is saved; send the ETag
+    back as If-None-Match to get 304 Not Modified while it is unchanged.
+    The cache is per worker process, so each hit is checked against the user's
+    data_version in the database, which saves in any worker bump
     """
     try:
-        # Get latest analysis
-        analysis = db_crud.get_latest_analysis(user_id)
+        data_version = None
+        if recommendations_cache.enabled:
+            with request_metrics.span("db.get_data_version"):
+                data_version = await run_in_threadpool(db_crud.get_data_version, user_id)
+            cached = recommendations_cache.get(user_id, data_version)
+            if cached is not None:
+                body, etag = cached
+                return _conditional_response(body, etag, if_none_match)
+        
+        # Get latest analysis (a save after data_version was read leaves an entry
+        # tagged with the older version, which the next request replaces)
+        version = recommendations_cache.version(user_id)
+        with request_metrics.span("db.get_latest_analysis"):
+            analysis = await run_in_threadpool(db_crud.get_latest_analysis, user_id)
         
         if not analysis:
             raise HTTPException(
@@ -206,8 +505,8 @@ async def get_recommendations(user_id: str):
                 detail=f"No analysis found for user {user_id}"
             )
         
-        # Prepare response
-        return {
+        # Prepare response (plain values read from the database; no encoder pass needed)
+        body = dumps({
             "user_id": user_id,
             "risk_scores": {
                 "diabetes": analysis['diabetes_risk'],
@@ -225,7 +524,9 @@ async def get_recommendations(user_id: str):
                 "high_cholesterol": analysis['cholesterol_explanation']
             },
             "timestamp": analysis['created_at']
-        }
+        })
+        etag = recommendations_cache.put(user_id, body, version, data_version)
+        return _conditional_response(body, etag, if_none_match)
         
     except HTTPException:
         raise
@@ -237,6 +538,14 @@ async def get_recommendations(user_id: str):
         )
 
 
+def _conditional_response(body: bytes, etag: str, if_none_match: Optional[str]):
+    """304 when the client already has this payload, else the payload; both carry the ETag"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FastJSONResponse(body, headers=headers)
+
+
 @app.get("/user-history/{user_id}")
 async def get_user_history(user_id: str, limit: int = 10):
     """
@@ -245,14 +554,17 @@ async def get_user_history(user_id: str, limit: int = 10):
     Returns historical data for trend analysis
     """
     try:
-        health_history = db_crud.get_user_history(user_id, limit)
-        prediction_history = db_crud.get_user_predictions(user_id, limit)
+        with request_metrics.span("db.get_user_history"):
+            health_history = await run_in_threadpool(db_crud.get_user_history, user_id, limit)
+        with request_metrics.span("db.get_user_predictions"):
+            prediction_history = await run_in_threadpool(db_crud.get_user_predictions, user_id, limit)
         
-        return {
+        # Rows are dicts of str/int/float/None, so they are encoded as they are
+        return FastJSONResponse({
             "user_id": user_id,
             "health_data": health_history,
             "predictions": prediction_history
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error getting user history: {str(e)}")
@@ -0,0 +1,360 @@
+"""
+Streaming batch predictions
+A cohort file (NDJSON or CSV) is read from the request body as it arrives,
+validated row by row, scored in vectorized chunks and written back as NDJSON
+while the rest is still uploading, so memory stays bounded by the chunk size
+whatever the size of the cohort. The upload is drained into a spool (memory,
+then a temporary file) independently of the response, so clients that only
+read the response after sending the whole body can't deadlock the stream.
+Progress of each stream is kept in a small in-process registry for the status
+endpoint, and the last line of every stream is a summary of the run.
+"""
+import asyncio
+import csv
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import pandas as pd
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+from config import settings
+from models import HealthMetrics
+from validators import validate_health_metrics, get_risk_category
+from ai.risk_predictor import risk_predictor
+from fast_json import dumps, loads
+from metrics import request_metrics
+
+MEDIA_TYPE = "application/x-ndjson"
+
+CONDITIONS = ("diabetes", "heart_disease", "high_cholesterol")
+METRIC_FIELDS = tuple(HealthMetrics.model_fields)
+
+_CONTENT_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json": "ndjson",
+    "text/csv": "csv",
+}
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body is produced while the request body is still being read
+
+    On ASGI servers older than spec 2.4 StreamingResponse reads receive() alongside
+    the body to watch for a disconnect, which would swallow the upload; here only the
+    body iterator reads the request (request.stream() raises ClientDisconnect).
+    A client going away ends the response quietly
+    """
+
+    media_type = MEDIA_TYPE
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except (ClientDisconnect, OSError):
+            return
+        if self.background is not None:
+            await self.background()
+
+
+def detect_format(content_type: Optional[str], requested: Optional[str] = None) -> Optional[str]:
+    """'ndjson' or 'csv' from the format query parameter or the Content-Type; None if unsupported"""
+    if requested:
+        requested = requested.lower()
+        return requested if requested in ("ndjson", "csv") else None
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return _CONTENT_TYPES.get(media_type)
+
+
+class StreamProgress:
+    """Counters of one stream, read by the status endpoint while it runs"""
+
+    def __init__(self, fmt: str):
+        self.id = uuid.uuid4().hex
+        self.format = fmt
+        self.state = "running"
+        self.rows_read = 0
+        self.rows_scored = 0
+        self.rows_failed = 0
+        self.chunks = 0
+        self.error: Optional[str] = None
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    def finish(self, state: str, error: Optional[str] = None):
+        if self.finished_at is None:
+            self.state = state
+            self.error = error
+            self.finished_at = time.time()
+
+    def to_dict(self) -> Dict:
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            "stream_id": self.id,
+            "format": self.format,
+            "state": self.state,
+            "rows_read": self.rows_read,
+            "rows_scored": self.rows_scored,
+            "rows_failed": self.rows_failed,
+            "chunks": self.chunks,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.rows_read / elapsed, 1) if elapsed > 0 else None,
+            "error": self.error,
+        }
+
+
+class StreamRegistry:
+    """Progress of running and recently finished streams (this process only)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._streams: "OrderedDict[str, StreamProgress]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, fmt: str) -> StreamProgress:
+        progress = StreamProgress(fmt)
+        with self._lock:
+            self._streams[progress.id] = progress
+            while len(self._streams) > self.max_entries:
+                self._streams.popitem(last=False)
+        return progress
+
+    def get(self, stream_id: str) -> Optional[StreamProgress]:
+        with self._lock:
+            return self._streams.get(stream_id)
+
+
+class BodySpool:
+    """
+    Reads a request body in the background and hands it out in order
+
+    Unread data is held in memory up to max_memory bytes, then in a temporary
+    file; the spool is emptied whenever the reader catches up. Given the ASGI
+    receive callable, it keeps listening once the body is in, so a client that
+    goes away while results are still being produced is noticed (disconnected)
+    """
+
+    READ_SIZE = 65536
+
+    def __init__(self, chunks: AsyncIterator[bytes], max_memory: int, receive=None):
+        self._chunks = chunks
+        self._receive = receive
+        self.disconnected = False
+        self._file = tempfile.SpooledTemporaryFile(max_size=max_memory)
+        self._written = 0
+        self._read = 0
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._data = asyncio.Event()
+
+    async def _fill(self):
+        try:
+            async for chunk in self._chunks:
+                self._file.seek(self._written)
+                self._file.write(chunk)
+                self._written += len(chunk)
+                self._data.set()
+        except Exception as e:
+            self._error = e
+        finally:
+            self._done = True
+            self._data.set()
+        if self._receive is not None and self._error is None:
+            while (await self._receive())["type"] != "http.disconnect":
+                pass
+            self.disconnected = True
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        filler = asyncio.create_task(self._fill())
+        try:
+            while True:
+                if self._read < self._written:
+                    self._file.seek(self._read)
+                    chunk = self._file.read(min(self._written - self._read, self.READ_SIZE))
+                    self._read += len(chunk)
+                    if self._read == self._written:
+                        self._file.seek(0)
+                        self._file.truncate()
+                        self._read = self._written = 0
+                    yield chunk
+                elif self._done:
+                    if self._error is not None:
+                        raise self._error
+                    return
+                else:
+                    self._data.clear()
+                    await self._data.wait()
+        finally:
+            filler.cancel()
+            self._file.close()
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[bytes]:
+    """Lines of a byte stream, without line endings"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > max_line_bytes:
+            raise ValueError(f"Line longer than {max_line_bytes} bytes")
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if buffer:
+        yield buffer.rstrip(b"\r")
+
+
+def parse_header(line: bytes) -> List[str]:
+    """Column names of a CSV header line"""
+    return [name.strip() for name in next(csv.reader([line.decode("utf-8-sig")]))]
+
+
+def parse_row(line: bytes, fmt: str, header: List[str]) -> Tuple[Optional[str], Dict]:
+    """
+    (user_id, metrics) of one input line
+
+    NDJSON lines are {"user_id", "metrics": {...}} or a flat object of metrics;
+    CSV rows are matched to the header, where user_id is an optional column
+    """
+    if fmt == "csv":
+        record = dict(zip(header, next(csv.reader([line.decode("utf-8")]))))
+        return record.pop("user_id", None) or None, record
+    record = loads(line)
+    if not isinstance(record, dict):
+        raise ValueError("Each line must be a JSON object")
+    metrics = record.get("metrics", record)
+    if not isinstance(metrics, dict):
+        raise ValueError("metrics must be an object")
+    return record.get("user_id"), metrics
+
+
+def validate_row(metrics: Dict) -> Tuple[Optional[Dict], Optional[str]]:
+    """Same checks as /get-predictions: (metrics, None) or (None, error message)"""
+    try:
+        metrics = HealthMetrics.model_validate(metrics).model_dump()
+    except ValidationError as e:
+        problems = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+        )
+        return None, f"Validation error: {problems}"
+    is_valid, error_msg = validate_health_metrics(metrics)
+    if not is_valid:
+        return None, f"Validation error: {error_msg}"
+    return metrics, None
+
+
+def score_chunk(lines: List[Tuple[int, bytes]], fmt: str, header: Optional[List[str]],
+                explanations: bool) -> Tuple[bytes, int]:
+    """
+    Parse and validate a chunk of input lines and score the valid rows in one vectorized pass
+
+    Args:
+        lines: (row number, raw line) in input order
+        fmt: 'ndjson' or 'csv'
+        header: CSV column names
+        explanations: include the explanation texts
+
+    Returns:
+        (one NDJSON line per row in input order, number of rows that failed)
+    """
+    rows = []
+    for row, line in lines:
+        user_id = None
+        try:
+            user_id, metrics = parse_row(line, fmt, header)
+            metrics, error = validate_row(metrics)
+        except ValueError as e:
+            metrics, error = None, f"Invalid row: {str(e)}"
+        rows.append((row, user_id or str(uuid.uuid4()), metrics, error))
+
+    valid = [metrics for _, _, metrics, _ in rows if metrics is not None]
+    scores = (
+        risk_predictor.predict_frame(pd.DataFrame(valid, columns=METRIC_FIELDS), explanations)
+        if valid else None
+    )
+    columns = [scores[condition].tolist() for condition in CONDITIONS] if valid else []
+    if valid and explanations:
+        columns += [scores[condition + "_explanation"].tolist() for condition in CONDITIONS]
+
+    output = []
+    position = 0
+    for row, user_id, metrics, error in rows:
+        if metrics is None:
+            output.append(dumps({"row": row, "user_id": user_id, "error": error}))
+            continue
+        risk_scores = {condition: columns[k][position] for k, condition in enumerate(CONDITIONS)}
+        result = {
+            "row": row,
+            "user_id": user_id,
+            "risk_scores": risk_scores,
+            "risk_levels": {condition: get_risk_category(score) for condition, score in risk_scores.items()},
+        }
+        if explanations:
+            result["explanations"] = {
+                condition: columns[3 + k][position] for k, condition in enumerate(CONDITIONS)
+            }
+        output.append(dumps(result))
+        position += 1
+    return b"\n".join(output) + b"\n", len(rows) - position
+
+
+async def predict_stream(chunks: AsyncIterator[bytes], fmt: str, progress: StreamProgress,
+                         chunk_rows: int, explanations: bool = True, receive=None) -> AsyncIterator[bytes]:
+    """
+    NDJSON results of a cohort upload, one chunk at a time
+
+    Rows that can't be parsed or validated get an {"row", "error"} line and don't
+    stop the stream; the last line is {"summary": ...} (the final progress)
+    """
+    upload = BodySpool(chunks, settings.STREAM_SPOOL_BYTES, receive)
+    pending: List[Tuple[int, bytes]] = []
+    header: Optional[List[str]] = None
+
+    async def flush():
+        if upload.disconnected:
+            raise ClientDisconnect()
+        with request_metrics.span("stream.score_chunk"):
+            body, failed = await run_in_threadpool(score_chunk, pending, fmt, header, explanations)
+        progress.chunks += 1
+        progress.rows_scored += len(pending) - failed
+        progress.rows_failed += failed
+        pending.clear()
+        return body
+
+    try:
+        async for line in iter_lines(upload, settings.STREAM_MAX_LINE_BYTES):
+            if not line.strip():
+                continue
+            if fmt == "csv" and header is None:
+                header = parse_header(line)
+                continue
+            progress.rows_read += 1
+            pending.append((progress.rows_read, line))
+
+            if len(pending) >= chunk_rows:
+                yield await flush()
+                # Let other requests on this worker run between chunks
+                await asyncio.sleep(0)
+
+        if pending:
+            yield await flush()
+        progress.finish("completed")
+    except (ClientDisconnect, asyncio.CancelledError, GeneratorExit):
+        progress.finish("cancelled")
+        raise
+    except Exception as e:
+        # The status line has already been sent, so the failure is reported in the body
+        progress.finish("failed", str(e))
+    yield dumps({"summary": progress.to_dict()}) + b"\n"
+
+
+# Singleton instance
+stream_registry = StreamRegistry(max_entries=settings.STREAM_HISTORY)
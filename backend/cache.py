@@ -0,0 +1,124 @@
+"""
+In-process response cache
+Encoded response bodies are kept per key in an LRU with a strong ETag, so
+repeated polls are served (or answered 304) without touching the database.
+Writers invalidate a key when its data changes; a read that started before the
+write is stopped from caching the stale body afterwards by comparing invalidation
+counters, and only the latest max_entries invalidations are remembered.
+
+The cache is per process: a save clears only its own worker's entry. Callers
+that run several workers tag entries with a version read from the shared store
+and pass the current one to get(), so another worker's save is noticed there.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config import settings
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value covers etag (weak comparison, as for GET)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """LRU of (body, ETag) per key, with optional expiry"""
+
+    def __init__(self, max_entries: int, ttl: float = 0):
+        self.max_entries = max_entries
+        # Seconds an entry is served before it is re-read; 0 keeps entries until evicted or invalidated
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[bytes, str, float, Any]]" = OrderedDict()
+        # Key -> value of _counter at its last invalidation, oldest first and at most
+        # max_entries of them; _floor is the newest one forgotten. The counter only
+        # grows, so a read whose version() is below either value must not be cached
+        self._versions: "OrderedDict[str, int]" = OrderedDict()
+        self._counter = 0
+        self._floor = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: str, tag: Any = None) -> Optional[Tuple[bytes, str]]:
+        """Cached (body, etag), or None; entries put() with another tag are stale"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[3] != tag or (self.ttl and time.monotonic() - entry[2] > self.ttl):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def version(self, key: str) -> int:
+        """Take before reading the source; pass to put() so a concurrent invalidation wins"""
+        with self._lock:
+            return self._counter
+
+    def put(self, key: str, body: bytes, version: Optional[int] = None, tag: Any = None) -> str:
+        """
+        Cache body under key (unless key was invalidated since version); returns its ETag
+        
+        tag: version of the source read before body was built, for get() to compare
+        """
+        etag = make_etag(body)
+        if not self.enabled:
+            return etag
+        with self._lock:
+            if version is not None and max(self._versions.get(key, 0), self._floor) > version:
+                return etag
+            self._entries[key] = (body, etag, time.monotonic(), tag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag
+
+    def invalidate(self, key: str):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._counter += 1
+            self._versions[key] = self._counter
+            self._versions.move_to_end(key)
+            while len(self._versions) > self.max_entries:
+                _, self._floor = self._versions.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            # Reads in flight may hold anything cleared
+            self._floor = self._counter
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Singleton instance: latest-analysis payloads for GET /get-recommendations/{user_id}
+recommendations_cache = ResponseCache(
+    max_entries=settings.RECOMMENDATION_CACHE_SIZE,
+    ttl=settings.RECOMMENDATION_CACHE_TTL,
+)
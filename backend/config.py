@@ -15,6 +15,14 @@ class Settings(BaseSettings):
     
     # Database Settings
     DATABASE_URL: str = "sqlite:///./healthnexus.db"
+    # Idle SQLite connections kept per worker process, and write-ahead logging
+    DB_POOL_SIZE: int = 5
+    DB_WAL: bool = True
+    
+    # Server Settings (gunicorn_conf.py); 0 workers means one per CPU
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WORKERS: int = 0
     
     # Model Settings
     MODEL_PATH: str = "./ai/models"
@@ -25,7 +33,63 @@ class Settings(BaseSettings):
     # Logging
     LOG_LEVEL: str = "INFO"
     
-    # Risk Thresholds
+    # Metrics: request and stage latency histograms served on /metrics
+    METRICS_ENABLED: bool = False
+    
+    # Sampling profiler: X-Profile header and /admin/profile, collapsed stacks written to PROFILING_DIR
+    PROFILING_ENABLED: bool = False
+    PROFILING_DIR: str = "./profiles"
+    PROFILING_SAMPLE_HZ: int = 100
+    PROFILING_MAX_SAMPLE_HZ: int = 1000
+    PROFILING_MAX_SECONDS: int = 60
+    PROFILING_TOKEN: Optional[str] = None
+    
+    # Cache of GET /get-recommendations payloads per user (0 disables) and seconds an
+    # entry lives. Hits are checked against the user's data_version in the database,
+    # so saves handled by other workers are seen on the next request
+    RECOMMENDATION_CACHE_SIZE: int = 10000
+    RECOMMENDATION_CACHE_TTL: float = 30.0
+    
+    # POST /get-predictions/stream: rows scored per vectorized chunk, longest accepted
+    # input line, upload bytes buffered in memory before spilling to a temporary file,
+    # and how many finished streams keep their progress for the status endpoint
+    STREAM_CHUNK_ROWS: int = 1000
+    STREAM_MAX_LINE_BYTES: int = 65536
+    STREAM_SPOOL_BYTES: int = 8 * 1024 * 1024
+    STREAM_HISTORY: int = 100
+    
+    # Background jobs (/jobs): worker threads per process, records per committed chunk,
+    # seconds between polls for new jobs, seconds without a checkpoint after which a
+    # running job is taken over, attempts before a failing job is given up, and where
+    # exports and uploaded import files are kept
+    JOBS_ENABLED: bool = True
+    JOB_WORKERS: int = 2
+    JOB_CHUNK_SIZE: int = 500
+    JOB_POLL_SECONDS: float = 2.0
+    JOB_LEASE_SECONDS: float = 60.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOBS_DIR: str = "./job_files"
+    
+    # Idempotency-Key on /submit-health-data: seconds a stored response is replayed
+    # for retries, and seconds after which an unfinished claim (its worker died) is
+    # taken over by a retry
+    IDEMPOTENCY_TTL_SECONDS: float = 24 * 60 * 60
+    IDEMPOTENCY_LOCK_SECONDS: float = 60.0
+    
+    # Admission control: requests running at once and waiting for a slot per lane
+    # (reads, writes, batch uploads), seconds a request may wait before it is answered
+    # 503, and the Retry-After sent with it. /health and /metrics are never queued
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_READ_LIMIT: int = 64
+    ADMISSION_READ_QUEUE: int = 256
+    ADMISSION_WRITE_LIMIT: int = 4
+    ADMISSION_WRITE_QUEUE: int = 64
+    ADMISSION_BATCH_LIMIT: int = 2
+    ADMISSION_BATCH_QUEUE: int = 4
+    ADMISSION_QUEUE_TIMEOUT: float = 2.0
+    ADMISSION_RETRY_AFTER: int = 1
+    
+    # Risk Thresholds (risk levels and the recommendations chosen from them)
     LOW_RISK_THRESHOLD: float = 30.0
     MODERATE_RISK_THRESHOLD: float = 60.0
     HIGH_RISK_THRESHOLD: float = 100.0
@@ -2,5 +2,7 @@
 
 from db.database import get_db, init_db
 from db.crud import db_crud
+from db.jobs import job_store
+from db.idempotency import idempotency_store
 
-__all__ = ['get_db', 'init_db', 'db_crud']
+__all__ = ['get_db', 'init_db', 'db_crud', 'job_store', 'idempotency_store']
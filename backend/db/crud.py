@@ -5,6 +5,8 @@ import sqlite3
 from typing import List, Dict, Optional
 from datetime import datetime
 from config import settings
+from cache import recommendations_cache
+from db.pool import ConnectionPool
 
 
 class HealthDataCRUD:
@@ -12,31 +14,45 @@ class HealthDataCRUD:
     
     def __init__(self):
         self.db_path = settings.DATABASE_URL.replace('sqlite:///', '')
+        self.pool = ConnectionPool(self.db_path, size=settings.DB_POOL_SIZE, wal=settings.DB_WAL)
     
     def _get_connection(self):
-        """Get database connection"""
-        return sqlite3.connect(self.db_path)
+        """Get a pooled database connection; close() returns it to this process's pool"""
+        return self.pool.connection()
+    
+    def reset_pool(self):
+        """Give a freshly forked worker its own connections"""
+        self.pool.reset()
+    
+    @staticmethod
+    def _bump_data_version(conn, user_ids):
+        """Mark the users' analyses changed, in the writer's transaction (creates missing users)"""
+        conn.executemany("""
+            INSERT INTO users (user_id, data_version) VALUES (?, 1)
+            ON CONFLICT(user_id) DO UPDATE SET data_version = data_version + 1, updated_at = CURRENT_TIMESTAMP
+        """, [(user_id,) for user_id in user_ids])
     
     def create_user(self, user_id: str) -> bool:
         """Create a new user if not exists"""
+        conn = self._get_connection()
         try:
-            conn = self._get_connection()
             cursor = conn.cursor()
             cursor.execute(
                 "INSERT OR IGNORE INTO users (user_id) VALUES (?)",
                 (user_id,)
             )
             conn.commit()
-            conn.close()
             return True
         except Exception as e:
             print(f"Error creating user: {e}")
             return False
+        finally:
+            conn.close()
     
     def save_health_data(self, user_id: str, metrics: Dict, bmi: float) -> Optional[int]:
         """Save health data to database"""
+        conn = self._get_connection()
         try:
-            conn = self._get_connection()
             cursor = conn.cursor()
             
             # Ensure user exists
@@ -59,23 +75,25 @@ class HealthDataCRUD:
             
             data_id = cursor.lastrowid
             conn.commit()
-            conn.close()
             return data_id
         except Exception as e:
             print(f"Error saving health data: {e}")
             return None
+        finally:
+            conn.close()
     
-    def save_predictions(self, user_id: str, risk_scores: Dict, explanations: Dict) -> Optional[int]:
-        """Save prediction results"""
+    def save_predictions(self, user_id: str, risk_scores: Dict, explanations: Dict,
+                         health_data_id: Optional[int] = None) -> Optional[int]:
+        """Save prediction results (health_data_id: the health record they were computed from)"""
+        conn = self._get_connection()
         try:
-            conn = self._get_connection()
             cursor = conn.cursor()
             
             cursor.execute("""
                 INSERT INTO predictions 
                 (user_id, diabetes_risk, heart_disease_risk, cholesterol_risk,
-                 diabetes_explanation, heart_disease_explanation, cholesterol_explanation)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                 diabetes_explanation, heart_disease_explanation, cholesterol_explanation, health_data_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 user_id,
                 risk_scores.get('diabetes', 0),
@@ -83,21 +101,26 @@ class HealthDataCRUD:
                 risk_scores.get('high_cholesterol', 0),
                 explanations.get('diabetes', ''),
                 explanations.get('heart_disease', ''),
-                explanations.get('high_cholesterol', '')
+                explanations.get('high_cholesterol', ''),
+                health_data_id
             ))
             
             prediction_id = cursor.lastrowid
+            self._bump_data_version(conn, [user_id])
             conn.commit()
-            conn.close()
+            # The user's latest analysis changed
+            recommendations_cache.invalidate(user_id)
             return prediction_id
         except Exception as e:
             print(f"Error saving predictions: {e}")
             return None
+        finally:
+            conn.close()
     
     def save_recommendations(self, user_id: str, prediction_id: int, recommendations: Dict) -> bool:
         """Save recommendations"""
+        conn = self._get_connection()
         try:
-            conn = self._get_connection()
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -113,61 +136,75 @@ class HealthDataCRUD:
                 recommendations.get('high_cholesterol', '')
             ))
             
+            self._bump_data_version(conn, [user_id])
             conn.commit()
-            conn.close()
+            recommendations_cache.invalidate(user_id)
             return True
         except Exception as e:
             print(f"Error saving recommendations: {e}")
             return False
+        finally:
+            conn.close()
     
     def get_user_history(self, user_id: str, limit: int = 10) -> List[Dict]:
         """Get user's health data history"""
+        conn = self._get_connection()
         try:
-            conn = self._get_connection()
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
             cursor.execute("""
                 SELECT * FROM health_data 
                 WHERE user_id = ? 
-                ORDER BY created_at DESC 
+                ORDER BY created_at DESC, id DESC
                 LIMIT ?
             """, (user_id, limit))
             
             rows = cursor.fetchall()
-            conn.close()
             
             return [dict(row) for row in rows]
         except Exception as e:
             print(f"Error getting user history: {e}")
             return []
+        finally:
+            conn.close()
     
     def get_user_predictions(self, user_id: str, limit: int = 10) -> List[Dict]:
         """Get user's prediction history"""
+        conn = self._get_connection()
         try:
-            conn = self._get_connection()
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
             cursor.execute("""
                 SELECT * FROM predictions 
                 WHERE user_id = ? 
-                ORDER BY created_at DESC 
+                ORDER BY created_at DESC, id DESC
                 LIMIT ?
             """, (user_id, limit))
             
             rows = cursor.fetchall()
-            conn.close()
             
             return [dict(row) for row in rows]
         except Exception as e:
             print(f"Error getting user predictions: {e}")
             return []
+        finally:
+            conn.close()
+    
+    def get_data_version(self, user_id: str) -> Optional[int]:
+        """Counter bumped by every change to the user's analyses (None for an unknown user)"""
+        conn = self._get_connection()
+        try:
+            row = conn.execute("SELECT data_version FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
     
     def get_latest_analysis(self, user_id: str) -> Optional[Dict]:
         """Get the latest complete analysis for a user"""
+        conn = self._get_connection()
         try:
-            conn = self._get_connection()
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
@@ -180,12 +217,11 @@ class HealthDataCRUD:
                 FROM predictions p
                 LEFT JOIN recommendations r ON p.id = r.prediction_id
                 WHERE p.user_id = ?
-                ORDER BY p.created_at DESC
+                ORDER BY p.created_at DESC, p.id DESC
                 LIMIT 1
             """, (user_id,))
             
             row = cursor.fetchone()
-            conn.close()
             
             if row:
                 return dict(row)
@@ -193,6 +229,171 @@ class HealthDataCRUD:
         except Exception as e:
             print(f"Error getting latest analysis: {e}")
             return None
+        finally:
+            conn.close()
+
+    
+    # Batch operations for background jobs. Writes take the connection of the job's
+    # chunk transaction, and errors propagate so the chunk is rolled back and retried
+    
+    def count_predictions(self) -> int:
+        conn = self._get_connection()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+        finally:
+            conn.close()
+    
+    def get_predictions_with_metrics(self, after_id: int, limit: int) -> List[Dict]:
+        """
+        Predictions with id > after_id, in id order, each with the metrics of the
+        health record it was computed from (metric columns are None when unknown)
+        
+        Predictions saved before health_data_id was recorded are matched to the
+        user's latest health record at or before them, but only when no other
+        record or prediction of the user falls in the same window (timestamps
+        have one-second resolution, so rapid resubmissions can't be told apart)
+        """
+        conn = self._get_connection()
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute("""
+                SELECT
+                    p.id, p.user_id, p.diabetes_risk, p.heart_disease_risk, p.cholesterol_risk,
+                    h.age, h.weight, h.height, h.blood_pressure, h.cholesterol_level, h.lifestyle_info
+                FROM predictions p
+                LEFT JOIN health_data h ON h.id = COALESCE(p.health_data_id, (
+                    SELECT MAX(h2.id) FROM health_data h2
+                    WHERE h2.user_id = p.user_id
+                      AND h2.created_at = (
+                          SELECT MAX(created_at) FROM health_data
+                          WHERE user_id = p.user_id AND created_at <= p.created_at
+                      )
+                    HAVING COUNT(*) = 1 AND (
+                        SELECT COUNT(*) FROM predictions p2
+                        WHERE p2.user_id = p.user_id
+                          AND p2.created_at BETWEEN MAX(h2.created_at) AND p.created_at
+                    ) = 1
+                ))
+                WHERE p.id > ?
+                ORDER BY p.id
+                LIMIT ?
+            """, (after_id, limit)).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+    
+    def update_analyses(self, conn, analyses: List[Dict]):
+        """
+        Overwrite stored predictions and their recommendations
+        
+        Args:
+            analyses: dicts of prediction_id, risk_scores, explanations, recommendations
+        """
+        conn.executemany("""
+            UPDATE predictions
+            SET diabetes_risk = ?, heart_disease_risk = ?, cholesterol_risk = ?,
+                diabetes_explanation = ?, heart_disease_explanation = ?, cholesterol_explanation = ?
+            WHERE id = ?
+        """, [(
+            a['risk_scores']['diabetes'], a['risk_scores']['heart_disease'], a['risk_scores']['high_cholesterol'],
+            a['explanations']['diabetes'], a['explanations']['heart_disease'], a['explanations']['high_cholesterol'],
+            a['prediction_id']
+        ) for a in analyses])
+        conn.executemany("""
+            UPDATE recommendations
+            SET diabetes_recommendation = ?, heart_disease_recommendation = ?, cholesterol_recommendation = ?
+            WHERE prediction_id = ?
+        """, [(
+            a['recommendations']['diabetes'], a['recommendations']['heart_disease'],
+            a['recommendations']['high_cholesterol'], a['prediction_id']
+        ) for a in analyses])
+        conn.executemany("""
+            UPDATE users SET data_version = data_version + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE user_id = (SELECT user_id FROM predictions WHERE id = ?)
+        """, [(a['prediction_id'],) for a in analyses])
+    
+    def insert_analyses(self, conn, analyses: List[Dict]):
+        """
+        Save complete analyses (health data, predictions, recommendations), as
+        /submit-health-data does for one
+        
+        Args:
+            analyses: dicts of user_id, metrics, bmi, risk_scores, explanations, recommendations
+        """
+        self._bump_data_version(conn, {a['user_id'] for a in analyses})
+        for a in analyses:
+            health_data_id = conn.execute("""
+                INSERT INTO health_data
+                (user_id, age, weight, height, blood_pressure, cholesterol_level, lifestyle_info, bmi)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                a['user_id'], a['metrics']['age'], a['metrics']['weight'], a['metrics']['height'],
+                a['metrics']['blood_pressure'], a['metrics']['cholesterol_level'], a['metrics']['lifestyle_info'],
+                a['bmi']
+            )).lastrowid
+            cursor = conn.execute("""
+                INSERT INTO predictions
+                (user_id, diabetes_risk, heart_disease_risk, cholesterol_risk,
+                 diabetes_explanation, heart_disease_explanation, cholesterol_explanation, health_data_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                a['user_id'],
+                a['risk_scores']['diabetes'], a['risk_scores']['heart_disease'], a['risk_scores']['high_cholesterol'],
+                a['explanations']['diabetes'], a['explanations']['heart_disease'], a['explanations']['high_cholesterol'],
+                health_data_id
+            ))
+            conn.execute("""
+                INSERT INTO recommendations
+                (user_id, prediction_id, diabetes_recommendation,
+                 heart_disease_recommendation, cholesterol_recommendation)
+                VALUES (?, ?, ?, ?, ?)
+            """, (
+                a['user_id'], cursor.lastrowid, a['recommendations']['diabetes'],
+                a['recommendations']['heart_disease'], a['recommendations']['high_cholesterol']
+            ))
+    
+    def count_user_records(self, user_id: str) -> int:
+        """Health records plus predictions stored for a user"""
+        conn = self._get_connection()
+        try:
+            return conn.execute("""
+                SELECT (SELECT COUNT(*) FROM health_data WHERE user_id = ?)
+                     + (SELECT COUNT(*) FROM predictions WHERE user_id = ?)
+            """, (user_id, user_id)).fetchone()[0]
+        finally:
+            conn.close()
+    
+    def get_user_records(self, table: str, user_id: str, after_id: int, limit: int) -> List[Dict]:
+        """
+        A user's rows with id > after_id, in id order
+        
+        Args:
+            table: 'health_data', or 'predictions' (rows include their recommendations)
+        """
+        if table == 'health_data':
+            query = "SELECT * FROM health_data WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?"
+        elif table == 'predictions':
+            query = """
+                SELECT
+                    p.*,
+                    r.diabetes_recommendation,
+                    r.heart_disease_recommendation,
+                    r.cholesterol_recommendation
+                FROM predictions p
+                LEFT JOIN recommendations r ON p.id = r.prediction_id
+                WHERE p.user_id = ? AND p.id > ?
+                ORDER BY p.id
+                LIMIT ?
+            """
+        else:
+            raise ValueError(f"Unknown table {table}")
+        conn = self._get_connection()
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(query, (user_id, after_id, limit)).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
 
 
 # Singleton instance
@@ -35,10 +35,33 @@ def get_db():
         db.close()
 
 
-def init_db():
-    """Initialize database with schema"""
+def _migrate(cursor):
+    """Add columns introduced after a database was created (CREATE TABLE IF NOT EXISTS skips existing tables)"""
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(predictions)")}
+    if 'health_data_id' not in columns:
+        cursor.execute("ALTER TABLE predictions ADD COLUMN health_data_id INTEGER REFERENCES health_data(id)")
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(users)")}
+    if 'data_version' not in columns:
+        cursor.execute("ALTER TABLE users ADD COLUMN data_version INTEGER NOT NULL DEFAULT 0")
+
+
+# Set once the schema has been applied in this process; forked workers inherit it
+_initialized = False
+
+
+def init_db(force: bool = False):
+    """
+    Initialize database with schema
+    
+    Runs once per process tree: the multi-worker launcher calls it in the master
+    before forking, so workers skip it on startup
+    """
+    global _initialized
     import sqlite3
     
+    if _initialized and not force:
+        return
+    
     # Read and execute schema
     schema_path = os.path.join(os.path.dirname(__file__), 'schema.sql')
     if os.path.exists(schema_path):
@@ -48,8 +71,13 @@ def init_db():
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
         cursor.executescript(schema)
+        _migrate(cursor)
+        if settings.DB_WAL:
+            # Persistent on the database file; lets workers read while one writes
+            cursor.execute("PRAGMA journal_mode=WAL")
         conn.commit()
         conn.close()
+        _initialized = True
         print("Database initialized successfully")
     else:
         print(f"Schema file not found at {schema_path}")
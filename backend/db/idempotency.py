@@ -0,0 +1,114 @@
+"""
+Idempotency keys
+A client that may retry /submit-health-data sends an Idempotency-Key header.
+The first request with a key claims it (a row without a response), runs, and
+stores its response; a retry with the same key and body gets the stored
+response back without scoring or writing anything. Keys expire after a TTL
+and are purged as new ones are claimed.
+"""
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Dict, Optional, Tuple
+
+from config import settings
+from db.crud import db_crud
+
+# begin() outcomes
+NEW = "new"
+REPLAY = "replay"
+IN_PROGRESS = "in_progress"
+MISMATCH = "mismatch"
+
+MAX_KEY_LENGTH = 255
+# Seconds between purges of expired keys (per process)
+PURGE_INTERVAL = 60.0
+
+
+def fingerprint(payload: Dict) -> bytes:
+    """SHA-256 of a request body, independent of key order"""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).digest()
+
+
+class IdempotencyStore:
+    """Claims, stored responses and expiry of idempotency keys"""
+
+    def __init__(self, pool, ttl: float, lock_seconds: float):
+        self.pool = pool
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+        self._next_purge = 0.0
+
+    def begin(self, key: str, request_fingerprint: bytes) -> Tuple[str, Optional[Tuple[int, bytes]]]:
+        """
+        Claim a key for a request, or find what an earlier request with it left
+
+        A claim whose request never completed (its worker died) is taken over
+        after lock_seconds
+
+        Returns:
+            (NEW, None) - claimed: process the request, then complete() or abandon()
+            (REPLAY, (status code, body)) - answer with the stored response
+            (IN_PROGRESS, None) - the first request is still running
+            (MISMATCH, None) - the key was used for a different request body
+        """
+        now = time.time()
+        conn = self.pool.connection()
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if now >= self._next_purge:
+                conn.execute("DELETE FROM idempotency_keys WHERE stored_at < ?", (now - self.ttl,))
+                self._next_purge = now + PURGE_INTERVAL
+            row = conn.execute(
+                "SELECT fingerprint, status_code, response, stored_at FROM idempotency_keys WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None or row["stored_at"] < now - self.ttl:
+                outcome = NEW, None
+            elif row["fingerprint"] != request_fingerprint:
+                outcome = MISMATCH, None
+            elif row["response"] is not None:
+                outcome = REPLAY, (row["status_code"], row["response"])
+            elif row["stored_at"] >= now - self.lock_seconds:
+                outcome = IN_PROGRESS, None
+            else:
+                outcome = NEW, None
+            if outcome[0] == NEW:
+                conn.execute(
+                    "INSERT OR REPLACE INTO idempotency_keys (key, fingerprint, stored_at) VALUES (?, ?, ?)",
+                    (key, request_fingerprint, now)
+                )
+            conn.commit()
+            return outcome
+        finally:
+            conn.close()
+
+    def complete(self, key: str, status_code: int, body: bytes):
+        """Store the response of a claimed key; the TTL runs from now"""
+        conn = self.pool.connection()
+        try:
+            conn.execute(
+                "UPDATE idempotency_keys SET status_code = ?, response = ?, stored_at = ? "
+                "WHERE key = ? AND response IS NULL",
+                (status_code, body, time.time(), key)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def abandon(self, key: str):
+        """Release a claim whose request failed, so a retry runs it again"""
+        conn = self.pool.connection()
+        try:
+            conn.execute("DELETE FROM idempotency_keys WHERE key = ? AND response IS NULL", (key,))
+            conn.commit()
+        finally:
+            conn.close()
+
+
+# Singleton instance (shares the CRUD connection pool, so forked workers reset both)
+idempotency_store = IdempotencyStore(
+    db_crud.pool, ttl=settings.IDEMPOTENCY_TTL_SECONDS, lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS
+)
@@ -0,0 +1,182 @@
+"""
+Background job records
+Jobs are rows in the jobs table: submitted as 'queued', claimed by one worker
+('running', with a lease kept alive by heartbeats), and finished as
+'completed', 'failed' or 'cancelled'. A handler commits each chunk of work in
+the same transaction as the job's checkpoint, so a job taken over after its
+worker died resumes exactly after the last committed chunk.
+"""
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from db.crud import db_crud
+
+FINISHED = ("completed", "failed", "cancelled")
+
+
+class LeaseLost(Exception):
+    """The job was taken over by another worker (or finished) while this one ran it"""
+
+
+def _decode(row: sqlite3.Row) -> Dict:
+    job = dict(row)
+    for field in ("params", "checkpoint", "result"):
+        job[field] = json.loads(job[field]) if job[field] else None
+    job["cancel_requested"] = bool(job["cancel_requested"])
+    return job
+
+
+class JobStore:
+    """CRUD operations for jobs"""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def create(self, job_type: str, params: Optional[Dict] = None) -> Dict:
+        """Queue a job; returns its record"""
+        job_id = uuid.uuid4().hex
+        conn = self.pool.connection()
+        try:
+            conn.execute(
+                "INSERT INTO jobs (id, type, params) VALUES (?, ?, ?)",
+                (job_id, job_type, json.dumps(params or {}))
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        conn = self.pool.connection()
+        conn.row_factory = sqlite3.Row
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return _decode(row) if row else None
+
+    def claim(self, owner: str, lease_seconds: float) -> Optional[Dict]:
+        """
+        Take the oldest queued job, or a running one whose lease has expired
+
+        Returns:
+            The claimed job (now owned by owner), or None
+        """
+        now = time.time()
+        conn = self.pool.connection()
+        conn.row_factory = sqlite3.Row
+        try:
+            # IMMEDIATE: only one worker (in any process) picks at a time
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("""
+                SELECT id FROM jobs
+                WHERE status = 'queued'
+                   OR (status = 'running' AND heartbeat_at < ?)
+                ORDER BY created_at, rowid
+                LIMIT 1
+            """, (now - lease_seconds,)).fetchone()
+            if row is None:
+                conn.rollback()
+                return None
+            conn.execute("""
+                UPDATE jobs
+                SET status = 'running', owner = ?, heartbeat_at = ?, attempts = attempts + 1,
+                    started_at = COALESCE(started_at, CURRENT_TIMESTAMP)
+                WHERE id = ?
+            """, (owner, now, row["id"]))
+            job = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+            conn.commit()
+        finally:
+            conn.close()
+        return _decode(job)
+
+    @contextmanager
+    def chunk(self, job: Dict):
+        """
+        Transaction for one chunk of a job's work
+
+        The handler does its writes on the yielded connection and records its
+        position with checkpoint(); both are committed together, and only if
+        the job is still owned by this worker (else LeaseLost, rolled back)
+        """
+        conn = self.pool.connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def checkpoint(self, conn, job: Dict, checkpoint: Dict, processed: int, total: Optional[int] = None):
+        """Record progress inside a chunk() transaction; renews the lease"""
+        cursor = conn.execute("""
+            UPDATE jobs
+            SET checkpoint = ?, processed = ?, total = COALESCE(?, total), heartbeat_at = ?
+            WHERE id = ? AND owner = ? AND status = 'running'
+        """, (json.dumps(checkpoint), processed, total, time.time(), job["id"], job["owner"]))
+        if cursor.rowcount != 1:
+            raise LeaseLost(job["id"])
+        job["checkpoint"] = checkpoint
+        job["processed"] = processed
+        if total is not None:
+            job["total"] = total
+
+    def cancel_requested(self, job_id: str) -> bool:
+        conn = self.pool.connection()
+        try:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return bool(row and row[0])
+
+    def request_cancel(self, job_id: str) -> Optional[Dict]:
+        """Cancel a queued job now; a running one stops after its current chunk"""
+        conn = self.pool.connection()
+        try:
+            conn.execute("""
+                UPDATE jobs
+                SET status = CASE WHEN status = 'queued' THEN 'cancelled' ELSE status END,
+                    finished_at = CASE WHEN status = 'queued' THEN CURRENT_TIMESTAMP ELSE finished_at END,
+                    cancel_requested = 1
+                WHERE id = ? AND status NOT IN ('completed', 'failed', 'cancelled')
+            """, (job_id,))
+            conn.commit()
+        finally:
+            conn.close()
+        return self.get(job_id)
+
+    def finish(self, job: Dict, status: str, result: Optional[Dict] = None, error: Optional[str] = None):
+        """Mark a job this worker owns as finished"""
+        conn = self.pool.connection()
+        try:
+            conn.execute("""
+                UPDATE jobs
+                SET status = ?, result = ?, error = ?, owner = NULL, finished_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND owner = ?
+            """, (status, json.dumps(result) if result is not None else None, error, job["id"], job["owner"]))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def release(self, job: Dict):
+        """Hand a job back to the queue (worker shutting down); it resumes from its checkpoint"""
+        conn = self.pool.connection()
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL WHERE id = ? AND owner = ? AND status = 'running'",
+                (job["id"], job["owner"])
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+
+# Singleton instance (shares the CRUD connection pool, so forked workers reset both)
+job_store = JobStore(db_crud.pool)
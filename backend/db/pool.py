@@ -0,0 +1,84 @@
+"""
+Per-process SQLite connection pool
+Connections are reused instead of opened per query. A pool belongs to one
+process: after a fork (gunicorn workers) the inherited connections are dropped
+and the worker opens its own.
+"""
+import os
+import sqlite3
+import threading
+from typing import List
+
+
+class PooledConnection:
+    """sqlite3 connection whose close() hands it back to the pool"""
+
+    __slots__ = ("_conn", "_pool")
+
+    def __init__(self, conn: sqlite3.Connection, pool: "ConnectionPool"):
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "_pool", pool)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        # e.g. row_factory; reset when the connection is returned
+        setattr(self._conn, name, value)
+
+    def close(self):
+        if self._conn is not None:
+            self._pool.release(self._conn)
+            object.__setattr__(self, "_conn", None)
+
+
+class ConnectionPool:
+    """Keeps up to size idle connections; more are opened when all are in use"""
+
+    def __init__(self, db_path: str, size: int = 5, wal: bool = True, busy_timeout: float = 5.0):
+        self.db_path = db_path
+        self.size = size
+        self.wal = wal
+        self.busy_timeout = busy_timeout
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False)
+        if self.wal:
+            # Readers don't block the writer across worker processes; NORMAL is durable in WAL mode
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _check_process(self):
+        if os.getpid() != self._pid:
+            # Inherited from the parent: never use (or close) the parent's handles
+            self._idle = []
+            self._lock = threading.Lock()
+            self._pid = os.getpid()
+
+    def connection(self) -> PooledConnection:
+        self._check_process()
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        return PooledConnection(conn or self._connect(), self)
+
+    def release(self, conn: sqlite3.Connection):
+        if os.getpid() != self._pid:
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = None
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def reset(self):
+        """Drop idle connections (called in each worker right after fork)"""
+        self._idle = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
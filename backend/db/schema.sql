@@ -1,9 +1,11 @@
 -- HealthNexus AI Database Schema
 
--- Users table
+-- Users table. data_version is bumped with every change to the user's predictions
+-- or recommendations, so each worker can check its cached responses against it
 CREATE TABLE IF NOT EXISTS users (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     user_id TEXT UNIQUE NOT NULL,
+    data_version INTEGER NOT NULL DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -33,8 +35,10 @@ CREATE TABLE IF NOT EXISTS predictions (
     diabetes_explanation TEXT,
     heart_disease_explanation TEXT,
     cholesterol_explanation TEXT,
+    health_data_id INTEGER,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (user_id) REFERENCES users(user_id)
+    FOREIGN KEY (user_id) REFERENCES users(user_id),
+    FOREIGN KEY (health_data_id) REFERENCES health_data(id)
 );
 
 -- Recommendations table
@@ -50,9 +54,46 @@ CREATE TABLE IF NOT EXISTS recommendations (
     FOREIGN KEY (prediction_id) REFERENCES predictions(id)
 );
 
+-- Background jobs (rescoring, exports, bulk imports). A job is claimed by one
+-- worker (owner) and keeps its lease by updating heartbeat_at; checkpoint holds
+-- the position of the last committed chunk, so a job whose worker died resumes there
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    params TEXT,
+    checkpoint TEXT,
+    processed INTEGER NOT NULL DEFAULT 0,
+    total INTEGER,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    heartbeat_at REAL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+-- Responses of /submit-health-data by Idempotency-Key, so a retried request is
+-- answered without writing again. fingerprint is the SHA-256 of the request body;
+-- response is NULL while the first request is still being processed. Rows expire
+-- IDEMPOTENCY_TTL_SECONDS after stored_at
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key TEXT PRIMARY KEY,
+    fingerprint BLOB NOT NULL,
+    status_code INTEGER,
+    response BLOB,
+    stored_at REAL NOT NULL
+) WITHOUT ROWID;
+
 -- Create indexes for better query performance
 CREATE INDEX IF NOT EXISTS idx_health_data_user_id ON health_data(user_id);
 CREATE INDEX IF NOT EXISTS idx_health_data_created_at ON health_data(created_at);
 CREATE INDEX IF NOT EXISTS idx_predictions_user_id ON predictions(user_id);
 CREATE INDEX IF NOT EXISTS idx_predictions_created_at ON predictions(created_at);
 CREATE INDEX IF NOT EXISTS idx_recommendations_user_id ON recommendations(user_id);
+CREATE INDEX IF NOT EXISTS idx_recommendations_prediction_id ON recommendations(prediction_id);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_stored_at ON idempotency_keys(stored_at);
@@ -0,0 +1,69 @@
+"""
+Fast-path JSON responses
+Handlers that return data the backend built itself (scores, stored rows,
+template text) skip response-model validation and jsonable_encoder and are
+encoded once with orjson when it is installed, falling back to the standard
+json module. Static recommendation text is encoded once and spliced in as
+pre-serialized fragments.
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict
+
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional: the standard library encoder is used instead
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON, matching FastAPI's default JSONResponse output"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+def loads(data):
+    """Parse JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(Response):
+    """JSON response for trusted internal data (no validation, no jsonable_encoder pass)"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            # Already encoded, e.g. assembled from pre-serialized fragments
+            return content
+        return dumps(content)
+
+
+def health_response_body(user_id: str, risk_scores: Dict[str, float], recommendations: bytes,
+                         explanations: Dict[str, str], timestamp: datetime) -> bytes:
+    """
+    HealthResponse JSON with the recommendations object spliced in pre-encoded
+
+    Produces the same document as HealthResponse(...) serialized by FastAPI.
+    """
+    return b"".join((
+        b'{"user_id":', dumps(user_id),
+        b',"risk_scores":', dumps(risk_scores),
+        b',"recommendations":', recommendations,
+        b',"explanations":', dumps(explanations),
+        b',"timestamp":', dumps(timestamp),
+        b"}",
+    ))
@@ -0,0 +1,51 @@
+"""
+Production launcher configuration (gunicorn with uvicorn workers)
+
+    cd backend && gunicorn -c gunicorn_conf.py app:app
+
+The app is imported once in the master (preload), so the predictor,
+recommendation templates and pre-encoded response fragments are built before
+forking and shared copy-on-write by every worker. The schema is applied once in
+the master; each worker opens its own database connections after the fork.
+"""
+import gc
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import settings  # noqa: E402
+
+try:
+    import uvicorn_worker  # noqa: F401  (uvicorn >= 0.30 moved the worker class here)
+    worker_class = "uvicorn_worker.UvicornWorker"
+except ImportError:
+    worker_class = "uvicorn.workers.UvicornWorker"
+
+# $PORT is set by Procfile-style platforms
+bind = f"{settings.HOST}:{os.environ.get('PORT', settings.PORT)}"
+workers = settings.WORKERS or multiprocessing.cpu_count()
+preload_app = True
+loglevel = settings.LOG_LEVEL.lower()
+accesslog = "-"
+
+
+def on_starting(server):
+    """Apply the schema once, before any worker exists"""
+    from db.database import init_db
+    init_db()
+
+
+def when_ready(server):
+    """
+    Move everything loaded so far out of the garbage collector's reach, so
+    collections in the workers don't write to (and un-share) preloaded pages
+    """
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Each worker binds to its own connection pool"""
+    from db.crud import db_crud
+    db_crud.reset_pool()
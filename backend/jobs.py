@@ -0,0 +1,346 @@
+"""
+Background jobs
+Long-running work (rescoring every stored prediction, exporting a user's full
+history, importing a cohort file) runs on a pool of worker threads in each API
+process instead of inside a request. Jobs live in the database (db/jobs.py):
+any worker of any process can claim one, work is done in chunks committed
+together with a checkpoint, and a job whose worker stopped or died is picked up
+again and resumes after its last committed chunk.
+"""
+import logging
+import os
+import socket
+import threading
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from config import settings
+from validators import calculate_bmi
+from ai.risk_predictor import risk_predictor
+from ai.recommendation_engine import recommendation_engine
+from batch_stream import parse_header, parse_row, validate_row
+from cache import recommendations_cache
+from db.crud import db_crud
+from db.jobs import LeaseLost, job_store
+from fast_json import dumps
+
+logger = logging.getLogger(__name__)
+
+CONDITIONS = ("diabetes", "heart_disease", "high_cholesterol")
+
+# Errors of individual rows kept in a bulk import's result
+MAX_IMPORT_ERRORS = 100
+
+
+class JobCancelled(Exception):
+    """Cancellation was requested through the API"""
+
+
+class JobInterrupted(Exception):
+    """The worker is shutting down; the job goes back to the queue"""
+
+
+class JobContext:
+    """What a handler gets: its job record and the chunk/checkpoint helpers"""
+
+    def __init__(self, job: Dict, stop: threading.Event, chunk_size: int):
+        self.job = job
+        self.params = job["params"] or {}
+        self.chunk_size = chunk_size
+        self._stop = stop
+
+    def check(self):
+        """Call between chunks: stops the handler on shutdown or cancellation"""
+        if self._stop.is_set():
+            raise JobInterrupted()
+        if job_store.cancel_requested(self.job["id"]):
+            raise JobCancelled()
+
+    def chunk(self):
+        return job_store.chunk(self.job)
+
+    def checkpoint(self, conn, checkpoint: Dict, processed: int, total: Optional[int] = None):
+        job_store.checkpoint(conn, self.job, checkpoint, processed, total)
+
+
+def score_records(records: List[Dict]) -> List[Dict]:
+    """risk_scores, explanations and recommendations for each set of metrics (one vectorized pass)"""
+    if not records:
+        return []
+    scores = risk_predictor.predict_frame(pd.DataFrame(records))
+    analyses = []
+    for row in scores.to_dict("records"):
+        risk_scores = {condition: row[condition] for condition in CONDITIONS}
+        analyses.append({
+            "risk_scores": risk_scores,
+            "explanations": {condition: row[condition + "_explanation"] for condition in CONDITIONS},
+            "recommendations": recommendation_engine.generate_recommendations(risk_scores),
+        })
+    return analyses
+
+
+def export_path(job_id: str) -> Path:
+    return Path(settings.JOBS_DIR) / "exports" / f"{job_id}.ndjson"
+
+
+def import_path(name: str) -> Path:
+    return Path(settings.JOBS_DIR) / "imports" / name
+
+
+def rescore_all(ctx: JobContext) -> Dict:
+    """
+    Recompute every stored prediction and its recommendations with the current
+    rules and risk thresholds, from the health record it was computed from
+    """
+    checkpoint = ctx.job["checkpoint"] or {"last_id": 0, "changed": 0, "skipped": 0}
+    processed = ctx.job["processed"]
+    total = ctx.job["total"] or db_crud.count_predictions()
+    while True:
+        ctx.check()
+        rows = db_crud.get_predictions_with_metrics(checkpoint["last_id"], ctx.chunk_size)
+        if not rows:
+            break
+        # Predictions without a health record to recompute from are left as they are
+        scorable = [row for row in rows if row["age"] is not None]
+        analyses = score_records([
+            {field: row[field] for field in
+             ("age", "weight", "height", "blood_pressure", "cholesterol_level", "lifestyle_info")}
+            for row in scorable
+        ])
+        changed = 0
+        for row, analysis in zip(scorable, analyses):
+            analysis["prediction_id"] = row["id"]
+            scores = analysis["risk_scores"]
+            if (scores["diabetes"], scores["heart_disease"], scores["high_cholesterol"]) != (
+                    row["diabetes_risk"], row["heart_disease_risk"], row["cholesterol_risk"]):
+                changed += 1
+
+        processed += len(rows)
+        checkpoint = {
+            "last_id": rows[-1]["id"],
+            "changed": checkpoint["changed"] + changed,
+            "skipped": checkpoint["skipped"] + len(rows) - len(scorable),
+        }
+        with ctx.chunk() as conn:
+            db_crud.update_analyses(conn, analyses)
+            ctx.checkpoint(conn, checkpoint, processed, max(total, processed))
+        for user_id in {row["user_id"] for row in scorable}:
+            recommendations_cache.invalidate(user_id)
+
+    return {"predictions": processed, "scores_changed": checkpoint["changed"], "skipped": checkpoint["skipped"]}
+
+
+def export_user_history(ctx: JobContext) -> Dict:
+    """Write all of a user's health records and analyses to an NDJSON file"""
+    user_id = ctx.params["user_id"]
+    path = export_path(ctx.job["id"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    checkpoint = ctx.job["checkpoint"] or {"table": "health_data", "last_id": 0, "offset": 0}
+    processed = ctx.job["processed"]
+    total = ctx.job["total"] or db_crud.count_user_records(user_id)
+    tables = ["health_data", "predictions"]
+
+    with open(path, "r+b" if path.exists() else "w+b") as f:
+        # Anything written after the last checkpoint is written again
+        f.truncate(checkpoint["offset"])
+        f.seek(checkpoint["offset"])
+        for table in tables[tables.index(checkpoint["table"]):]:
+            last_id = checkpoint["last_id"] if table == checkpoint["table"] else 0
+            while True:
+                ctx.check()
+                rows = db_crud.get_user_records(table, user_id, last_id, ctx.chunk_size)
+                if not rows:
+                    break
+                f.write(b"".join(dumps({"record": table, **row}) + b"\n" for row in rows))
+                f.flush()
+                os.fsync(f.fileno())
+                last_id = rows[-1]["id"]
+                processed += len(rows)
+                checkpoint = {"table": table, "last_id": last_id, "offset": f.tell()}
+                with ctx.chunk() as conn:
+                    ctx.checkpoint(conn, checkpoint, processed, max(total, processed))
+        size = f.tell()
+
+    return {"user_id": user_id, "records": processed, "file": path.name, "bytes": size}
+
+
+def bulk_import(ctx: JobContext) -> Dict:
+    """
+    Import a cohort file (NDJSON or CSV, as for /get-predictions/stream) and
+    save a complete analysis for every valid row, as /submit-health-data does
+    """
+    fmt = ctx.params["format"]
+    path = import_path(ctx.params["file"])
+    checkpoint = ctx.job["checkpoint"] or {"offset": 0, "rows": 0, "imported": 0, "failed": 0, "errors": []}
+    total = ctx.job["total"]
+
+    with open(path, "rb") as f:
+        header = None
+        if fmt == "csv":
+            header = parse_header(f.readline())
+            if not checkpoint["offset"]:
+                checkpoint["offset"] = f.tell()
+        if total is None:
+            f.seek(checkpoint["offset"])
+            total = sum(1 for line in f if line.strip())
+        f.seek(checkpoint["offset"])
+
+        while True:
+            ctx.check()
+            lines = []
+            while len(lines) < ctx.chunk_size:
+                line = f.readline()
+                if not line:
+                    break
+                if line.strip():
+                    lines.append(line.rstrip(b"\r\n"))
+            if not lines:
+                break
+
+            records, errors = [], []
+            for number, line in enumerate(lines, start=checkpoint["rows"] + 1):
+                try:
+                    user_id, metrics = parse_row(line, fmt, header)
+                    metrics, error = validate_row(metrics)
+                except ValueError as e:
+                    user_id, metrics, error = None, None, f"Invalid row: {str(e)}"
+                if metrics is None:
+                    errors.append({"row": number, "error": error})
+                else:
+                    records.append((str(user_id or uuid.uuid4()), metrics))
+
+            analyses = score_records([metrics for _, metrics in records])
+            for (user_id, metrics), analysis in zip(records, analyses):
+                analysis["user_id"] = user_id
+                analysis["metrics"] = metrics
+                analysis["bmi"] = calculate_bmi(metrics["weight"], metrics["height"])
+
+            kept = checkpoint["errors"] + errors[:MAX_IMPORT_ERRORS - len(checkpoint["errors"])]
+            checkpoint = {
+                "offset": f.tell(),
+                "rows": checkpoint["rows"] + len(lines),
+                "imported": checkpoint["imported"] + len(analyses),
+                "failed": checkpoint["failed"] + len(errors),
+                "errors": kept,
+            }
+            with ctx.chunk() as conn:
+                db_crud.insert_analyses(conn, analyses)
+                ctx.checkpoint(conn, checkpoint, checkpoint["rows"], max(total, checkpoint["rows"]))
+            for user_id in {analysis["user_id"] for analysis in analyses}:
+                recommendations_cache.invalidate(user_id)
+
+    path.unlink(missing_ok=True)
+    return {key: checkpoint[key] for key in ("rows", "imported", "failed", "errors")}
+
+
+# Job type -> handler; each returns the job's result
+HANDLERS: Dict[str, Callable[[JobContext], Dict]] = {
+    "rescore-all": rescore_all,
+    "export-user-history": export_user_history,
+    "bulk-import": bulk_import,
+}
+
+
+def validate_params(job_type: str, params: Dict) -> Optional[str]:
+    """Error message for an unknown job type or missing parameters, else None"""
+    if job_type not in HANDLERS:
+        return f"Unknown job type '{job_type}' (expected one of: {', '.join(HANDLERS)})"
+    if job_type == "export-user-history" and not isinstance(params.get("user_id"), str):
+        return "export-user-history requires params.user_id"
+    if job_type == "bulk-import" and not (params.get("file") and params.get("format") in ("ndjson", "csv")):
+        return "bulk-import jobs are submitted by uploading the file to /jobs/bulk-import"
+    return None
+
+
+class JobRunner:
+    """Pool of worker threads claiming and running jobs from the database"""
+
+    def __init__(self, workers: int, poll_seconds: float, lease_seconds: float,
+                 chunk_size: int, max_attempts: int):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.chunk_size = chunk_size
+        self.max_attempts = max_attempts
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def start(self):
+        """Start the worker threads (once per process, after any fork)"""
+        if self._threads:
+            return
+        self._stop.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10.0):
+        """Stop after the current chunks; running jobs are handed back to the queue"""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self):
+        """A job was submitted: wake an idle worker now instead of at the next poll"""
+        self._wake.set()
+
+    def _owner(self) -> str:
+        return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                job = job_store.claim(self._owner(), self.lease_seconds)
+            except Exception as e:
+                logger.error(f"Error claiming a job: {str(e)}")
+                job = None
+            if job is None:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+                continue
+            self.run(job)
+
+    def run(self, job: Dict):
+        """Run a claimed job to completion, cancellation, hand-back or failure"""
+        handler = HANDLERS.get(job["type"])
+        if handler is None:
+            job_store.finish(job, "failed", error=f"Unknown job type '{job['type']}'")
+            return
+        logger.info(f"Running job {job['id']} ({job['type']}, attempt {job['attempts']})")
+        try:
+            result = handler(JobContext(job, self._stop, self.chunk_size))
+        except JobInterrupted:
+            job_store.release(job)
+            logger.info(f"Job {job['id']} handed back at {job['processed']} records")
+        except JobCancelled:
+            job_store.finish(job, "cancelled", result={"processed": job["processed"]})
+            logger.info(f"Job {job['id']} cancelled")
+        except LeaseLost:
+            logger.warning(f"Job {job['id']} was taken over by another worker")
+        except Exception as e:
+            logger.exception(f"Job {job['id']} failed")
+            if job["attempts"] < self.max_attempts:
+                # Retried (from its checkpoint) by the next worker to poll
+                job_store.release(job)
+            else:
+                job_store.finish(job, "failed", error=str(e))
+        else:
+            job_store.finish(job, "completed", result=result)
+            logger.info(f"Job {job['id']} completed")
+
+
+# Singleton instance
+job_runner = JobRunner(
+    workers=settings.JOB_WORKERS,
+    poll_seconds=settings.JOB_POLL_SECONDS,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    chunk_size=settings.JOB_CHUNK_SIZE,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+)
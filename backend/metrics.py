@@ -0,0 +1,174 @@
+"""
+Request and stage latency metrics
+Request latency is recorded by an ASGI middleware and per-stage latency
+(validation, scoring, recommendations, database calls) by timing spans inside
+the handlers; both are exported as Prometheus histograms on /metrics.
+When metrics are disabled, span() returns a shared no-op context manager.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Dict, List, Sequence, Tuple
+
+from starlette.routing import Match
+
+from config import settings
+
+# Seconds; the handlers' stages take well under a millisecond to a few hundred
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Route template of the request being handled, so spans are labelled without passing it around
+_endpoint: ContextVar[str] = ContextVar("metrics_endpoint", default="none")
+
+_NOOP = nullcontext()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram with one series per label combination"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        # First bucket whose upper bound is >= value; len(buckets) is +Inf
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def render(self) -> List[str]:
+        """Prometheus text exposition lines"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(counts), total[0]) for labels, (counts, total) in sorted(self._series.items())]
+        for labels, counts, total in snapshot:
+            label_text = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels))
+            prefix = label_text + "," if label_text else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{_format_value(bound)}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {total}")
+            lines.append(f"{self.name}_count{{{label_text}}} {cumulative}")
+        return lines
+
+
+class _Span:
+    """Times one stage of the current request"""
+
+    __slots__ = ("histogram", "stage", "start")
+
+    def __init__(self, histogram: Histogram, stage: str):
+        self.histogram = histogram
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe((_endpoint.get(), self.stage), time.perf_counter() - self.start)
+        return False
+
+
+class MetricsRegistry:
+    """Request and stage histograms for the API"""
+
+    def __init__(self, enabled: bool = True, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.requests = Histogram(
+            "healthnexus_request_duration_seconds",
+            "Request latency by endpoint, method and status code",
+            ("endpoint", "method", "status"), buckets
+        )
+        self.stages = Histogram(
+            "healthnexus_stage_duration_seconds",
+            "Latency of each stage inside a request by endpoint",
+            ("endpoint", "stage"), buckets
+        )
+
+    def span(self, stage: str):
+        """
+        Time a block as one stage of the current request
+
+        Usage:
+            with request_metrics.span("predict"):
+                predictions = risk_predictor.predict_all_risks(metrics)
+        """
+        if not self.enabled:
+            return _NOOP
+        return _Span(self.stages, stage)
+
+    def render(self) -> str:
+        return "\n".join(self.requests.render() + self.stages.render()) + "\n"
+
+
+def route_template(scope) -> str:
+    """Path template of the route a request will hit (e.g. /get-recommendations/{user_id})"""
+    app = scope.get("app")
+    router = getattr(app, "router", None)
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency and labelling the spans inside the request"""
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = route_template(scope)
+        token = _endpoint.set(endpoint)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.registry.requests.observe(
+                (endpoint, scope["method"], str(status_code)), time.perf_counter() - start
+            )
+            _endpoint.reset(token)
+
+
+# Singleton instance
+request_metrics = MetricsRegistry(enabled=settings.METRICS_ENABLED)
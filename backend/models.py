@@ -133,3 +133,18 @@ class HealthResponse(BaseModel):
                 "timestamp": "2026-02-12T14:48:31Z"
             }
         }
+
+
+class JobRequest(BaseModel):
+    """Background job submission"""
+    
+    type: str = Field(..., description="rescore-all or export-user-history (bulk imports are uploaded to /jobs/bulk-import)")
+    params: Dict = Field(default_factory=dict, description="Job parameters, e.g. {'user_id': ...} for export-user-history")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "type": "export-user-history",
+                "params": {"user_id": "12345"}
+            }
+        }
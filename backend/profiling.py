@@ -0,0 +1,209 @@
+"""
+Opt-in statistical sampling profiler
+A background thread samples Python stacks at a fixed rate and counts them as
+flamegraph-ready collapsed stacks ("outer;inner;leaf count"). A profile covers
+either one request (X-Profile header) or a time window started from the admin
+endpoint; only one profile runs at a time and the sample rate and window length
+are capped, so the overhead stays bounded.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import settings
+
+PROFILE_HEADER = "x-profile"
+TOKEN_HEADER = "x-profile-token"
+FILE_SUFFIX = ".collapsed"
+
+# Deepest stack recorded; deeper frames (toward the root) are dropped
+MAX_DEPTH = 128
+
+
+class SamplingProfiler:
+    """Samples the stacks of the given threads (all but its own when None) at hz samples per second"""
+
+    def __init__(self, hz: float, thread_ids: Optional[set] = None):
+        self.interval = 1.0 / hz
+        self.thread_ids = thread_ids
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[object, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _collapse(self, frame) -> str:
+        labels = []
+        while frame is not None and len(labels) < MAX_DEPTH:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        return ";".join(reversed(labels))
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                self.stacks[self._collapse(frame)] += 1
+            self.samples += 1
+
+    def write(self, path: Path) -> Path:
+        """Write the collapsed stacks, busiest first"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+class ProfilerControl:
+    """Starts request and window profiles, one at a time, within the configured limits"""
+
+    def __init__(self, enabled: bool, output_dir: str, sample_hz: int, max_sample_hz: int,
+                 max_seconds: int, token: Optional[str] = None):
+        self.enabled = enabled
+        self.output_dir = Path(output_dir)
+        self.sample_hz = sample_hz
+        self.max_sample_hz = max_sample_hz
+        self.max_seconds = max_seconds
+        self.token = token
+        self._busy = threading.Lock()
+        self._active: Optional[Dict] = None
+
+    def authorized(self, token: Optional[str]) -> bool:
+        return self.token is None or token == self.token
+
+    def clamp_hz(self, hz: Optional[float]) -> float:
+        """Requested sample rate limited to (0, PROFILING_MAX_SAMPLE_HZ]"""
+        if not hz or hz <= 0:
+            hz = self.sample_hz
+        return min(float(hz), float(self.max_sample_hz))
+
+    def _path(self, label: str) -> Path:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        return self.output_dir / f"profile-{stamp}-{label}{FILE_SUFFIX}"
+
+    def start(self, label: str, hz: Optional[float] = None, thread_ids: Optional[set] = None):
+        """
+        Start a profile unless one is already running
+
+        Returns:
+            (SamplingProfiler, output path), or None when another profile is active
+        """
+        if not self._busy.acquire(blocking=False):
+            return None
+        try:
+            hz = self.clamp_hz(hz)
+            sampler = SamplingProfiler(hz, thread_ids).start()
+        except Exception:
+            self._busy.release()
+            raise
+        path = self._path(label)
+        self._active = {"file": path.name, "hz": hz, "started": time.time(), "label": label}
+        return sampler, path
+
+    def finish(self, sampler: SamplingProfiler, path: Path) -> Path:
+        """Stop a profile, write its stacks and free the slot"""
+        try:
+            sampler.stop()
+            return sampler.write(path)
+        finally:
+            self._active = None
+            self._busy.release()
+
+    def start_window(self, seconds: float, hz: Optional[float] = None) -> Optional[Dict]:
+        """Profile every thread for a time window; the stacks are written when it ends"""
+        seconds = min(max(float(seconds), 0.1), float(self.max_seconds))
+        started = self.start("window", hz)
+        if started is None:
+            return None
+        sampler, path = started
+        timer = threading.Timer(seconds, self.finish, args=(sampler, path))
+        timer.daemon = True
+        timer.start()
+        return {"file": path.name, "seconds": seconds, "hz": self._active["hz"]}
+
+    def status(self) -> Dict:
+        return {"active": self._active, "files": self.recent_files()}
+
+    def recent_files(self, limit: int = 20) -> List[str]:
+        if not self.output_dir.exists():
+            return []
+        files = sorted(self.output_dir.glob(f"profile-*{FILE_SUFFIX}"), reverse=True)
+        return [path.name for path in files[:limit]]
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling a single request when it carries the X-Profile header"""
+
+    def __init__(self, app, control: ProfilerControl):
+        self.app = app
+        self.control = control
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        requested = headers.get(PROFILE_HEADER.encode())
+        if requested is None:
+            await self.app(scope, receive, send)
+            return
+
+        token = headers.get(TOKEN_HEADER.encode())
+        if not self.control.authorized(token.decode() if token else None):
+            await self.app(scope, receive, send)
+            return
+        try:
+            hz = float(requested.decode() or 0)
+        except ValueError:
+            hz = None
+        # The handler runs on this thread (the event loop), so only it is sampled
+        started = self.control.start("request", hz, thread_ids={threading.get_ident()})
+        if started is None:
+            await self.app(scope, receive, send)
+            return
+        sampler, path = started
+
+        async def send_with_profile(message):
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-file", path.name.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            self.control.finish(sampler, path)
+
+
+# Singleton instance
+profiler = ProfilerControl(
+    enabled=settings.PROFILING_ENABLED,
+    output_dir=settings.PROFILING_DIR,
+    sample_hz=settings.PROFILING_SAMPLE_HZ,
+    max_sample_hz=settings.PROFILING_MAX_SAMPLE_HZ,
+    max_seconds=settings.PROFILING_MAX_SECONDS,
+    token=settings.PROFILING_TOKEN,
+)
@@ -2,6 +2,7 @@
 Input validation utilities
 """
 from typing import Dict, Tuple
+from config import settings
 
 
 def validate_health_metrics(metrics: Dict) -> Tuple[bool, str]:
@@ -68,10 +69,10 @@ def parse_blood_pressure(bp_string: str) -> Tuple[int, int]:
 
 
 def get_risk_category(score: float) -> str:
-    """Categorize risk score into Low, Moderate, or High"""
-    if score < 30:
+    """Categorize risk score into Low, Moderate, or High (LOW_RISK_THRESHOLD / MODERATE_RISK_THRESHOLD)"""
+    if score < settings.LOW_RISK_THRESHOLD:
         return "Low"
-    elif score < 60:
+    elif score < settings.MODERATE_RISK_THRESHOLD:
         return "Moderate"
     else:
         return "High"
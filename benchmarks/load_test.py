@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Backend API load test
+Drives the FastAPI app in-process through its ASGI interface (httpx, no
+server or network) against a temporary SQLite database seeded with synthetic
+users, and reports throughput and p50/p95/p99 latency per endpoint (the median
+of the repeated runs). Throughput, p50 and p95 are compared with a stored
+baseline and a run that regresses past the tolerance exits with status 1; p99
+rests on a handful of requests per run, so it is reported but not gated.
+
+Usage:
+    python benchmarks/load_test.py --update-baseline
+    python benchmarks/load_test.py --users 5000 --requests 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCH_DIR.parent / "backend"
+
+from run_benchmarks import git_commit  # noqa: E402
+
+DEFAULT_BASELINE = BENCH_DIR / "load_baseline.json"
+ENDPOINTS = ('submit-health-data', 'get-predictions', 'get-recommendations', 'user-history')
+
+# Throughput this much lower, or a gated latency percentile this much higher, than the baseline is a regression
+REGRESSION_TOLERANCE = 0.25
+# Compared with the baseline and gated; p99 is only reported (too few samples to be stable)
+GATED_METRICS = (('requests_per_sec', -1), ('p50_ms', 1), ('p95_ms', 1))
+REPORTED_METRICS = (('p99_ms', 1),)
+# Latency changes smaller than this are noise whatever their relative size
+MIN_LATENCY_DELTA_MS = 1.0
+SEED_CHUNK = 1000
+
+EXERCISE = ('Daily', '3-4x/week', '1-2x/week', 'Rarely', 'None')
+SMOKING = ('No', 'Former', 'Yes')
+DIET = ('Balanced', 'Mixed', 'High fat', 'Vegetarian')
+ALCOHOL = ('None', 'Occasional', 'Moderate', 'Heavy')
+
+
+def random_metrics(rng):
+    """One HealthMetrics payload in the ranges the validators accept"""
+    systolic = rng.randint(95, 180)
+    return {
+        'age': rng.randint(18, 90),
+        'weight': round(rng.uniform(45, 130), 1),
+        'height': round(rng.uniform(145, 200), 1),
+        'blood_pressure': f"{systolic}/{rng.randint(60, min(systolic - 10, 120))}",
+        'cholesterol_level': round(rng.uniform(120, 320), 1),
+        'lifestyle_info': (
+            f"Exercise: {rng.choice(EXERCISE)}, Smoking: {rng.choice(SMOKING)}, "
+            f"Diet: {rng.choice(DIET)}, Alcohol: {rng.choice(ALCOHOL)}"
+        ),
+    }
+
+
+def import_app(db_path):
+    """The backend app, configured for the load test (set before config is imported)"""
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    # No background job threads competing with the measured requests
+    os.environ['JOBS_ENABLED'] = 'false'
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    import logging
+    with contextlib.redirect_stdout(io.StringIO()):
+        from app import app
+        from db import init_db
+        init_db()
+    # The backend logs one line per request at INFO
+    logging.getLogger().setLevel(logging.WARNING)
+    return app
+
+
+def seed(users, records_per_user, rng):
+    """Fill the database with users x records_per_user complete analyses; returns the user ids"""
+    from db import db_crud
+    from jobs import score_records
+    from validators import calculate_bmi
+
+    user_ids = [f"load_{index}" for index in range(users)]
+    pending = [(user_id, random_metrics(rng)) for user_id in user_ids for _ in range(records_per_user)]
+    for start in range(0, len(pending), SEED_CHUNK):
+        chunk = pending[start:start + SEED_CHUNK]
+        analyses = score_records([metrics for _, metrics in chunk])
+        for (user_id, metrics), analysis in zip(chunk, analyses):
+            analysis.update(
+                user_id=user_id, metrics=metrics, bmi=calculate_bmi(metrics['weight'], metrics['height'])
+            )
+        conn = db_crud.pool.connection()
+        try:
+            db_crud.insert_analyses(conn, analyses)
+            conn.commit()
+        finally:
+            conn.close()
+    return user_ids
+
+
+def request_factory(endpoint, user_ids, rng):
+    """Callable returning (method, path, json body) of the next request to an endpoint"""
+    if endpoint == 'submit-health-data':
+        # Returning patients: every save also invalidates that user's cached recommendations
+        return lambda: ('POST', '/submit-health-data',
+                        {'user_id': rng.choice(user_ids), 'metrics': random_metrics(rng)})
+    if endpoint == 'get-predictions':
+        return lambda: ('POST', '/get-predictions', {'metrics': random_metrics(rng)})
+    if endpoint == 'get-recommendations':
+        return lambda: ('GET', f"/get-recommendations/{rng.choice(user_ids)}", None)
+    return lambda: ('GET', f"/user-history/{rng.choice(user_ids)}", None)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+async def drive(client, next_request, requests, concurrency):
+    """
+    Send requests with at most concurrency in flight
+
+    Returns:
+        (wall seconds, latencies in seconds of the successful requests, error count)
+    """
+    latencies = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            method, path, body = next_request()
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            elapsed = time.perf_counter() - start
+            if response.status_code < 400:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    return time.perf_counter() - start, latencies, errors
+
+
+async def run_load(app, endpoints, user_ids, requests, concurrency, warmup, repeat, rng):
+    """Load each endpoint in turn; returns {endpoint: summary}"""
+    import httpx
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        for endpoint in endpoints:
+            next_request = request_factory(endpoint, user_ids, rng)
+            if warmup:
+                await drive(client, next_request, warmup, concurrency)
+            runs = [
+                summarize(await drive(client, next_request, requests, concurrency), requests)
+                for _ in range(repeat)
+            ]
+            # Median of each metric over the repeats: one noisy run can't move it either way
+            result = {'requests': requests, 'errors': max(run['errors'] for run in runs)}
+            for metric in ('seconds', 'requests_per_sec', 'p50_ms', 'p95_ms', 'p99_ms'):
+                values = [run[metric] for run in runs if run[metric] is not None]
+                result[metric] = round(statistics.median(values), 4) if values else None
+            results[endpoint] = result
+            print(f"   {endpoint:<22} {result['requests_per_sec'] or 0:>9,.1f} req/s  "
+                  f"p50 {result['p50_ms'] or 0:7.2f}ms  p95 {result['p95_ms'] or 0:7.2f}ms  "
+                  f"p99 {result['p99_ms'] or 0:7.2f}ms  {result['errors']} errors")
+    return results
+
+
+def summarize(run, requests):
+    """Throughput and latency percentiles of one drive() run"""
+    seconds, latencies, errors = run
+    latencies = sorted(latencies)
+    return {
+        'errors': errors,
+        'seconds': seconds,
+        'requests_per_sec': round(requests / seconds, 1) if seconds else None,
+        'p50_ms': _ms(percentile(latencies, 0.50)),
+        'p95_ms': _ms(percentile(latencies, 0.95)),
+        'p99_ms': _ms(percentile(latencies, 0.99)),
+    }
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+def compare(results, baseline, tolerance=REGRESSION_TOLERANCE, min_delta_ms=MIN_LATENCY_DELTA_MS):
+    """
+    Compare a run with the baseline (p99 is printed but never counts as a regression)
+
+    Returns:
+        List of (endpoint, metric, baseline value, value, change) for every regression
+    """
+    regressions = []
+    for endpoint, result in results.items():
+        before = baseline['results'].get(endpoint)
+        if not before:
+            continue
+        if result['errors'] > before['errors']:
+            regressions.append((endpoint, 'errors', before['errors'], result['errors'], None))
+        for metric, direction in GATED_METRICS + REPORTED_METRICS:
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = new / old - 1
+            worse = change * direction > tolerance
+            if direction > 0 and new - old < min_delta_ms:
+                worse = False
+            gated = (metric, direction) in GATED_METRICS
+            marker = ('  ⚠️ REGRESSION' if gated else '  (not gated)') if worse else ''
+            if worse and gated:
+                regressions.append((endpoint, metric, old, new, change))
+            print(f"   {endpoint:<22} {metric:<17} {old:10.2f} -> {new:10.2f}  {change:+7.1%}{marker}")
+    return regressions
+
+
+def main():
+    """Seed a temporary database, load every endpoint and check the results against the baseline"""
+    parser = argparse.ArgumentParser(description="Load test the backend API in-process and gate on a baseline")
+    parser.add_argument("--users", type=int, default=1000, help="Users seeded into the database")
+    parser.add_argument("--records-per-user", type=int, default=5, help="Stored analyses per seeded user")
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured requests per endpoint first")
+    parser.add_argument("--repeat", type=int, default=3, help="Measured runs per endpoint; the median of each metric is kept")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the synthetic users and requests")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="Throughput drop or p50/p95 rise (fraction) against the baseline that counts as a regression")
+    parser.add_argument("--output", help="Also write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    config = {
+        'users': args.users,
+        'records_per_user': args.records_per_user,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+    }
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as work_dir:
+        app = import_app(Path(work_dir) / "load.db")
+
+        print(f"\n🌱 Seeding {args.users:,} users x {args.records_per_user} analyses...")
+        start = time.perf_counter()
+        user_ids = seed(args.users, args.records_per_user, rng)
+        print(f"   done in {time.perf_counter() - start:.1f}s")
+
+        print(f"\n🚦 {args.requests:,} requests per endpoint, {args.concurrency} concurrent")
+        results = asyncio.run(run_load(
+            app, args.endpoints, user_ids, args.requests, args.concurrency, args.warmup, args.repeat, rng
+        ))
+
+    run = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'config': config,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(run, f, indent=2)
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump(run, f, indent=2)
+        print(f"\n✓ Baseline written to {baseline_path}")
+        return
+    if not baseline_path.exists():
+        print(f"\nNo baseline at {baseline_path}; record one with --update-baseline")
+        return
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if baseline.get('config') != config:
+        print(f"\n❌ Baseline was recorded with {baseline.get('config')}, this run used {config}; "
+              f"rerun with the same settings or record a new baseline")
+        sys.exit(2)
+
+    print(f"\n📈 Compared with baseline {baseline['timestamp']} ({baseline.get('commit') or 'unknown commit'})")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n⚠️  {len(regressions)} regression(s) past {args.tolerance:.0%}")
+        sys.exit(1)
+    print("\n✓ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+OPD benchmark harness
+Times the data loaders, report generation, risk scoring and database writes
+against a synthetic dataset, appends the results to a JSONL history and
+compares them with the previous run at the same scale
+
+Usage:
+    python benchmarks/run_benchmarks.py --scale 1000000
+    python benchmarks/run_benchmarks.py --data /tmp/opd_1m --suites loaders reports
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+BACKEND_DIR = REPO_DIR / "backend"
+sys.path.insert(0, str(REPO_DIR))
+
+from synthetic_data import generate  # noqa: E402
+
+DEFAULT_RESULTS = BENCH_DIR / "results.jsonl"
+DEFAULT_DATA_DIR = BENCH_DIR / "data"
+SUITES = ('loaders', 'reports', 'scoring', 'db')
+
+CHUNK_ROWS = 100000
+# A benchmark this much slower than the previous run at the same scale is reported as a regression
+REGRESSION_TOLERANCE = 0.2
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def best_of(run, repeat):
+    """Best wall time of repeat runs, and the rows the run reported processing"""
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            rows = run()
+        timings.append(time.perf_counter() - start)
+    return min(timings), rows
+
+
+def read_assessments(data_dir, limit):
+    import pandas as pd
+
+    # "None" is a lifestyle answer (no alcohol, no exercise), not a missing value
+    return pd.read_csv(data_dir / "health_risk_assessments.csv", nrows=limit, keep_default_na=False)
+
+
+def assessment_metrics(frame):
+    """Backend request payloads (HealthMetricsInput fields) from health risk assessment rows"""
+    lifestyle = (
+        "Exercise: " + frame['Exercise_Frequency'].astype(str)
+        + ", Smoking: " + frame['Smoking_Status'].astype(str)
+        + ", Diet: " + frame['Diet_Quality'].astype(str)
+        + ", Alcohol: " + frame['Alcohol_Consumption'].astype(str)
+    )
+    return [
+        {
+            'age': int(age), 'weight': float(weight), 'height': float(height),
+            'blood_pressure': f"{systolic}/{diastolic}", 'cholesterol_level': float(cholesterol),
+            'lifestyle_info': info,
+        }
+        for age, weight, height, systolic, diastolic, cholesterol, info in zip(
+            frame['Age'], frame['Weight_kg'], frame['Height_cm'], frame['Systolic_BP'],
+            frame['Diastolic_BP'], frame['Cholesterol_mg_dL'], lifestyle
+        )
+    ]
+
+
+def loader_benchmarks(data_dir, work_dir):
+    from assessment_store import AssessmentStore
+    from data_sources import resolve_source
+    from opd_aggregates import PrescriptionAggregates
+
+    source = resolve_source(str(data_dir))
+    store = AssessmentStore(source.path('assessments'))
+
+    def read_prescriptions():
+        return len(source.read('prescriptions'))
+
+    def scan_prescriptions():
+        rows = 0
+        for chunk in source.iter_chunks('prescriptions', CHUNK_ROWS, columns=PrescriptionAggregates.COLUMNS):
+            rows += len(chunk)
+        return rows
+
+    def aggregate_prescriptions():
+        chunks = source.iter_chunks('prescriptions', CHUNK_ROWS, columns=PrescriptionAggregates.COLUMNS)
+        return PrescriptionAggregates.from_chunks(chunks).total
+
+    def load_assessments():
+        return AssessmentStore(source.path('assessments')).count()
+
+    def page_assessments():
+        pages = 0
+        for page in range(1, 51):
+            pages += len(store.query_page(page=page, page_size=50, risk_level='High'))
+        return pages
+
+    return {
+        'loaders.read_prescriptions': read_prescriptions,
+        'loaders.scan_prescriptions': scan_prescriptions,
+        'loaders.aggregate_prescriptions': aggregate_prescriptions,
+        'loaders.load_assessments': load_assessments,
+        'loaders.page_assessments': page_assessments,
+    }
+
+
+def report_benchmarks(data_dir, work_dir):
+    from analyze_hospital_data import HospitalAnalytics
+    from outbreak_detection import COLUMNS as OUTBREAK_COLUMNS, OutbreakDetector
+    from report_engine import build_report, render_text
+    from stock_forecast import COLUMNS as FORECAST_COLUMNS, StockForecaster
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        analytics = HospitalAnalytics(str(data_dir))
+    rows = len(analytics.prescriptions)
+
+    def load_analytics():
+        analytics.load_data()
+        return rows
+
+    def build():
+        analytics._rx_stats = None
+        analytics._today_rx = None
+        build_report(analytics)
+        return rows
+
+    def render():
+        render_text(build_report(analytics))
+        return rows
+
+    def write_json():
+        analytics._report = None
+        analytics.write_report_json(work_dir / "report.json", fmt='compact')
+        return rows
+
+    def chunked_report():
+        chunked = HospitalAnalytics(str(data_dir), chunksize=CHUNK_ROWS)
+        build_report(chunked)
+        return rows
+
+    def detect_outbreaks():
+        chunks = analytics.source.iter_chunks('prescriptions', CHUNK_ROWS, columns=OUTBREAK_COLUMNS)
+        OutbreakDetector.backfill(chunks).summary()
+        return rows
+
+    def forecast_stock():
+        chunks = analytics.source.iter_chunks('prescriptions', CHUNK_ROWS, columns=FORECAST_COLUMNS)
+        StockForecaster.from_history(chunks, analytics.source.read('medicine_inventory')).forecast()
+        return rows
+
+    return {
+        'reports.load_analytics': load_analytics,
+        'reports.build_report': build,
+        'reports.render_text': render,
+        'reports.write_json': write_json,
+        'reports.chunked_report': chunked_report,
+        'reports.detect_outbreaks': detect_outbreaks,
+        'reports.forecast_stock': forecast_stock,
+    }
+
+
+def import_backend():
+    """Backend singletons, with the database pointed at the work directory (set before config is imported)"""
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    from ai import recommendation_engine, risk_predictor
+    from db import db_crud, init_db
+    return risk_predictor, recommendation_engine, db_crud, init_db
+
+
+def scoring_mismatches(risk_predictor, payloads):
+    """Rows where predict_frame's score or explanation differs from predict_all_risks"""
+    import pandas as pd
+    frame = risk_predictor.predict_frame(pd.DataFrame(payloads))
+    mismatches = []
+    for index, metrics in enumerate(payloads):
+        single = risk_predictor.predict_all_risks(metrics)
+        for condition, score in single['risk_scores'].items():
+            if (score != frame[condition].iat[index]
+                    or single['explanations'][condition] != frame[f"{condition}_explanation"].iat[index]):
+                mismatches.append((index, condition))
+    return mismatches
+
+
+def scoring_benchmarks(data_dir, work_dir, limit):
+    risk_predictor, recommendation_engine, _, _ = import_backend()
+    payloads = assessment_metrics(read_assessments(data_dir, limit))
+    scores = [risk_predictor.predict_all_risks(metrics)['risk_scores'] for metrics in payloads]
+
+    # Both paths score from the same rules; a difference is a bug, not a slowdown
+    mismatches = scoring_mismatches(risk_predictor, payloads)
+    if mismatches:
+        index, condition = mismatches[0]
+        sys.exit(f"❌ predict_frame disagrees with predict_all_risks on {len(mismatches)} score(s), "
+                 f"first {condition} of assessment {index}: {payloads[index]}")
+
+    def predict():
+        for metrics in payloads:
+            risk_predictor.predict_all_risks(metrics)
+        return len(payloads)
+
+    import pandas as pd
+    frame = pd.DataFrame(payloads)
+
+    def predict_frame():
+        # Vectorized batch path used by POST /get-predictions/stream
+        risk_predictor.predict_frame(frame)
+        return len(frame)
+
+    def recommend():
+        for risk_scores in scores:
+            recommendation_engine.generate_recommendations(risk_scores)
+        return len(scores)
+
+    from datetime import datetime
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from fast_json import FastJSONResponse, health_response_body
+    from models import HealthResponse
+
+    results = [risk_predictor.predict_all_risks(metrics) for metrics in payloads]
+    timestamp = datetime.now()
+
+    def serialize_model():
+        # Response model validation, then jsonable_encoder and the default JSON response
+        for index, result in enumerate(results):
+            response = HealthResponse(
+                user_id=f"bench_{index}", risk_scores=result['risk_scores'],
+                recommendations=recommendation_engine.generate_recommendations(result['risk_scores']),
+                explanations=result['explanations'], timestamp=timestamp
+            )
+            JSONResponse(jsonable_encoder(response))
+        return len(results)
+
+    def serialize_fast():
+        for index, result in enumerate(results):
+            FastJSONResponse(health_response_body(
+                f"bench_{index}", result['risk_scores'],
+                recommendation_engine.recommendations_json(result['risk_scores']),
+                result['explanations'], timestamp
+            ))
+        return len(results)
+
+    return {
+        'scoring.predict_all_risks': predict,
+        'scoring.predict_frame': predict_frame,
+        'scoring.recommendations': recommend,
+        'scoring.serialize_model': serialize_model,
+        'scoring.serialize_fast': serialize_fast,
+    }
+
+
+def db_benchmarks(data_dir, work_dir, limit):
+    risk_predictor, recommendation_engine, db_crud, init_db = import_backend()
+    payloads = assessment_metrics(read_assessments(data_dir, limit))
+    results = [risk_predictor.predict_all_risks(metrics) for metrics in payloads]
+    with contextlib.redirect_stdout(io.StringIO()):
+        init_db()
+
+    def save_assessments():
+        for index, (metrics, result) in enumerate(zip(payloads, results)):
+            user_id = f"bench_{index}"
+            bmi = metrics['weight'] / (metrics['height'] / 100) ** 2
+            data_id = db_crud.save_health_data(user_id, metrics, bmi)
+            prediction_id = db_crud.save_predictions(user_id, result['risk_scores'], result['explanations'], data_id)
+            recommendations = recommendation_engine.generate_recommendations(result['risk_scores'])
+            db_crud.save_recommendations(user_id, prediction_id, recommendations)
+        return len(payloads)
+
+    def read_history():
+        for index in range(len(payloads)):
+            db_crud.get_latest_analysis(f"bench_{index}")
+        return len(payloads)
+
+    return {
+        'db.save_assessments': save_assessments,
+        'db.read_history': read_history,
+    }
+
+
+def run_suites(data_dir, suites, repeat=3, backend_rows=1000):
+    """Run the selected suites; returns {benchmark: {'seconds', 'rows', 'rows_per_sec'}}"""
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_dir = Path(work_dir)
+        # The backend reads DATABASE_URL when its config module is first imported
+        os.environ.setdefault('DATABASE_URL', f"sqlite:///{work_dir / 'bench.db'}")
+        for suite in suites:
+            try:
+                if suite == 'loaders':
+                    benchmarks = loader_benchmarks(data_dir, work_dir)
+                elif suite == 'reports':
+                    benchmarks = report_benchmarks(data_dir, work_dir)
+                elif suite == 'scoring':
+                    benchmarks = scoring_benchmarks(data_dir, work_dir, backend_rows)
+                else:
+                    benchmarks = db_benchmarks(data_dir, work_dir, backend_rows)
+            except ImportError as e:
+                print(f"⚠️  Skipping {suite}: {e}")
+                continue
+            for name, run in benchmarks.items():
+                # Database writes are not idempotent, so they run once
+                seconds, rows = best_of(run, 1 if suite == 'db' else repeat)
+                results[name] = {
+                    'seconds': round(seconds, 4),
+                    'rows': rows,
+                    'rows_per_sec': round(rows / seconds) if seconds else None,
+                }
+                print(f"   {name:<34} {seconds:9.3f}s  {results[name]['rows_per_sec'] or 0:>12,} rows/s")
+    return results
+
+
+def previous_run(results_path, scale):
+    """Latest recorded run at the same scale, or None"""
+    if not Path(results_path).exists():
+        return None
+    previous = None
+    with open(results_path) as f:
+        for line in f:
+            if line.strip():
+                run = json.loads(line)
+                if run.get('scale') == scale:
+                    previous = run
+    return previous
+
+
+def compare(results, previous, tolerance=REGRESSION_TOLERANCE):
+    """
+    Compare timings with a previous run
+
+    Returns:
+        List of (benchmark, previous seconds, seconds, change) for every benchmark that slowed down by more than tolerance
+    """
+    regressions = []
+    for name, result in results.items():
+        before = previous['results'].get(name)
+        if not before or not before['seconds']:
+            continue
+        change = result['seconds'] / before['seconds'] - 1
+        marker = ''
+        if change > tolerance:
+            marker = '  ⚠️ REGRESSION'
+            regressions.append((name, before['seconds'], result['seconds'], change))
+        print(f"   {name:<34} {before['seconds']:9.3f}s -> {result['seconds']:9.3f}s  {change:+7.1%}{marker}")
+    return regressions
+
+
+def main():
+    """Generate (or reuse) a dataset, run the benchmarks and record the results"""
+    parser = argparse.ArgumentParser(description="Benchmark the OPD loaders, reports, scoring and database writes")
+    parser.add_argument("--scale", type=int, default=1000000, help="Prescription rows to generate")
+    parser.add_argument("--data", help="Existing synthetic data directory (skips generation)")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the best time is kept")
+    parser.add_argument("--backend-rows", type=int, default=1000, help="Assessments scored and saved by the backend suites")
+    parser.add_argument("--results", default=str(DEFAULT_RESULTS), help="JSONL file the results are appended to")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="Slowdown (fraction) against the previous run that counts as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on a regression")
+    args = parser.parse_args()
+
+    if args.data:
+        data_dir = Path(args.data)
+    else:
+        data_dir = DEFAULT_DATA_DIR / str(args.scale)
+        if not (data_dir / "prescription_log_daily.csv").exists():
+            print(f"Generating {args.scale:,} prescriptions in {data_dir}...")
+            generate(data_dir, prescriptions=args.scale)
+    # Scale is the actual prescription row count, so runs on the same data compare
+    with open(data_dir / "prescription_log_daily.csv", 'rb') as f:
+        scale = max(sum(1 for _ in f) - 1, 0)
+
+    print(f"\n📊 Benchmarking {scale:,} prescriptions ({data_dir})")
+    results = run_suites(data_dir, args.suites, repeat=args.repeat, backend_rows=args.backend_rows)
+
+    run = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'scale': scale,
+        'results': results,
+    }
+    previous = previous_run(args.results, scale)
+    with open(args.results, 'a') as f:
+        f.write(json.dumps(run) + "\n")
+    print(f"\n✓ Results appended to {args.results}")
+
+    if previous is None:
+        print("No previous run at this scale to compare against")
+        return
+    print(f"\n📈 Compared with {previous['timestamp']} ({previous.get('commit') or 'unknown commit'})")
+    regressions = compare(results, previous, args.tolerance)
+    if regressions:
+        print(f"\n⚠️  {len(regressions)} benchmark(s) slower by more than {args.tolerance:.0%}")
+        if args.fail_on_regression:
+            sys.exit(1)
+    else:
+        print("\n✓ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Synthetic OPD data generator
+Writes a full OPD data directory at any scale, following the schemas in
+datasets/DATA_SCHEMA_DOCUMENTATION.md and the disease, severity, seasonal,
+gender and age distributions in datasets/diseases_distribution.csv and
+datasets/opd_statistics.json
+
+Usage:
+    python benchmarks/synthetic_data.py /tmp/opd_1m --prescriptions 1000000
+"""
+import argparse
+import json
+import re
+import shutil
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from outbreak_detection import OutbreakDetector  # noqa: E402
+from stock_forecast import StockForecaster  # noqa: E402
+
+DATASETS_DIR = REPO_DIR / "datasets"
+REFERENCE_DIR = REPO_DIR / "data"
+
+# Reference tables copied as they are; everything else is generated
+REFERENCE_FILES = [
+    "doctor_reference.csv", "kpi_dashboard.csv", "severity_reference.csv",
+    "disease_reference.csv", "medicine_reference.csv",
+]
+
+CHUNK_ROWS = 500000
+
+MONTHS = {name: number for number, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], 1
+)}
+SEASON_MONTHS = {'winter': [11, 12, 1, 2], 'year-round': list(range(1, 13))}
+# In-season diseases are this much more likely (opd_statistics.json seasonal surges are 20-35%)
+SEASON_SURGE = 1.3
+
+EXERCISE = ['None', '1x/week', '2x/week', '3x/week', '5x/week']
+DIET = ['Poor', 'Mixed', 'Good']
+ALCOHOL = ['None', 'Moderate', 'Heavy']
+
+
+def parse_percentages(text):
+    """'Mild: 40%, Moderate: 50%' -> {'Mild': 0.4, 'Moderate': 0.5}"""
+    parts = dict(re.findall(r'(\w+):\s*(\d+(?:\.\d+)?)%', text))
+    total = sum(float(v) for v in parts.values()) or 1.0
+    return {level: float(value) / total for level, value in parts.items()}
+
+
+def parse_age_range(text):
+    """Typical age group text -> (min_age, max_age)"""
+    text = text.lower()
+    match = re.search(r'(\d+)\s*-\s*(\d+)', text)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    match = re.search(r'(\d+)\+', text)
+    if match:
+        return int(match.group(1)), 85
+    if 'pediatric' in text and 'adult' not in text and '60' not in text:
+        return 1, 14
+    return 1, 85
+
+
+def parse_season(text):
+    """Seasonal pattern text ('Oct-March', 'Winter', 'Year-round') -> list of month numbers"""
+    text = text.strip().lower()
+    if text in SEASON_MONTHS:
+        return SEASON_MONTHS[text]
+    match = re.match(r'([a-z]{3})[a-z]*\s*-\s*([a-z]{3})', text)
+    if not match:
+        return SEASON_MONTHS['year-round']
+    start, end = MONTHS[match.group(1)], MONTHS[match.group(2)]
+    if start <= end:
+        return list(range(start, end + 1))
+    return list(range(start, 13)) + list(range(1, end + 1))
+
+
+def load_profiles(datasets_dir=DATASETS_DIR):
+    """Disease and medicine profiles from the reference datasets"""
+    diseases = pd.read_csv(datasets_dir / "diseases_distribution.csv")
+    medicines = pd.read_csv(datasets_dir / "medicines_database.csv")
+    medicines = medicines.drop_duplicates('Medicine_Name').reset_index(drop=True)
+    with open(datasets_dir / "opd_statistics.json") as f:
+        statistics = json.load(f)
+
+    profiles = []
+    for _, row in diseases.iterrows():
+        words = {w.lower() for w in re.findall(r'[A-Za-z]{4,}', row['Disease_Name'])}
+        category = row['Category'].split()[0].lower()
+        candidates = medicines[medicines['Typical_Use_Cases'].str.lower().apply(
+            lambda uses: any(word in uses for word in words) or category in uses
+        )]
+        if candidates.empty:
+            candidates = medicines
+        weights = candidates['Frequency_in_OPD_Percentage'].astype(float)
+        profiles.append({
+            'name': row['Disease_Name'],
+            'weight': float(row['OPD_Volume_Percentage']),
+            'severity': parse_percentages(row['Severity_Distribution']),
+            'ages': parse_age_range(str(row['Typical_Age_Group'])),
+            'season': parse_season(str(row['Seasonal_Pattern'])),
+            'medicines': list(candidates['Medicine_Name']),
+            'medicine_weights': list(weights / weights.sum()),
+        })
+    return profiles, medicines, statistics
+
+
+def month_probabilities(profiles):
+    """12 x diseases matrix of disease probabilities by month, with in-season surges"""
+    base = np.array([p['weight'] for p in profiles])
+    matrix = np.tile(base, (12, 1))
+    for column, profile in enumerate(profiles):
+        for month in profile['season']:
+            if len(profile['season']) < 12:
+                matrix[month - 1, column] *= SEASON_SURGE
+    return matrix / matrix.sum(axis=1, keepdims=True)
+
+
+def random_cnic(rng, n):
+    """CNICs in the '12345-1234567-1' layout"""
+    a = rng.integers(10000, 100000, n).astype(str)
+    b = rng.integers(1000000, 10000000, n).astype(str)
+    c = rng.integers(0, 10, n).astype(str)
+    return np.char.add(np.char.add(np.char.add(np.char.add(a, '-'), b), '-'), c)
+
+
+def sample_visits(rng, profiles, month_probs, months):
+    """Disease index per visit, drawn from that visit's month distribution"""
+    disease = np.empty(len(months), dtype=np.int64)
+    for month in np.unique(months):
+        mask = months == month
+        disease[mask] = rng.choice(len(profiles), size=mask.sum(), p=month_probs[month - 1])
+    return disease
+
+
+def sample_per_disease(rng, profiles, disease, key, weights_key=None):
+    """Severity or medicine per visit from each disease's own distribution"""
+    values = np.empty(len(disease), dtype=object)
+    for index, profile in enumerate(profiles):
+        mask = disease == index
+        count = mask.sum()
+        if not count:
+            continue
+        if weights_key:
+            options, weights = profile[key], profile[weights_key]
+        else:
+            options, weights = list(profile[key]), list(profile[key].values())
+        values[mask] = rng.choice(options, size=count, p=weights)
+    return values
+
+
+def sample_ages(rng, profiles, disease):
+    ages = np.empty(len(disease), dtype=np.int64)
+    for index, profile in enumerate(profiles):
+        mask = disease == index
+        low, high = profile['ages']
+        ages[mask] = rng.integers(low, high + 1, mask.sum())
+    return ages
+
+
+def generate(output_dir, prescriptions=1000000, patients=None, days=365, assessments=None, seed=42,
+             end_date=None, chunk_rows=CHUNK_ROWS):
+    """
+    Write a synthetic OPD data directory
+
+    Returns:
+        Dictionary with the row count of every generated table
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    profiles, medicines, statistics = load_profiles()
+    month_probs = month_probabilities(profiles)
+    doctors = pd.read_csv(REFERENCE_DIR / "doctor_reference.csv")['Doctor_Name'].to_numpy()
+    male_share = statistics.get('gender_distribution', {}).get('male_percentage', 50) / 100
+
+    patients = patients or max(prescriptions // 3, 1)
+    assessments = assessments if assessments is not None else max(prescriptions // 20, 1)
+    end_date = end_date or date.today()
+    start_ordinal = (end_date - timedelta(days=days - 1)).toordinal()
+
+    # Patient roster: one row per patient, drawn from the same disease mix
+    patient_disease = sample_visits(rng, profiles, month_probs, rng.integers(1, 13, patients))
+    roster = pd.DataFrame({
+        'Patient_ID': np.arange(1, patients + 1),
+        'CNIC': random_cnic(rng, patients),
+        'Age': sample_ages(rng, profiles, patient_disease),
+        'Gender': np.where(rng.random(patients) < male_share, 'M', 'F'),
+        'Disease': np.array([p['name'] for p in profiles])[patient_disease],
+        'Prescribed_Medicine': sample_per_disease(rng, profiles, patient_disease, 'medicines', 'medicine_weights'),
+        'Severity': sample_per_disease(rng, profiles, patient_disease, 'severity'),
+    })
+    roster.to_csv(output_dir / "opd_patients_100.csv", index=False)
+
+    # Prescription log, written in date order a chunk at a time
+    forecaster = StockForecaster()
+    detector = OutbreakDetector()
+    log_path = output_dir / "prescription_log_daily.csv"
+    day_offsets = np.sort(rng.integers(0, days, prescriptions))
+    for start in range(0, prescriptions, chunk_rows):
+        offsets = day_offsets[start:start + chunk_rows]
+        n = len(offsets)
+        dates = pd.to_datetime(
+            [date.fromordinal(start_ordinal + int(o)) for o in np.unique(offsets)]
+        )
+        visit_dates = dates[np.searchsorted(np.unique(offsets), offsets)]
+        disease = sample_visits(rng, profiles, month_probs, visit_dates.month.to_numpy())
+        patient = rng.integers(0, patients, n)
+        chunk = pd.DataFrame({
+            'Transaction_ID': [f"TX{i:08d}" for i in range(start + 1, start + n + 1)],
+            'Date': visit_dates.strftime('%Y-%m-%d'),
+            'Patient_ID': patient + 1,
+            'CNIC': roster['CNIC'].to_numpy()[patient],
+            'Age': roster['Age'].to_numpy()[patient],
+            'Gender': roster['Gender'].to_numpy()[patient],
+            'Disease': np.array([p['name'] for p in profiles])[disease],
+            'Prescribed_Medicine': sample_per_disease(rng, profiles, disease, 'medicines', 'medicine_weights'),
+            'Quantity': rng.integers(1, 31, n),
+            'Severity': sample_per_disease(rng, profiles, disease, 'severity'),
+            'Doctor_Name': rng.choice(doctors, n),
+            'Status': 'Completed',
+        })
+        chunk.to_csv(log_path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+        forecaster.add_consumption(chunk)
+        detector.add_frame(chunk)
+
+    write_inventory(output_dir, rng, medicines, forecaster)
+    write_outbreaks(output_dir, profiles, detector)
+    write_assessments(output_dir, rng, assessments, roster, doctors, end_date, days)
+    for name in REFERENCE_FILES:
+        shutil.copy(REFERENCE_DIR / name, output_dir / name)
+
+    return {
+        'patients': patients,
+        'prescriptions': prescriptions,
+        'assessments': assessments,
+        'medicines': len(medicines),
+        'diseases': len(profiles),
+        'days': days,
+    }
+
+
+def write_inventory(output_dir, rng, medicines, forecaster):
+    """Stock snapshot and alert sheet sized against the generated consumption"""
+    rates = forecaster.rates().reindex(medicines['Medicine_Name'], fill_value=0).to_numpy()
+    # Between one week and three months of stock at the current rate
+    current = np.ceil(rates * rng.uniform(7, 90, len(rates))).astype(int) + 10
+    reorder = np.ceil(rates * 14).astype(int) + 10
+    initial = current + np.ceil(rates * 30).astype(int)
+
+    pd.DataFrame({
+        'Medicine_Name': medicines['Medicine_Name'],
+        'Initial_Stock': initial,
+        'Current_Stock': current,
+        'Unit': medicines['Dosage_Form'],
+        'Reorder_Level': reorder,
+    }).to_csv(output_dir / "medicine_inventory.csv", index=False)
+
+    forecaster.set_stock(pd.DataFrame({
+        'Medicine_Name': medicines['Medicine_Name'], 'Current_Stock': current, 'Reorder_Level': reorder,
+    }))
+    forecast = forecaster.forecast().set_index('Medicine_Name').reindex(medicines['Medicine_Name'])
+    days_left = forecast['Days_to_Stockout'].fillna(999).astype(int).to_numpy()
+    color = np.select([days_left < 15, days_left < 35], ['Red', 'Yellow'], 'Green')
+    pd.DataFrame({
+        'Medicine_ID': medicines['Medicine_ID'],
+        'Medicine_Name': medicines['Medicine_Name'],
+        'Current_Stock': current,
+        'Reorder_Level': reorder,
+        'Stock_Status': pd.Series(color).map({'Red': 'CRITICAL', 'Yellow': 'CAUTION', 'Green': 'SAFE'}),
+        'Alert_Color': color,
+        'Days_to_Stockout': days_left,
+        'Recommended_Order_Qty': forecast['Recommended_Order_Qty'].to_numpy(),
+        'Urgency': pd.Series(color).map({'Red': 'High', 'Yellow': 'Medium', 'Green': 'Low'}),
+        'Action_Required': np.where(
+            color == 'Green', 'None', np.char.add(np.char.add('Order now - ', days_left.astype(str)), ' days to stockout')
+        ),
+    }).to_csv(output_dir / "inventory_alerts.csv", index=False)
+
+
+def write_outbreaks(output_dir, profiles, detector):
+    """30-day outbreak sheet computed from the generated case stream"""
+    reference = pd.DataFrame({
+        'Disease_Name': [p['name'] for p in profiles],
+        'Most_Affected_Age': [f"{p['ages'][0]}-{p['ages'][1]} years" for p in profiles],
+        'Key_Medicines': [p['medicines'][int(np.argmax(p['medicine_weights']))] for p in profiles],
+    })
+    summary = detector.summary(reference=reference).drop(columns=['Growth_Rate'])
+    summary.to_csv(output_dir / "disease_outbreak_30day.csv", index=False)
+
+
+def write_assessments(output_dir, rng, count, roster, doctors, end_date, days):
+    """Health risk assessments in the Streamlit page's schema"""
+    age = rng.integers(18, 86, count)
+    weight = rng.normal(72, 14, count).clip(35, 180).round(1)
+    height = rng.normal(165, 10, count).clip(130, 205).round(0)
+    bmi = (weight / (height / 100) ** 2).round(1)
+    systolic = rng.normal(128, 18, count).clip(90, 210).astype(int)
+    diastolic = (systolic * rng.uniform(0.55, 0.7, count)).astype(int)
+    cholesterol = rng.normal(195, 40, count).clip(110, 360).astype(int)
+    glucose = rng.normal(105, 30, count).clip(60, 350).astype(int)
+    smoking = np.where(rng.random(count) < 0.2, 'Yes', 'No')
+
+    diabetes = np.clip((bmi - 18) * 2 + (age - 20) * 0.5 + (glucose - 90) * 0.4, 0, 100).round(0)
+    heart = np.clip((systolic - 110) * 0.8 + (cholesterol - 160) * 0.3 + (smoking == 'Yes') * 15, 0, 100).round(0)
+    hypertension = np.clip((systolic - 110) * 1.2 + (diastolic - 70) * 0.8, 0, 100).round(0)
+    chol_risk = np.clip((cholesterol - 150) * 0.6, 0, 100).round(0)
+    overall = np.maximum.reduce([diabetes, heart, hypertension, chol_risk])
+    level = np.select([overall >= 60, overall >= 30], ['High', 'Moderate'], 'Low')
+
+    patient = rng.integers(0, len(roster), count)
+    start_ordinal = (end_date - timedelta(days=days - 1)).toordinal()
+    offsets = np.sort(rng.integers(0, days, count))
+    pd.DataFrame({
+        'Assessment_ID': [f"A{i:07d}" for i in range(1, count + 1)],
+        'Date': [date.fromordinal(start_ordinal + int(o)).isoformat() for o in offsets],
+        'Patient_ID': [f"P{i:06d}" for i in patient + 1],
+        'CNIC': np.char.replace(roster['CNIC'].to_numpy()[patient].astype(str), '-', ''),
+        'Age': age,
+        'Weight_kg': weight,
+        'Height_cm': height,
+        'BMI': bmi,
+        'Systolic_BP': systolic,
+        'Diastolic_BP': diastolic,
+        'Cholesterol_mg_dL': cholesterol,
+        'Glucose_mg_dL': glucose,
+        'Exercise_Frequency': rng.choice(EXERCISE, count),
+        'Smoking_Status': smoking,
+        'Diet_Quality': rng.choice(DIET, count),
+        'Alcohol_Consumption': rng.choice(ALCOHOL, count),
+        'Diabetes_Risk': diabetes.astype(int),
+        'Heart_Disease_Risk': heart.astype(int),
+        'Hypertension_Risk': hypertension.astype(int),
+        'Cholesterol_Risk': chol_risk.astype(int),
+        'Overall_Risk_Level': level,
+        'Primary_Recommendation': np.where(level == 'High', 'Consult doctor for lifestyle modification program',
+                                           'Maintain current lifestyle and regular check-ups'),
+        'Secondary_Recommendation': 'Monitor cholesterol levels',
+        'Doctor_Name': rng.choice(doctors, count),
+        'Status': 'Complete',
+    }).to_csv(output_dir / "health_risk_assessments.csv", index=False)
+
+
+def main():
+    """Generate a synthetic data directory"""
+    parser = argparse.ArgumentParser(description="Generate synthetic OPD data at scale")
+    parser.add_argument("output_dir", help="Directory to write the CSV tables into")
+    parser.add_argument("--prescriptions", type=int, default=1000000, help="Prescription log rows")
+    parser.add_argument("--patients", type=int, help="Patients in the roster (default: prescriptions / 3)")
+    parser.add_argument("--assessments", type=int, help="Health risk assessments (default: prescriptions / 20)")
+    parser.add_argument("--days", type=int, default=365, help="Days of history ending today")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = generate(
+        args.output_dir, prescriptions=args.prescriptions, patients=args.patients,
+        days=args.days, assessments=args.assessments, seed=args.seed
+    )
+    elapsed = time.perf_counter() - started
+    print(f"✓ Wrote {counts['prescriptions']:,} prescriptions, {counts['patients']:,} patients and "
+          f"{counts['assessments']:,} assessments to {args.output_dir} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
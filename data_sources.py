@@ -0,0 +1,262 @@
+"""
+Data sources for the OPD tables
+One resolver turns a configured location (one or more local directories, a
+SQLite database or a Parquet dataset) into a DataSource that reads each table
+lazily, so the app and batch jobs can point at mounted datasets in place
+"""
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+# Environment variable naming the data location when none is passed explicitly
+DATA_SOURCE_ENV = "OPD_DATA_SOURCE"
+
+REPO_DIR = Path(__file__).resolve().parent
+
+# The patient roster ships at the repository root, every other table under data/
+DEFAULT_ROOTS = [REPO_DIR / "data", REPO_DIR]
+
+# Table name -> file stem (CSV/Parquet file name, or SQLite table name)
+TABLES = {
+    'patients': "opd_patients_100",
+    'prescriptions': "prescription_log_daily",
+    'inventory': "inventory_alerts",
+    'medicine_inventory': "medicine_inventory",
+    'diseases': "disease_outbreak_30day",
+    'kpis': "kpi_dashboard",
+    'doctors': "doctor_reference",
+    'medicines': "medicine_reference",
+    'diseases_ref': "disease_reference",
+    'severity_ref': "severity_reference",
+    'assessments': "health_risk_assessments",
+}
+
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+
+
+def _stem(name):
+    if name not in TABLES:
+        raise KeyError(f"Unknown table: {name}")
+    return TABLES[name]
+
+
+def _select_columns(available, columns):
+    """Requested columns that the table actually has (all of them when columns is None)"""
+    if columns is None:
+        return None
+    return [column for column in available if column in columns]
+
+
+class DataSource:
+    """Lazy, per-table access to the OPD tables"""
+
+    kind = None
+
+    def exists(self, name):
+        raise NotImplementedError
+
+    def read(self, name, columns=None):
+        """Whole table as a DataFrame, optionally only some columns"""
+        raise NotImplementedError
+
+    def iter_chunks(self, name, chunksize, columns=None):
+        """Yield the table in DataFrames of at most chunksize rows"""
+        raise NotImplementedError
+
+    def count_rows(self, name):
+        return len(self.read(name))
+
+    def local_root(self):
+        """Directory for derived local files (partitions), or None for database-backed sources"""
+        return None
+
+    def describe(self):
+        raise NotImplementedError
+
+
+class LocalSource(DataSource):
+    """CSV files looked up across one or more directories, first match wins"""
+
+    kind = 'local'
+
+    def __init__(self, roots):
+        self.roots = [Path(root) for root in roots]
+
+    def path(self, name):
+        """Path of a table's CSV file, or None if no root has it"""
+        file_name = f"{_stem(name)}.csv"
+        for root in self.roots:
+            candidate = root / file_name
+            if candidate.exists():
+                return candidate
+        return None
+
+    def writable_path(self, name):
+        """Existing file for a table, or where a new one should be created"""
+        return self.path(name) or self.roots[0] / f"{_stem(name)}.csv"
+
+    def exists(self, name):
+        return self.path(name) is not None
+
+    def _require(self, name):
+        path = self.path(name)
+        if path is None:
+            searched = ", ".join(str(root) for root in self.roots)
+            raise FileNotFoundError(f"{_stem(name)}.csv not found in: {searched}")
+        return path
+
+    def read(self, name, columns=None):
+        import pandas as pd
+
+        usecols = (lambda column: column in columns) if columns else None
+        return pd.read_csv(self._require(name), usecols=usecols)
+
+    def iter_chunks(self, name, chunksize, columns=None):
+        import pandas as pd
+
+        usecols = (lambda column: column in columns) if columns else None
+        yield from pd.read_csv(self._require(name), chunksize=chunksize, usecols=usecols)
+
+    def count_rows(self, name):
+        """Row count without parsing the file"""
+        with open(self._require(name), 'rb') as f:
+            return max(sum(1 for _ in f) - 1, 0)
+
+    def local_root(self):
+        # Partitions live next to the prescription log
+        path = self.path('prescriptions')
+        return path.parent if path is not None else self.roots[0]
+
+    def describe(self):
+        return ", ".join(str(root) for root in self.roots)
+
+
+class SQLiteSource(DataSource):
+    """Tables of a SQLite database, named after the CSV file stems"""
+
+    kind = 'sqlite'
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        if not self.db_path.exists():
+            raise FileNotFoundError(f"SQLite database not found: {self.db_path}")
+
+    def _connect(self):
+        return sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+
+    def _columns(self, conn, name):
+        return [row[1] for row in conn.execute(f'PRAGMA table_info("{_stem(name)}")')]
+
+    def exists(self, name):
+        with closing(self._connect()) as conn:
+            return bool(self._columns(conn, name))
+
+    def _query(self, conn, name, columns):
+        selected = _select_columns(self._columns(conn, name), columns)
+        select = ", ".join(f'"{column}"' for column in selected) if selected else "*"
+        return f'SELECT {select} FROM "{_stem(name)}"'
+
+    def read(self, name, columns=None):
+        import pandas as pd
+
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(self._query(conn, name, columns), conn)
+
+    def iter_chunks(self, name, chunksize, columns=None):
+        import pandas as pd
+
+        conn = self._connect()
+        try:
+            yield from pd.read_sql_query(self._query(conn, name, columns), conn, chunksize=chunksize)
+        finally:
+            conn.close()
+
+    def count_rows(self, name):
+        with closing(self._connect()) as conn:
+            return conn.execute(f'SELECT COUNT(*) FROM "{_stem(name)}"').fetchone()[0]
+
+    def describe(self):
+        return f"sqlite:{self.db_path}"
+
+
+class ParquetSource(DataSource):
+    """<stem>.parquet files or <stem>/ Parquet dataset directories under one root (needs pyarrow)"""
+
+    kind = 'parquet'
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def path(self, name):
+        stem = _stem(name)
+        for candidate in (self.root / f"{stem}.parquet", self.root / stem):
+            if candidate.exists():
+                return candidate
+        return None
+
+    def exists(self, name):
+        return self.path(name) is not None
+
+    def _dataset(self, name):
+        import pyarrow.dataset as ds
+
+        path = self.path(name)
+        if path is None:
+            raise FileNotFoundError(f"No Parquet data for {_stem(name)} under {self.root}")
+        return ds.dataset(path, format="parquet")
+
+    def read(self, name, columns=None):
+        dataset = self._dataset(name)
+        return dataset.to_table(columns=_select_columns(dataset.schema.names, columns)).to_pandas()
+
+    def iter_chunks(self, name, chunksize, columns=None):
+        dataset = self._dataset(name)
+        batches = dataset.to_batches(columns=_select_columns(dataset.schema.names, columns), batch_size=chunksize)
+        for batch in batches:
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+    def count_rows(self, name):
+        return self._dataset(name).count_rows()
+
+    def describe(self):
+        return f"parquet:{self.root}"
+
+
+def resolve_source(location=None):
+    """
+    Build the DataSource for a configured location
+
+    Args:
+        location: a DataSource, a list of directories, or a string:
+            "sqlite:PATH" or a .db/.sqlite file, "parquet:DIR" or a directory
+            of .parquet data, or one or more directories separated by os.pathsep.
+            Defaults to $OPD_DATA_SOURCE, then data/ plus the repository root.
+
+    Returns:
+        DataSource
+    """
+    if isinstance(location, DataSource):
+        return location
+    if location is None:
+        location = os.environ.get(DATA_SOURCE_ENV) or DEFAULT_ROOTS
+    if isinstance(location, (list, tuple)):
+        return LocalSource(location)
+
+    location = str(location)
+    if location.startswith("sqlite:"):
+        path = location[len("sqlite:"):]
+        if path.startswith("///"):
+            # SQLAlchemy-style URL, as used for the backend's DATABASE_URL
+            path = path[3:]
+        return SQLiteSource(path)
+    if location.startswith("parquet:"):
+        return ParquetSource(location[len("parquet:"):])
+
+    path = Path(location)
+    if path.suffix.lower() in SQLITE_SUFFIXES:
+        return SQLiteSource(path)
+    if path.is_dir() and not list(path.glob("*.csv")) and list(path.glob("*.parquet")):
+        return ParquetSource(path)
+    return LocalSource(location.split(os.pathsep))
@@ -0,0 +1,244 @@
+"""
+Materialized OPD aggregates
+Counters by severity, disease, medicine and alert color, built in one
+pass over each table and rebuilt when the data cache is cleared
+"""
+from collections import Counter
+
+import pandas as pd
+
+
+def _is_missing(value):
+    """True for None/NaN/empty values that value_counts would drop"""
+    return value is None or value == "" or (isinstance(value, float) and pd.isna(value))
+
+
+class OPDAggregates:
+    """Counters that the dashboard pages read from"""
+
+    def __init__(self):
+        self.severity = Counter()
+        self.disease = Counter()
+        self.medicine = Counter()
+        self.inventory_colors = Counter()
+        self.disease_alerts = Counter()
+        self.total_patients = 0
+        self.total_prescriptions = 0
+        self.total_medicines = 0
+        self.total_cases_30d = 0
+        self.first_rx_date = None
+        self.last_rx_date = None
+
+    @classmethod
+    def from_data(cls, data):
+        """Build aggregates from the loaded data frames in a single pass each"""
+        agg = cls()
+
+        patients = data.get('patients')
+        if patients is not None:
+            agg.total_patients = len(patients)
+            agg._update_from_column(agg.severity, patients, 'Severity')
+            agg._update_from_column(agg.disease, patients, 'Disease')
+            agg._update_from_column(agg.medicine, patients, 'Prescribed_Medicine')
+
+        prescriptions = data.get('prescriptions')
+        if prescriptions is not None:
+            agg.total_prescriptions = len(prescriptions)
+            if 'Date' in prescriptions.columns and len(prescriptions) > 0:
+                dates = prescriptions['Date'].dropna().astype(str)
+                if len(dates) > 0:
+                    agg.first_rx_date, agg.last_rx_date = dates.min(), dates.max()
+
+        inventory = data.get('inventory')
+        if inventory is not None:
+            agg.total_medicines = len(inventory)
+            agg._update_from_column(agg.inventory_colors, inventory, 'Alert_Color')
+
+        diseases = data.get('diseases')
+        if diseases is not None:
+            agg._update_from_column(agg.disease_alerts, diseases, 'Alert_Status')
+            if 'Cases_Last_30Days' in diseases.columns:
+                agg.total_cases_30d = int(diseases['Cases_Last_30Days'].sum())
+
+        return agg
+
+    @staticmethod
+    def _update_from_column(counter, frame, column):
+        """Fold one column's value counts into a counter"""
+        if column in frame.columns:
+            counter.update(frame[column].value_counts().to_dict())
+
+    @staticmethod
+    def top(counter, n=None):
+        """Return (labels, counts) lists ordered by count, like value_counts().head(n)"""
+        items = counter.most_common(n)
+        return [label for label, _ in items], [count for _, count in items]
+
+
+# Date column of each table doctor_workload can count from
+PATIENT_DATE_COLUMNS = ('Date', 'Registration_Date', 'Visit_Date')
+
+
+def _date_column(frame, candidates=('Date',)):
+    return next((column for column in candidates if column in frame.columns), None)
+
+
+def _in_date_range(frame, column, start_date=None, end_date=None):
+    """Rows whose ISO 'YYYY-MM-DD' date falls in [start_date, end_date] (string compare, no parsing)"""
+    dates = frame[column].astype(str)
+    mask = pd.Series(True, index=frame.index)
+    if start_date is not None:
+        mask &= dates >= str(start_date)
+    if end_date is not None:
+        mask &= dates <= str(end_date)
+    return frame[mask]
+
+
+def doctor_workload(prescriptions, doctors, patients=None, start_date=None, end_date=None,
+                    specializations=None):
+    """
+    Patients per doctor as one grouped count joined to the doctor reference
+
+    Every doctor is counted from the same table: the patient register when it
+    records the assigned doctor (and, for a date range, a date to filter on),
+    otherwise the prescription log. Dates are ISO 'YYYY-MM-DD' strings, so the
+    range filter compares strings instead of parsing the whole log.
+
+    Returns:
+        DataFrame with Doctor, Specialization and Patients columns
+    """
+    reference = doctors[['Doctor_Name', 'Specialization']]
+    if specializations:
+        reference = reference[reference['Specialization'].isin(specializations)]
+
+    dated = start_date is not None or end_date is not None
+    source, date_column = prescriptions, _date_column(prescriptions)
+    if patients is not None and 'Doctor_Name' in patients.columns:
+        patient_date = _date_column(patients, PATIENT_DATE_COLUMNS)
+        if not dated or patient_date is not None:
+            source, date_column = patients, patient_date
+
+    if dated and date_column is not None:
+        source = _in_date_range(source, date_column, start_date, end_date)
+    counts = source['Doctor_Name'].value_counts()
+
+    stats = reference.assign(
+        Patients=reference['Doctor_Name'].map(counts).fillna(0).astype(int)
+    )
+    return stats.rename(columns={'Doctor_Name': 'Doctor'}).reset_index(drop=True)
+
+
+class PrescriptionAggregates:
+    """
+    Mergeable prescription tallies: counters, top-k, severity distribution and
+    per-day counts
+
+    Rankings come from ranked(), which breaks ties by name: the order in which
+    chunks, partitions or facilities are merged never changes a report, so
+    in-memory, chunked and partitioned runs agree.
+    """
+
+    COLUMNS = ['Date', 'Disease', 'Prescribed_Medicine', 'Severity', 'Doctor_Name']
+
+    def __init__(self):
+        self.total = 0
+        self.disease = Counter()
+        self.medicine = Counter()
+        self.severity = Counter()
+        self.doctor = Counter()
+        self.daily = Counter()
+        self.daily_disease = {}
+
+    @staticmethod
+    def ranked(counter, n=None):
+        """(label, count) pairs, most common first and ties by label; the first n if given"""
+        items = sorted(counter.items(), key=lambda item: (-item[1], str(item[0])))
+        return items if n is None else items[:n]
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Aggregate a whole prescription frame at once"""
+        return cls().add_frame(frame)
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """Aggregate an iterator of prescription frames without holding them all"""
+        agg = cls()
+        for chunk in chunks:
+            agg.add_frame(chunk)
+        return agg
+
+    def add_frame(self, frame):
+        """Fold one chunk of the prescription log into the tallies"""
+        self.total += len(frame)
+        for counter, column in ((self.disease, 'Disease'), (self.medicine, 'Prescribed_Medicine'),
+                                (self.severity, 'Severity'), (self.doctor, 'Doctor_Name')):
+            if column in frame.columns:
+                counter.update(frame[column].value_counts(sort=False).to_dict())
+
+        if 'Date' in frame.columns:
+            dates = frame['Date'].astype(str)
+            self.daily.update(dates.value_counts(sort=False).to_dict())
+            if 'Disease' in frame.columns:
+                per_day = frame.assign(Date=dates).groupby(['Date', 'Disease'], sort=False).size()
+                for (date, disease), count in per_day.items():
+                    self.daily_disease.setdefault(date, Counter())[disease] += int(count)
+        return self
+
+    def add_record(self, record):
+        """Fold a single prescription in O(1)"""
+        self.total += 1
+        for counter, column in ((self.disease, 'Disease'), (self.medicine, 'Prescribed_Medicine'),
+                                (self.severity, 'Severity'), (self.doctor, 'Doctor_Name')):
+            if not _is_missing(record.get(column)):
+                counter[record[column]] += 1
+        date = record.get('Date')
+        if not _is_missing(date):
+            date = str(date)
+            self.daily[date] += 1
+            if not _is_missing(record.get('Disease')):
+                self.daily_disease.setdefault(date, Counter())[record['Disease']] += 1
+        return self
+
+    def merge(self, other):
+        """Combine tallies from another chunk, file or facility"""
+        self.total += other.total
+        self.disease.update(other.disease)
+        self.medicine.update(other.medicine)
+        self.severity.update(other.severity)
+        self.doctor.update(other.doctor)
+        self.daily.update(other.daily)
+        for date, counts in other.daily_disease.items():
+            self.daily_disease.setdefault(date, Counter()).update(counts)
+        return self
+
+    def to_dict(self):
+        """JSON-ready copy of the tallies (counter order is preserved)"""
+        return {
+            'total': self.total,
+            'disease': dict(self.disease),
+            'medicine': dict(self.medicine),
+            'severity': dict(self.severity),
+            'doctor': dict(self.doctor),
+            'daily': dict(self.daily),
+            'daily_disease': {date: dict(counts) for date, counts in self.daily_disease.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, payload):
+        """Rebuild tallies saved with to_dict()"""
+        agg = cls()
+        agg.total = payload.get('total', 0)
+        for name in ('disease', 'medicine', 'severity', 'doctor', 'daily'):
+            getattr(agg, name).update(payload.get(name, {}))
+        agg.daily_disease = {
+            date: Counter(counts) for date, counts in payload.get('daily_disease', {}).items()
+        }
+        return agg
+
+    def copy(self):
+        return PrescriptionAggregates.from_dict(self.to_dict())
+
+    def diseases_on(self, date):
+        """Disease counts for one day, most common first"""
+        return self.ranked(self.daily_disease.get(str(date), Counter()))
@@ -0,0 +1,112 @@
+"""
+Lazy, per-table data loading for the Streamlit app
+Each table is read on first use and cached until "Reload Data" clears it
+"""
+import streamlit as st
+
+from data_sources import DEFAULT_ROOTS, TABLES, resolve_source
+from startup_timing import timed, timed_import
+
+AGGREGATE_TABLES = ('patients', 'prescriptions', 'inventory', 'diseases')
+
+
+@st.cache_resource
+def get_source():
+    """The configured data source ($OPD_DATA_SOURCE, else data/ plus the repo root)"""
+    return resolve_source()
+
+
+@st.cache_data
+def load_table(name):
+    """Read one table; pandas itself is only imported on the first load"""
+    timed_import('pandas')
+
+    with timed('data', name):
+        return get_source().read(name)
+
+
+@st.cache_data
+def count_rows(name):
+    """Row count for a table, without parsing it where the source allows"""
+    return get_source().count_rows(name)
+
+
+class TableSet:
+    """Dict-like view over the tables that loads each one on first access"""
+
+    def __init__(self, names=()):
+        self._tables = {}
+        for name in names:
+            self[name]
+
+    def __getitem__(self, name):
+        if name not in self._tables:
+            self._tables[name] = load_table(name)
+        return self._tables[name]
+
+    def __contains__(self, name):
+        return name in TABLES
+
+    def get(self, name, default=None):
+        return self[name] if name in self else default
+
+
+@st.cache_resource
+def load_aggregates():
+    """Materialized counters, rebuilt only when the data cache is cleared"""
+    from opd_aggregates import OPDAggregates
+
+    with timed('data', 'aggregates'):
+        return OPDAggregates.from_data(TableSet(AGGREGATE_TABLES))
+
+
+@st.cache_resource
+def load_assessment_store():
+    """Indexed assessment history shared by every session"""
+    from assessment_store import AssessmentStore
+
+    # New assessments are appended to a CSV, so database-backed sources keep them in data/
+    source = get_source()
+    if source.kind == 'local':
+        csv_path = source.writable_path('assessments')
+    else:
+        csv_path = DEFAULT_ROOTS[0] / f"{TABLES['assessments']}.csv"
+
+    with timed('data', 'assessments'):
+        return AssessmentStore(csv_path)
+
+
+@st.cache_resource
+def load_stock_forecast():
+    """Consumption-rate stock forecast from the prescription log and current inventory"""
+    from stock_forecast import StockForecaster
+
+    with timed('data', 'stock_forecast'):
+        stock_table = 'medicine_inventory' if get_source().exists('medicine_inventory') else 'inventory'
+        return StockForecaster.from_history([load_table('prescriptions')], load_table(stock_table))
+
+
+@st.cache_resource
+def load_outbreaks():
+    """Sliding-window outbreak detector backfilled from the prescription log"""
+    from outbreak_detection import OutbreakDetector
+
+    with timed('data', 'outbreaks'):
+        return OutbreakDetector.backfill([load_table('prescriptions')])
+
+
+@st.cache_data
+def load_doctor_workload(start_date, end_date, specializations):
+    """Grouped doctor workload for one filter combination"""
+    from opd_aggregates import doctor_workload
+
+    return doctor_workload(
+        load_table('prescriptions'), load_table('doctors'), patients=load_table('patients'),
+        start_date=start_date, end_date=end_date, specializations=list(specializations)
+    )
+
+
+def clear_caches():
+    """Drop every cached table and aggregate so the next access reloads"""
+    st.cache_data.clear()
+    st.cache_resource.clear()
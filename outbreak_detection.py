@@ -0,0 +1,228 @@
+"""
+Outbreak detection from the case stream
+Every prescription is a case; each disease keeps a ring of per-day counts over
+the last 30 days so a new case updates its rolling count, daily average, growth
+trend and alert status in constant time. Backfill rebuilds the windows from
+grouped chunks of the prescription log
+"""
+from collections import Counter
+from datetime import date, timedelta
+
+import pandas as pd
+
+COLUMNS = ['Date', 'Disease', 'Severity']
+
+WINDOW_DAYS = 30
+# Growth compares the last TREND_DAYS against the TREND_DAYS before them
+TREND_DAYS = 7
+
+TREND_RISING = 0.2
+TREND_FALLING = -0.2
+
+# (alert status, minimum growth rate, minimum cases in the last TREND_DAYS), checked in order
+ALERT_THRESHOLDS = [
+    ('Red', 1.0, 10),
+    ('Orange', 0.5, 5),
+    ('Yellow', TREND_RISING, 3),
+]
+
+SEVERITY_ORDER = ['Mild', 'Moderate', 'Severe']
+
+
+def _day(value):
+    """Day ordinal for an ISO date string, date or Timestamp"""
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(str(value)[:10]).toordinal()
+
+
+class DiseaseWindow:
+    """Sliding per-day case counts for one disease over the last window_days"""
+
+    def __init__(self, window_days=WINDOW_DAYS):
+        self.window_days = window_days
+        self.counts = [0] * window_days
+        self.severity = [Counter() for _ in range(window_days)]
+        self.total = 0
+        self.severity_total = Counter()
+        # Newest day (ordinal) the ring covers; slots hold days (day - window_days, day]
+        self.day = None
+
+    def advance(self, day):
+        """Move the window forward to day, expiring the slots that fall out"""
+        if self.day is None:
+            self.day = day
+            return
+        gap = day - self.day
+        if gap <= 0:
+            return
+        for offset in range(1, min(gap, self.window_days) + 1):
+            slot = (self.day + offset) % self.window_days
+            self.total -= self.counts[slot]
+            self.severity_total.subtract(self.severity[slot])
+            self.counts[slot] = 0
+            self.severity[slot] = Counter()
+        self.day = day
+
+    def add(self, day, severity=None, count=1):
+        """Count cases on day; cases older than the window are ignored"""
+        self.advance(day)
+        if day <= self.day - self.window_days:
+            return False
+        slot = day % self.window_days
+        self.counts[slot] += count
+        self.total += count
+        if severity:
+            self.severity[slot][severity] += count
+            self.severity_total[severity] += count
+        return True
+
+    def count_between(self, first_day, last_day):
+        """Cases from first_day to last_day (ordinals) that are still in the window"""
+        first_day = max(first_day, self.day - self.window_days + 1)
+        last_day = min(last_day, self.day)
+        return sum(self.counts[day % self.window_days] for day in range(first_day, last_day + 1))
+
+    def peak_day(self):
+        """Day in the window with the most cases (latest wins a tie)"""
+        days = range(self.day - self.window_days + 1, self.day + 1)
+        return max(days, key=lambda day: (self.counts[day % self.window_days], day))
+
+
+class OutbreakDetector:
+    """Rolling counts, trends and alert levels for every disease"""
+
+    def __init__(self, window_days=WINDOW_DAYS, trend_days=TREND_DAYS):
+        self.window_days = window_days
+        self.trend_days = trend_days
+        self.windows = {}
+        # Newest case day seen; every window is evaluated as of this day
+        self.day = None
+
+    @classmethod
+    def backfill(cls, chunks, **options):
+        """
+        Rebuild the windows from an iterator of prescription frames
+
+        Chunks are grouped by (Date, Disease, Severity) and summed, and only the
+        groups inside the final window are replayed, so the cost grows with the
+        number of distinct groups rather than rows.
+        """
+        detector = cls(**options)
+        counts = None
+        for chunk in chunks:
+            grouped = cls._group(chunk)
+            if grouped is not None:
+                counts = grouped if counts is None else counts.add(grouped, fill_value=0)
+        if counts is not None and len(counts):
+            dates = counts.index.get_level_values('Date')
+            counts = counts[dates >= backfill_start(dates.max(), detector.window_days)]
+            detector._replay(counts.sort_index())
+        return detector
+
+    @staticmethod
+    def _group(frame):
+        """Case counts per (Date, Disease, Severity) for one chunk"""
+        if len(frame) == 0 or 'Disease' not in frame.columns:
+            return None
+        severity = frame['Severity'] if 'Severity' in frame.columns else pd.Series('', index=frame.index)
+        cases = pd.DataFrame({
+            'Date': frame['Date'].astype(str).str.slice(0, 10),
+            'Disease': frame['Disease'],
+            'Severity': severity.fillna(''),
+        })
+        return cases.groupby(['Date', 'Disease', 'Severity']).size()
+
+    def _replay(self, counts):
+        for (case_date, disease, severity), count in counts.items():
+            self._count(disease, _day(case_date), severity or None, int(count))
+
+    def add_frame(self, frame):
+        """Fold one chunk of new cases in date order"""
+        grouped = self._group(frame)
+        if grouped is not None:
+            self._replay(grouped)
+        return self
+
+    def _count(self, disease, day, severity, count):
+        if self.day is None or day > self.day:
+            self.day = day
+        window = self.windows.get(disease)
+        if window is None:
+            window = self.windows[disease] = DiseaseWindow(self.window_days)
+        window.add(day, severity, count)
+
+    def add_case(self, disease, case_date, severity=None, count=1):
+        """
+        Count one case (or count cases) in O(1)
+
+        Returns:
+            The disease's updated status dictionary
+        """
+        self._count(disease, _day(case_date), severity, count)
+        return self.status(disease)
+
+    def status(self, disease):
+        """Rolling count, daily average, growth, trend and alert for one disease as of the newest day"""
+        window = self.windows[disease]
+        window.advance(self.day)
+
+        recent = window.count_between(self.day - self.trend_days + 1, self.day)
+        previous = window.count_between(self.day - 2 * self.trend_days + 1, self.day - self.trend_days)
+        if previous:
+            growth = (recent - previous) / previous
+        else:
+            growth = 1.0 if recent else 0.0
+
+        if growth >= TREND_RISING:
+            trend = 'Rising'
+        elif growth <= TREND_FALLING:
+            trend = 'Falling'
+        else:
+            trend = 'Stable'
+
+        alert = 'Green'
+        for level, min_growth, min_cases in ALERT_THRESHOLDS:
+            if growth >= min_growth and recent >= min_cases:
+                alert = level
+                break
+
+        severity = window.severity_total
+        ordered = [s for s in SEVERITY_ORDER if severity[s] > 0]
+        ordered += sorted(s for s in severity if s not in SEVERITY_ORDER and severity[s] > 0)
+        return {
+            'Disease_Name': disease,
+            'Cases_Last_30Days': window.total,
+            'Daily_Average': round(window.total / self.window_days, 2),
+            'Severity_Distribution': ", ".join(f"{s}: {severity[s]}" for s in ordered),
+            'Trend': trend,
+            'Growth_Rate': round(growth, 2),
+            'Alert_Status': alert,
+            'Peak_Date': date.fromordinal(window.peak_day()).isoformat() if window.total else None,
+        }
+
+    def summary(self, reference=None):
+        """
+        Status of every disease, busiest first (ties by name)
+
+        Args:
+            reference: optional disease_outbreak_30day-style frame whose
+                descriptive columns (age group, key medicines) are kept
+
+        Returns:
+            DataFrame shaped like disease_outbreak_30day.csv
+        """
+        rows = [self.status(disease) for disease in sorted(self.windows)]
+        result = pd.DataFrame(rows, columns=[
+            'Disease_Name', 'Cases_Last_30Days', 'Daily_Average', 'Severity_Distribution',
+            'Trend', 'Growth_Rate', 'Alert_Status', 'Peak_Date',
+        ])
+        if reference is not None:
+            extra = [c for c in reference.columns if c not in result.columns]
+            result = result.merge(reference[['Disease_Name'] + extra], on='Disease_Name', how='left')
+        return result.sort_values('Cases_Last_30Days', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def backfill_start(latest_date, window_days=WINDOW_DAYS):
+    """Earliest date a backfill ending at latest_date needs to read"""
+    return (date.fromisoformat(str(latest_date)[:10]) - timedelta(days=window_days - 1)).isoformat()
@@ -0,0 +1,138 @@
+"""
+Date-partitioned prescription storage
+The prescription log is split into one CSV per month (or per day) with a small
+manifest, so date queries only open the partitions that can match. The
+manifest records the size and modification time of the flat log it was split
+from, so a log that changed afterwards can be noticed and split again.
+"""
+import json
+from pathlib import Path
+
+import pandas as pd
+
+MANIFEST_NAME = "manifest.json"
+
+# Partition key length within an ISO 'YYYY-MM-DD' date
+GRANULARITY_KEY_LENGTH = {'month': 7, 'day': 10}
+
+
+def source_signature(path):
+    """Size and modification time of the flat log partitions are split from"""
+    stat = Path(path).stat()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+class PrescriptionPartitions:
+    """Manifest-backed set of date-partitioned prescription files"""
+
+    def __init__(self, root, granularity='month'):
+        if granularity not in GRANULARITY_KEY_LENGTH:
+            raise ValueError(f"Unknown partition granularity: {granularity}")
+        self.root = Path(root)
+        self.granularity = granularity
+        # partition key -> {'file', 'rows', 'min_date', 'max_date'}
+        self.partitions = {}
+        # source_signature() of the flat log at the time it was split, if known
+        self.source = None
+
+    @classmethod
+    def open(cls, root):
+        """Open an existing partitioned log, or return None if there is no manifest"""
+        manifest_path = Path(root) / MANIFEST_NAME
+        if not manifest_path.exists():
+            return None
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        store = cls(root, manifest.get('granularity', 'month'))
+        store.partitions = manifest.get('partitions', {})
+        store.source = manifest.get('source')
+        return store
+
+    @classmethod
+    def write(cls, chunks, root, granularity='month', source_path=None):
+        """
+        Partition an iterator of prescription frames into a new store
+
+        Partitions of an earlier split under root are removed first, so
+        rewriting never appends the log to itself. With source_path the
+        manifest records that file's signature for is_stale().
+        """
+        previous = cls.open(root)
+        if previous is not None:
+            for path in previous.files():
+                path.unlink(missing_ok=True)
+        store = cls(root, granularity)
+        store.root.mkdir(parents=True, exist_ok=True)
+        if source_path is not None:
+            store.source = source_signature(source_path)
+        for chunk in chunks:
+            store.append(chunk, save_manifest=False)
+        store.save_manifest()
+        return store
+
+    def partition_key(self, date):
+        return str(date)[:GRANULARITY_KEY_LENGTH[self.granularity]]
+
+    def append(self, frame, save_manifest=True):
+        """Append prescriptions to their partitions and update the manifest"""
+        dates = frame['Date'].astype(str)
+        keys = dates.str.slice(0, GRANULARITY_KEY_LENGTH[self.granularity])
+        for key, rows in frame.groupby(keys, sort=True):
+            entry = self.partitions.get(key)
+            if entry is None:
+                entry = {'file': f"{key}.csv", 'rows': 0, 'min_date': None, 'max_date': None}
+                self.partitions[key] = entry
+
+            path = self.root / entry['file']
+            rows.to_csv(path, mode='a', header=not path.exists(), index=False)
+
+            row_dates = dates.loc[rows.index]
+            entry['rows'] += len(rows)
+            entry['min_date'] = min(filter(None, [entry['min_date'], row_dates.min()]))
+            entry['max_date'] = max(filter(None, [entry['max_date'], row_dates.max()]))
+
+        if save_manifest:
+            self.save_manifest()
+
+    def is_stale(self, source_path):
+        """True if the flat log at source_path changed since it was split (or wasn't recorded)"""
+        return self.source != source_signature(source_path)
+
+    def save_manifest(self):
+        manifest = {'granularity': self.granularity, 'partitions': dict(sorted(self.partitions.items()))}
+        if self.source is not None:
+            manifest['source'] = self.source
+        with open(self.root / MANIFEST_NAME, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    def files(self):
+        """Every partition file in date order"""
+        return [self.root / self.partitions[key]['file'] for key in sorted(self.partitions)]
+
+    def files_between(self, start_date=None, end_date=None):
+        """Partition files whose date span overlaps [start_date, end_date]"""
+        selected = []
+        for key in sorted(self.partitions):
+            entry = self.partitions[key]
+            if start_date is not None and entry['max_date'] < str(start_date):
+                continue
+            if end_date is not None and entry['min_date'] > str(end_date):
+                continue
+            selected.append(self.root / entry['file'])
+        return selected
+
+    def read_between(self, start_date=None, end_date=None):
+        """Prescriptions dated within [start_date, end_date], reading only matching partitions"""
+        frames = []
+        for path in self.files_between(start_date, end_date):
+            frame = pd.read_csv(path)
+            dates = frame['Date'].astype(str)
+            mask = pd.Series(True, index=frame.index)
+            if start_date is not None:
+                mask &= dates >= str(start_date)
+            if end_date is not None:
+                mask &= dates <= str(end_date)
+            frames.append(frame[mask])
+        if not frames:
+            return pd.DataFrame(columns=['Date'])
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,320 @@
+"""
+Single-pass report engine
+Computes every report metric in one pass per dataset into a typed
+HospitalReport; the console text and the JSON report both render from it
+"""
+import heapq
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+from report_writer import FRAME_CHUNK_ROWS, frame_records
+
+RULE = "=" * 60
+
+# Thresholds used by the stock prediction section
+STOCK_ATTENTION_DAYS = 45
+STOCK_CRITICAL_DAYS = 15
+
+# Disease alert levels listed in the daily report, most severe first, and their icons
+DISEASE_ALERT_ICONS = {'Red': '🔴', 'Orange': '🟠', 'Yellow': '🟡'}
+
+
+@dataclass
+class HospitalReport:
+    """Every metric shown in the full report and the JSON report"""
+
+    timestamp: str
+    today: str
+    today_total: int = 0
+    today_by_disease: List[Tuple[str, int]] = field(default_factory=list)
+
+    # Row-per-item sections stay DataFrames; writers convert them a batch of rows at a time
+    inventory: pd.DataFrame = field(default_factory=pd.DataFrame)
+    inventory_counts: Dict[str, int] = field(default_factory=dict)
+    inventory_by_color: Dict[str, List[Dict]] = field(default_factory=dict)
+    stock_attention: List[Dict] = field(default_factory=list)
+    stock_forecast: pd.DataFrame = field(default_factory=pd.DataFrame)
+    forecast_as_of: str = None
+
+    disease_alerts: List[Dict] = field(default_factory=list)
+    disease_alert_records: pd.DataFrame = field(default_factory=pd.DataFrame)
+    top_diseases: List[Dict] = field(default_factory=list)
+    rising_diseases: List[Dict] = field(default_factory=list)
+
+    kpis_by_level: Dict[str, List[Dict]] = field(default_factory=dict)
+
+    total_prescriptions: int = 0
+    top_medicines: List[Tuple[str, int]] = field(default_factory=list)
+    severity_distribution: List[Tuple[str, int]] = field(default_factory=list)
+    top_doctors: List[Tuple[str, int]] = field(default_factory=list)
+
+    day_over_day: Dict = field(default_factory=dict)
+
+    @property
+    def medicines_safe(self):
+        return self.inventory_counts.get('Green', 0)
+
+    @property
+    def medicines_warning(self):
+        return self.inventory_counts.get('Yellow', 0)
+
+    @property
+    def medicines_critical(self):
+        return self.inventory_counts.get('Red', 0)
+
+
+def _records(frame, chunk_rows=FRAME_CHUNK_ROWS):
+    """Yield a DataFrame's rows as dicts, converting a chunk of rows at a time"""
+    for start in range(0, len(frame), chunk_rows):
+        yield from frame.iloc[start:start + chunk_rows].to_dict('records')
+
+
+def build_report(analytics):
+    """Compute a HospitalReport from a loaded HospitalAnalytics in one pass per dataset"""
+    today_rx = analytics.today_prescriptions()
+    report = HospitalReport(
+        timestamp=datetime.now().isoformat(),
+        today=datetime.now().strftime('%Y-%m-%d'),
+        today_total=len(today_rx),
+    )
+    if len(today_rx) > 0:
+        report.today_by_disease = list(today_rx['Disease'].value_counts().items())
+
+    # Inventory: one pass buckets by alert color and collects low-stock items
+    report.inventory = analytics.inventory
+    for item in _records(report.inventory):
+        color = item['Alert_Color']
+        report.inventory_counts[color] = report.inventory_counts.get(color, 0) + 1
+        # Only the Red/Yellow items are listed by name; the full table is streamed to JSON
+        if color in ('Red', 'Yellow'):
+            report.inventory_by_color.setdefault(color, []).append(item)
+
+        days_left = item['Days_to_Stockout']
+        if days_left < STOCK_ATTENTION_DAYS:
+            report.stock_attention.append({
+                'name': item['Medicine_Name'],
+                'days': days_left,
+                'status': 'CRITICAL' if days_left < STOCK_CRITICAL_DAYS else 'MONITOR',
+                'order_qty': item['Recommended_Order_Qty']
+            })
+    report.stock_attention.sort(key=lambda x: x['days'])
+
+    # Stock forecast: days left at the rolling consumption rate from the prescription log
+    forecaster = analytics.stock_forecast
+    if forecaster.as_of is not None:
+        report.forecast_as_of = forecaster.as_of.strftime('%Y-%m-%d')
+    report.stock_forecast = forecaster.forecast()
+
+    # Diseases: one pass for daily alerts, rising trends and the top five; the alert table is streamed
+    diseases = analytics.diseases
+    report.disease_alert_records = diseases[diseases['Alert_Status'].isin(['Orange', 'Yellow', 'Red'])]
+    for disease in _records(diseases):
+        if disease['Alert_Status'] in DISEASE_ALERT_ICONS:
+            report.disease_alerts.append(disease)
+        if disease['Trend'] in ('Rising', 'High'):
+            report.rising_diseases.append(disease)
+    # nsmallest is stable, so file order on ties, like DataFrame.nlargest(keep='first')
+    report.top_diseases = heapq.nsmallest(5, _records(diseases), key=lambda d: -d['Cases_Last_30Days'])
+
+    # KPIs: one pass bucketed by alert level
+    for kpi in analytics.kpis.to_dict('records'):
+        report.kpis_by_level.setdefault(kpi['Alert_Level'], []).append(kpi)
+
+    # Prescriptions: read straight off the mergeable tallies
+    rx_stats = analytics.rx_stats
+    report.total_prescriptions = rx_stats.total
+    report.top_medicines = rx_stats.ranked(rx_stats.medicine, 5)
+    report.severity_distribution = rx_stats.ranked(rx_stats.severity)
+    report.top_doctors = rx_stats.ranked(rx_stats.doctor, 5)
+
+    report.day_over_day = analytics.day_over_day()
+
+    return report
+
+
+def _header(lines, title):
+    lines.append("\n" + RULE)
+    lines.append(title)
+    lines.append(RULE)
+
+
+def render_daily(report, lines):
+    _header(lines, "DAILY OPERATIONS REPORT")
+
+    lines.append(f"\n📋 TODAY'S PRESCRIPTIONS ({report.today})")
+    lines.append(f"   Total: {report.today_total} patients")
+    if report.today_total > 0:
+        lines.append("   By Disease:")
+        for disease, count in report.today_by_disease:
+            lines.append(f"      - {disease}: {count}")
+
+    lines.append("\n📦 INVENTORY STATUS")
+    red_items = report.inventory_by_color.get('Red', [])
+    yellow_items = report.inventory_by_color.get('Yellow', [])
+    if red_items:
+        lines.append("   🔴 CRITICAL (Red):")
+        for item in red_items:
+            lines.append(f"      - {item['Medicine_Name']}: {item['Days_to_Stockout']} days left")
+    if yellow_items:
+        lines.append("   🟡 CAUTION (Yellow):")
+        for item in yellow_items:
+            lines.append(f"      - {item['Medicine_Name']}: {item['Days_to_Stockout']} days left")
+    green_items = len(report.inventory) - len(red_items) - len(yellow_items)
+    lines.append(f"   🟢 SAFE (Green): {green_items} medicines")
+
+    lines.append("\n🦠 DISEASE MONITORING")
+    for disease in report.disease_alerts:
+        status_icon = DISEASE_ALERT_ICONS[disease['Alert_Status']]
+        lines.append(f"   {status_icon} {disease['Disease_Name']}")
+        lines.append(f"      - Cases (30-day): {disease['Cases_Last_30Days']}")
+        lines.append(f"      - Daily avg: {disease['Daily_Average']:.2f}")
+        lines.append(f"      - Trend: {disease['Trend']}")
+        lines.append(f"      - Severe cases: {disease['Severity_Distribution']}")
+
+
+def render_day_over_day(report, lines):
+    deltas = report.day_over_day
+    if not deltas:
+        return
+
+    count, delta = deltas['total']
+    lines.append(f"\n📊 DAY-OVER-DAY (vs {deltas['previous_date']})")
+    lines.append(f"   Prescriptions: {count} ({delta:+d})")
+    for title, name in (("By Disease", 'disease'), ("By Severity", 'severity')):
+        if deltas[name]:
+            lines.append(f"   {title}:")
+            for key, (count, delta) in deltas[name].items():
+                lines.append(f"      - {key}: {count} ({delta:+d})")
+
+
+def render_stock(report, lines):
+    _header(lines, "STOCK PREDICTION ANALYSIS")
+
+    if report.stock_attention:
+        lines.append("\n⚠️  Medicines Needing Attention:")
+        for med in report.stock_attention:
+            lines.append(f"\n   {med['name']}")
+            lines.append(f"   Days remaining: {med['days']}")
+            lines.append(f"   Status: {med['status']}")
+            if med['order_qty'] > 0:
+                lines.append(f"   Recommend order: {med['order_qty']} units")
+    else:
+        lines.append(f"\n✓ All medicines have adequate stock (>{STOCK_ATTENTION_DAYS} days)")
+
+
+def render_forecast(report, lines):
+    _header(lines, "CONSUMPTION FORECAST")
+
+    if not len(report.stock_forecast):
+        lines.append("\nNo stock or consumption data to forecast from")
+        return
+
+    lines.append(f"\nConsumption rates over the window ending {report.forecast_as_of or 'today'}:")
+    for med in _records(report.stock_forecast):
+        days = med['Days_to_Stockout']
+        days_text = f"{days} days left" if days is not None else "no recent use"
+        lines.append(f"   - {med['Medicine_Name']}: {med['Daily_Rate']:.2f}/day, {days_text}")
+        if med['Recommended_Order_Qty'] > 0:
+            lines.append(f"      Recommend order: {med['Recommended_Order_Qty']} units")
+
+
+def render_diseases(report, lines):
+    _header(lines, "DISEASE PATTERN ANALYSIS (30-Day)")
+
+    lines.append("\nTop Diseases by Volume:")
+    for idx, disease in enumerate(report.top_diseases, 1):
+        lines.append(f"\n   {idx}. {disease['Disease_Name']}")
+        lines.append(f"      Total cases: {disease['Cases_Last_30Days']}")
+        lines.append(f"      Daily avg: {disease['Daily_Average']:.2f}")
+        lines.append(f"      Alert status: {disease['Alert_Status']}")
+
+    lines.append("\n\n📈 Rising Trend Diseases (Monitor):")
+    for disease in report.rising_diseases:
+        lines.append(f"\n   {disease['Disease_Name']}")
+        lines.append(f"      Trend: {disease['Trend']}")
+        lines.append(f"      Cases: {disease['Cases_Last_30Days']}")
+        lines.append(f"      Peak date: {disease['Peak_Date']}")
+
+
+def render_prescriptions(report, lines):
+    _header(lines, "PRESCRIPTION ANALYSIS")
+
+    lines.append("\nTop Prescribed Medicines:")
+    for med, count in report.top_medicines:
+        lines.append(f"   - {med}: {count} prescriptions")
+
+    lines.append("\nSeverity Distribution:")
+    for severity, count in report.severity_distribution:
+        pct = (count / report.total_prescriptions) * 100
+        lines.append(f"   - {severity}: {count} ({pct:.1f}%)")
+
+    lines.append("\nTop Doctors by Workload:")
+    for doc, count in report.top_doctors:
+        lines.append(f"   - {doc}: {count} patients")
+
+
+def render_kpis(report, lines):
+    _header(lines, "KEY PERFORMANCE INDICATORS (KPI)")
+
+    green_kpis = report.kpis_by_level.get('Green', [])
+    yellow_kpis = report.kpis_by_level.get('Yellow', [])
+    red_kpis = report.kpis_by_level.get('Red', [])
+
+    lines.append(f"\n🟢 On Target (Green): {len(green_kpis)}")
+    for kpi in green_kpis:
+        lines.append(f"   ✓ {kpi['KPI_Name']}: {kpi['Current_Value']}")
+
+    if yellow_kpis:
+        lines.append(f"\n🟡 Below Target (Yellow): {len(yellow_kpis)}")
+        for kpi in yellow_kpis:
+            lines.append(f"   ⚠ {kpi['KPI_Name']}: {kpi['Current_Value']} (Target: {kpi['Target_Value']})")
+
+    if red_kpis:
+        lines.append(f"\n🔴 Critical (Red): {len(red_kpis)}")
+        for kpi in red_kpis:
+            lines.append(f"   ✗ {kpi['KPI_Name']}: {kpi['Current_Value']} (Target: {kpi['Target_Value']})")
+
+
+def render_text(report):
+    """Full console report: the original print-based sections plus deltas and the consumption forecast"""
+    lines = []
+    render_daily(report, lines)
+    render_day_over_day(report, lines)
+    render_stock(report, lines)
+    render_forecast(report, lines)
+    render_diseases(report, lines)
+    render_prescriptions(report, lines)
+    render_kpis(report, lines)
+    _header(lines, "END OF REPORT")
+    return "\n".join(lines)
+
+
+def iter_json_sections(report):
+    """(key, value) pairs of the JSON report in order, for streaming writers"""
+    yield 'timestamp', report.timestamp
+    yield 'summary', {
+        'total_patients_today': report.today_total,
+        'medicines_safe': report.medicines_safe,
+        'medicines_warning': report.medicines_warning,
+        'medicines_critical': report.medicines_critical,
+    }
+    yield 'inventory_alerts', report.inventory
+    yield 'stock_forecast', report.stock_forecast
+    yield 'kpi_status', {
+        'green': len(report.kpis_by_level.get('Green', [])),
+        'yellow': len(report.kpis_by_level.get('Yellow', [])),
+        'red': len(report.kpis_by_level.get('Red', [])),
+    }
+    yield 'diseases_alert', report.disease_alert_records
+    yield 'day_over_day', report.day_over_day
+
+
+def render_json(report):
+    """JSON-ready report dictionary for the API/Dashboard (DataFrame sections as lists of records)"""
+    return {
+        key: list(frame_records(value)) if isinstance(value, pd.DataFrame) else value
+        for key, value in iter_json_sections(report)
+    }
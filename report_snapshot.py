@@ -0,0 +1,181 @@
+"""
+Incremental report snapshots
+Persists the prescription tallies for every closed day plus the last day's own
+tallies, so a new run only folds in records since the watermark and can report
+day-over-day deltas. With a flat CSV log the snapshot also keeps the byte offset
+where the next run resumes reading
+"""
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from opd_aggregates import PrescriptionAggregates
+
+SNAPSHOT_VERSION = 1
+
+DELTA_FIELDS = ('disease', 'medicine', 'doctor', 'severity')
+
+# Bytes before the saved offset that are hashed to tell an appended log from a rewritten one
+MARK_BYTES = 4096
+
+
+def _mark(f, offset):
+    """Digest of the bytes just before offset"""
+    f.seek(max(offset - MARK_BYTES, 0))
+    return hashlib.blake2b(f.read(min(offset, MARK_BYTES)), digest_size=16).hexdigest()
+
+
+class ReportSnapshot:
+    """All-time tallies for days before the watermark, plus the last closed day"""
+
+    def __init__(self, watermark=None, totals=None, last_day=None, last_day_date=None, log=None):
+        # First date NOT covered by the snapshot ('YYYY-MM-DD'); None means nothing folded yet
+        self.watermark = watermark
+        self.totals = totals or PrescriptionAggregates()
+        self.last_day = last_day or PrescriptionAggregates()
+        self.last_day_date = last_day_date
+        # Flat log position: {'path', 'offset', 'mark'}; None when it was never read
+        self.log = log
+
+    @classmethod
+    def load(cls, path):
+        """Read a snapshot, or return None if there is none (or it is from another version)"""
+        path = Path(path)
+        if not path.exists():
+            return None
+        with open(path) as f:
+            payload = json.load(f)
+        if payload.get('version') != SNAPSHOT_VERSION:
+            return None
+        return cls(
+            watermark=payload['watermark'],
+            totals=PrescriptionAggregates.from_dict(payload['totals']),
+            last_day=PrescriptionAggregates.from_dict(payload['last_day']),
+            last_day_date=payload.get('last_day_date'),
+            log=payload.get('log'),
+        )
+
+    def save(self, path):
+        """Write the snapshot atomically so a crashed run never leaves a partial file"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            'version': SNAPSHOT_VERSION,
+            'watermark': self.watermark,
+            'last_day_date': self.last_day_date,
+            'log': self.log,
+            'totals': self.totals.to_dict(),
+            'last_day': self.last_day.to_dict(),
+        }
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+    def _resume_offset(self, path, size):
+        """Where reading the log resumes; None if it is not the log the offset was saved for"""
+        if self.log is None:
+            return 0
+        offset = self.log['offset']
+        if self.log['path'] != str(path.resolve()) or offset > size:
+            return None
+        with open(path, 'rb') as f:
+            return offset if _mark(f, offset) == self.log['mark'] else None
+
+    def read_log(self, path, today, columns=None):
+        """
+        Records of an append-only CSV log (one record per line) dated on or after
+        the watermark, read from the offset the last run saved instead of from the top
+
+        The new offset is the start of the first record still open (dated today
+        or later), so open records are read again next time; closed ones after it
+        are read again too but fall before the new watermark. A log that shrank
+        or was rewritten starts the snapshot over.
+        """
+        path = Path(path)
+        size = path.stat().st_size
+        offset = self._resume_offset(path, size)
+        if offset is None:
+            print(f"⚠ {path.name} was rewritten or moved since the snapshot was saved; rebuilding it")
+            self.watermark, self.last_day_date = None, None
+            self.totals, self.last_day = PrescriptionAggregates(), PrescriptionAggregates()
+            offset = 0
+
+        with open(path, 'rb') as f:
+            header = f.readline()
+            position = max(offset, len(header))
+            f.seek(position)
+            starts, lines = [], []
+            for line in f:
+                if line.strip():
+                    starts.append(position)
+                    lines.append(line)
+                position += len(line)
+            usecols = (lambda column: column in columns) if columns else None
+            records = pd.read_csv(io.BytesIO(header + b''.join(lines)), usecols=usecols)
+
+            dates = records['Date'].astype(str) if len(records) > 0 else pd.Series(dtype=str)
+            still_open = (dates >= str(today)).to_numpy().nonzero()[0]
+            if len(records) != len(starts):
+                # Not one record per line; stay put and let the watermark skip what was folded
+                resume = offset
+            elif len(still_open) > 0:
+                resume = starts[still_open[0]]
+            elif lines and not lines[-1].endswith(b'\n'):
+                # The last line may still be being written
+                resume = starts[-1]
+            else:
+                resume = position
+            self.log = {'path': str(path.resolve()), 'offset': resume, 'mark': _mark(f, resume)}
+
+        if self.watermark is not None and len(records) > 0:
+            records = records[dates >= self.watermark]
+        return records
+
+    def advance(self, records, today):
+        """
+        Fold records dated on or after the watermark into the snapshot
+
+        Records before today close their day and go into the snapshot; records
+        from today onwards are still open and are only returned.
+
+        Returns:
+            PrescriptionAggregates for the open (today and later) records
+        """
+        today = str(today)
+        dates = records['Date'].astype(str) if len(records) > 0 else pd.Series(dtype=str)
+        closed = records[dates < today] if len(records) > 0 else records
+
+        if len(closed) > 0:
+            self.totals.merge(PrescriptionAggregates.from_frame(closed))
+            closed_dates = dates[dates < today]
+            last_date = closed_dates.max()
+            self.last_day = PrescriptionAggregates.from_frame(closed[closed_dates == last_date])
+            self.last_day_date = last_date
+
+        if self.watermark is None or today > self.watermark:
+            self.watermark = today
+
+        still_open = records[dates >= today] if len(records) > 0 else records
+        return PrescriptionAggregates.from_frame(still_open)
+
+
+def day_over_day(current, previous):
+    """
+    Per-category change between two days' tallies
+
+    Returns:
+        Dictionary with the total and {name: (count, delta)} for each category
+    """
+    deltas = {'total': (current.total, current.total - previous.total)}
+    for name in DELTA_FIELDS:
+        now, before = getattr(current, name), getattr(previous, name)
+        deltas[name] = {
+            key: (now.get(key, 0), now.get(key, 0) - before.get(key, 0))
+            for key in list(now) + [key for key in before if key not in now]
+        }
+    return deltas
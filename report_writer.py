@@ -0,0 +1,219 @@
+"""
+Streaming JSON report writer
+Report sections are encoded and written one at a time, and DataFrames and
+record lists or iterators are converted and written a batch of rows at a time,
+as pretty or compact JSON or as NDJSON, optionally gzipped. NumPy and pandas
+values, at any depth, are written as their JSON equivalents
+"""
+import gzip
+import json
+import math
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+FORMATS = ('pretty', 'compact', 'ndjson')
+
+# File extension for each format (before an optional .gz)
+EXTENSIONS = {'pretty': '.json', 'compact': '.json', 'ndjson': '.ndjson'}
+
+FRAME_CHUNK_ROWS = 10000
+
+
+def to_native(value):
+    """JSON-ready equivalent of a value, converting NumPy/pandas scalars and arrays inside dicts and lists too"""
+    if isinstance(value, dict):
+        return {to_native(key): to_native(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_native(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    if isinstance(value, pd.Timedelta):
+        return value.total_seconds()
+    if isinstance(value, (np.ndarray, pd.Series)):
+        return to_native(value.tolist())
+    if isinstance(value, (set, frozenset)):
+        return sorted(to_native(item) for item in value)
+    return value
+
+
+class ReportEncoder(json.JSONEncoder):
+    """json encoder that understands NumPy and pandas types"""
+
+    def default(self, value):
+        native = to_native(value)
+        if native is not value:
+            return native
+        if isinstance(value, pd.DataFrame):
+            return list(frame_records(value))
+        return super().default(value)
+
+
+def frame_records(frame, chunk_rows=FRAME_CHUNK_ROWS):
+    """Yield a DataFrame's rows as plain dicts, a chunk at a time, with missing values as None"""
+    for batch in _frame_batches(frame, chunk_rows):
+        yield from batch
+
+
+def _frame_batches(frame, chunk_rows):
+    """A DataFrame's rows as lists of dicts, converting chunk_rows rows at a time"""
+    for start in range(0, len(frame), chunk_rows):
+        chunk = frame.iloc[start:start + chunk_rows]
+        records = chunk.to_dict('records')
+        # to_dict() already gives Python scalars; only the missing cells need turning into None
+        missing = chunk.isna().to_numpy()
+        if missing.any():
+            for row, column in zip(*np.nonzero(missing)):
+                records[row][chunk.columns[column]] = None
+        yield records
+
+
+def _is_stream(value):
+    """DataFrames, lists, generators and iterators of records are written element by element"""
+    return not isinstance(value, (dict, tuple, str, bytes)) and hasattr(value, '__iter__')
+
+
+def _batches(records, size=1000):
+    """Group an iterable of records into lists of JSON-ready records, encoded and written together"""
+    if isinstance(records, pd.DataFrame):
+        yield from _frame_batches(records, size)
+        return
+    batch = []
+    for record in records:
+        batch.append(to_native(record))
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ReportWriter:
+    """
+    Write a report section by section
+
+    Usage:
+        with ReportWriter(path, fmt='compact') as writer:
+            writer.write_section('summary', {...})
+            writer.write_section('inventory_alerts', frame)
+    """
+
+    def __init__(self, path, fmt='pretty', compress=None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown report format: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self.compress = str(path).endswith('.gz') if compress is None else compress
+        if fmt == 'pretty':
+            self.encoder = ReportEncoder(indent=2)
+        else:
+            self.encoder = ReportEncoder(separators=(',', ':'))
+        self._file = None
+        self._sections = 0
+
+    def __enter__(self):
+        if self.compress:
+            self._file = gzip.open(self.path, 'wt', encoding='utf-8')
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8')
+        if self.fmt != 'ndjson':
+            self._file.write('{')
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self.fmt == 'pretty':
+                self._file.write('\n}' if self._sections else '}')
+            elif self.fmt == 'compact':
+                self._file.write('}')
+        finally:
+            self._file.close()
+
+    def _encode(self, value, indent_level=0):
+        """Yield encoded chunks, indented to sit indent_level levels deep in pretty output"""
+        for chunk in self.encoder.iterencode(value):
+            if indent_level and self.fmt == 'pretty':
+                # Structural newlines only; newlines inside strings are escaped
+                chunk = chunk.replace('\n', '\n' + '  ' * indent_level)
+            yield chunk
+
+    def write_section(self, key, value):
+        """
+        Write one top-level section
+
+        DataFrames, lists and iterators of records are converted and written a
+        batch of rows at a time, so a section is never held whole as dicts
+        """
+        if self.fmt == 'ndjson':
+            if _is_stream(value):
+                written = 0
+                for batch in _batches(value):
+                    lines = (self.encoder.encode({'section': key, 'record': record}) for record in batch)
+                    self._file.write('\n'.join(lines) + '\n')
+                    written += len(batch)
+                if not written:
+                    # An empty section still gets a line, so readers see it rather than a missing key
+                    self._write_line({'section': key, 'data': []})
+            else:
+                self._write_line({'section': key, 'data': to_native(value)})
+            self._sections += 1
+            return
+
+        write = self._file.write
+        if self._sections:
+            write(',')
+        if self.fmt == 'pretty':
+            write('\n  ')
+        write(json.dumps(key))
+        write(': ' if self.fmt == 'pretty' else ':')
+
+        if _is_stream(value):
+            self._write_array(value)
+        else:
+            for chunk in self._encode(to_native(value), indent_level=1):
+                write(chunk)
+        self._sections += 1
+
+    def _write_array(self, records):
+        """Write records as a JSON array, converting and encoding a whole batch of records per write"""
+        write = self._file.write
+        pretty = self.fmt == 'pretty'
+        write('[')
+        first = True
+        for batch in _batches(records):
+            encoded = self.encoder.encode(batch)
+            if pretty:
+                # Elements sit two levels deep; drop the batch's own '[' and '\n  ]'
+                body = encoded.replace('\n', '\n  ')[1:-4]
+            else:
+                body = encoded[1:-1]
+            write(body if first else ',' + body)
+            first = False
+        if pretty and not first:
+            write('\n  ')
+        write(']')
+
+    def _write_line(self, payload):
+        for chunk in self._encode(payload):
+            self._file.write(chunk)
+        self._file.write('\n')
+
+
+def report_path(stem, fmt='pretty', compress=False):
+    """File name for a report in the given format"""
+    return f"{stem}{EXTENSIONS[fmt]}{'.gz' if compress else ''}"
+
+
+def write_report(sections, path, fmt='pretty', compress=None):
+    """Stream (key, value) sections to path"""
+    with ReportWriter(path, fmt=fmt, compress=compress) as writer:
+        for key, value in sections:
+            writer.write_section(key, value)
+    return path
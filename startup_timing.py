@@ -0,0 +1,48 @@
+"""
+Startup timing report for the Streamlit app
+Records how long each deferred import and data load took the first time it ran
+"""
+import importlib
+import sys
+import time
+from contextlib import contextmanager
+
+# (category, name, seconds) in the order they happened, kept for the process lifetime
+_timings = []
+
+
+@contextmanager
+def timed(category, name):
+    """Time a block and add it to the report"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _timings.append((category, name, time.perf_counter() - start))
+
+
+def timed_import(module_name):
+    """Import a module, recording the cost only if it was not already loaded"""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    with timed('import', module_name):
+        return importlib.import_module(module_name)
+
+
+def get_report():
+    """Return timings grouped by category: {category: [(name, seconds), ...]}"""
+    report = {}
+    for category, name, seconds in _timings:
+        report.setdefault(category, []).append((name, seconds))
+    return report
+
+
+def format_report():
+    """Render the timing report as plain text"""
+    lines = []
+    for category, entries in get_report().items():
+        total = sum(seconds for _, seconds in entries)
+        lines.append(f"[{category}] total {total * 1000:.1f} ms")
+        for name, seconds in entries:
+            lines.append(f"    {name:<32} {seconds * 1000:8.1f} ms")
+    return "\n".join(lines) if lines else "No timings recorded yet"
@@ -0,0 +1,139 @@
+"""
+Consumption-rate stock forecasting
+Per-medicine daily consumption is aggregated from the prescription log into a
+date x medicine matrix; rolling-window rates turn current stock into
+days-to-stockout and reorder quantities that update as prescriptions arrive
+"""
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['Date', 'Prescribed_Medicine', 'Quantity']
+
+DEFAULT_WINDOW_DAYS = 30
+# Days between placing an order and receiving it, and days of stock an order should cover
+LEAD_TIME_DAYS = 7
+COVER_DAYS = 30
+
+
+def daily_consumption(frame):
+    """
+    Units dispensed per day and medicine for one chunk of the prescription log
+
+    Returns:
+        DataFrame indexed by date with one column per medicine
+    """
+    if len(frame) == 0 or 'Prescribed_Medicine' not in frame.columns:
+        return pd.DataFrame(dtype=float)
+    quantity = frame['Quantity'] if 'Quantity' in frame.columns else pd.Series(1, index=frame.index)
+    units = pd.DataFrame({
+        'Date': pd.to_datetime(frame['Date']).dt.normalize(),
+        'Medicine': frame['Prescribed_Medicine'],
+        'Units': pd.to_numeric(quantity, errors='coerce').fillna(0),
+    })
+    return units.pivot_table(index='Date', columns='Medicine', values='Units', aggfunc='sum', fill_value=0)
+
+
+class StockForecaster:
+    """Rolling consumption rates and stock levels for every medicine"""
+
+    def __init__(self, window_days=DEFAULT_WINDOW_DAYS, lead_time_days=LEAD_TIME_DAYS,
+                 cover_days=COVER_DAYS):
+        self.window_days = window_days
+        self.lead_time_days = lead_time_days
+        self.cover_days = cover_days
+        # Date x medicine units dispensed; only the last window_days are kept
+        self.daily = pd.DataFrame(dtype=float)
+        self.stock = pd.Series(dtype=float)
+        self.reorder_level = pd.Series(dtype=float)
+
+    @classmethod
+    def from_history(cls, chunks, inventory=None, **options):
+        """Build rates from an iterator of prescription frames, then attach stock levels"""
+        forecaster = cls(**options)
+        for chunk in chunks:
+            forecaster.add_consumption(chunk)
+        if inventory is not None:
+            forecaster.set_stock(inventory)
+        return forecaster
+
+    @property
+    def as_of(self):
+        """Latest day with consumption; the rate window ends here"""
+        return self.daily.index.max() if len(self.daily) else None
+
+    def set_stock(self, inventory):
+        """Current stock and reorder levels from an inventory frame (Medicine_Name, Current_Stock, Reorder_Level)"""
+        inventory = inventory.set_index('Medicine_Name')
+        self.stock = inventory['Current_Stock'].astype(float)
+        if 'Reorder_Level' in inventory.columns:
+            self.reorder_level = inventory['Reorder_Level'].astype(float)
+
+    def add_consumption(self, frame):
+        """Fold historical prescriptions into the rate window (stock is not touched)"""
+        consumption = daily_consumption(frame)
+        if len(consumption) == 0:
+            return self
+        self.daily = self.daily.add(consumption, fill_value=0) if len(self.daily) else consumption
+        self._trim()
+        return self
+
+    def dispense(self, frame):
+        """New prescriptions: update the rates and take their units off current stock"""
+        self.add_consumption(frame)
+        if len(frame) > 0 and 'Quantity' in frame.columns:
+            units = pd.to_numeric(frame['Quantity'], errors='coerce').fillna(0)
+            used = units.groupby(frame['Prescribed_Medicine']).sum()
+            self.stock = self.stock.sub(used, fill_value=0)
+        return self
+
+    def merge(self, other):
+        """Combine another facility's consumption and stock into a network-wide forecast"""
+        if len(other.daily):
+            self.daily = self.daily.add(other.daily, fill_value=0) if len(self.daily) else other.daily.copy()
+            self._trim()
+        self.stock = self.stock.add(other.stock, fill_value=0)
+        self.reorder_level = self.reorder_level.add(other.reorder_level, fill_value=0)
+        return self
+
+    def _trim(self):
+        self.daily = self.daily.sort_index().fillna(0)
+        cutoff = self.daily.index.max() - pd.Timedelta(days=self.window_days - 1)
+        self.daily = self.daily[self.daily.index >= cutoff]
+
+    def rates(self):
+        """Mean units per day over the window for every medicine (days without use count as zero)"""
+        if not len(self.daily):
+            return pd.Series(dtype=float)
+        window = pd.date_range(end=self.as_of, periods=self.window_days, freq='D')
+        return self.daily.reindex(window, fill_value=0).rolling(self.window_days, min_periods=1).mean().iloc[-1]
+
+    def forecast(self):
+        """
+        Days to stockout and reorder quantity for every stocked or consumed medicine
+
+        Returns:
+            DataFrame sorted by days to stockout (medicines with no consumption last)
+        """
+        rates = self.rates()
+        medicines = self.stock.index.union(rates.index)
+        rates = rates.reindex(medicines, fill_value=0)
+        stock = self.stock.reindex(medicines, fill_value=0)
+        reorder_level = self.reorder_level.reindex(medicines, fill_value=0)
+
+        days = np.floor(stock.clip(lower=0) / rates.where(rates > 0))
+        needed = rates * (self.lead_time_days + self.cover_days) + reorder_level - stock
+        order = np.ceil(needed.clip(lower=0))
+
+        result = pd.DataFrame({
+            'Medicine_Name': medicines,
+            'Current_Stock': stock.round().astype(int).values,
+            'Daily_Rate': rates.round(2).values,
+            'Days_to_Stockout': days.values,
+            'Recommended_Order_Qty': order.astype(int).values,
+        })
+        result = result.sort_values('Days_to_Stockout', na_position='last', kind='stable').reset_index(drop=True)
+        # Whole days, with None rather than NaN for medicines that had no recent use
+        result['Days_to_Stockout'] = pd.Series(
+            [None if pd.isna(d) else int(d) for d in result['Days_to_Stockout']], dtype=object
+        )
+        return result
@@ -0,0 +1,32 @@
+"""
+Streamlit page modules
+Each page declares the tables and heavy libraries it needs; app.py imports the
+page module and loads its data only when that page is selected
+"""
+from collections import namedtuple
+
+PageSpec = namedtuple('PageSpec', ['module', 'datasets', 'libraries'])
+
+PAGES = {
+    "📊 Dashboard": PageSpec(
+        'views.dashboard', ('inventory', 'diseases'), ('pandas', 'plotly.express')
+    ),
+    "➕ Data Entry": PageSpec(
+        'views.data_entry', ('diseases_ref', 'medicines', 'doctors'), ('pandas',)
+    ),
+    "📦 Inventory": PageSpec(
+        'views.inventory', ('inventory',), ('pandas', 'plotly.express')
+    ),
+    "🦠 Disease Monitor": PageSpec(
+        'views.disease_monitor', ('diseases',), ('pandas', 'plotly.express')
+    ),
+    "🏥 Health Risk Assessment": PageSpec(
+        'views.health_risk', ('doctors',), ('pandas', 'plotly.graph_objects')
+    ),
+    "📈 Analytics": PageSpec(
+        'views.analytics', ('kpis', 'doctors'), ('pandas', 'plotly.express')
+    ),
+    "⚙️ Settings": PageSpec(
+        'views.settings', (), ()
+    ),
+}
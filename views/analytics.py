@@ -0,0 +1,104 @@
+"""
+Analytics page: KPIs, severity and prescription charts, doctor workload
+"""
+from datetime import datetime
+
+import plotly.express as px
+import streamlit as st
+
+from opd_data import load_aggregates, load_doctor_workload
+
+
+def render(data):
+    """Render the page"""
+    aggregates = load_aggregates()
+
+    st.title("📈 Analytics & Performance")
+    
+    st.subheader("KPI Dashboard")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.metric("👥 Patients/Day", "3.3", "-33% vs target")
+    
+    with col2:
+        st.metric("✅ Prescription Accuracy", "97%", "-2% vs target")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.metric("📦 Stock Availability", "87.5%", "-8% vs target")
+    
+    with col2:
+        st.metric("⏱️ Avg Wait Time", "22 min", "+7 min vs target")
+    
+    st.divider()
+    
+    # KPI Detailed Table
+    st.subheader("All KPIs")
+    
+    kpi_display = data['kpis'][['KPI_Name', 'Current_Value', 'Target_Value', 'Status', 'Alert_Level']].copy()
+    kpi_display['Status_Icon'] = kpi_display['Alert_Level'].map({
+        'Green': '🟢', 'Yellow': '🟡', 'Red': '🔴'
+    })
+    kpi_display = kpi_display[['Status_Icon', 'KPI_Name', 'Current_Value', 'Target_Value']]
+    kpi_display.columns = ['Status', 'KPI', 'Current', 'Target']
+    
+    st.dataframe(kpi_display, use_container_width=True, hide_index=True)
+    
+    st.divider()
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Disease Severity Distribution")
+        severity_names, severity_values = aggregates.top(aggregates.severity)
+        fig = px.pie(
+            values=severity_values,
+            names=severity_names,
+            title="Patient Severity Breakdown",
+            color_discrete_map={'Mild': '#28a745', 'Moderate': '#ffc107', 'Severe': '#fd7e14', 'Critical': '#dc3545'}
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        st.subheader("Top Prescribed Medicines")
+        med_names, med_values = aggregates.top(aggregates.medicine, 8)
+        fig = px.bar(
+            x=med_values,
+            y=med_names,
+            orientation='h',
+            title="Most Prescribed Medicines",
+            labels={'x': 'Count', 'y': 'Medicine'}
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    st.divider()
+    
+    st.subheader("Doctor Performance")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        date_bounds = [
+            datetime.strptime(d, "%Y-%m-%d").date()
+            for d in (aggregates.first_rx_date, aggregates.last_rx_date) if d
+        ]
+        date_range = st.date_input("Prescription date range", value=date_bounds) if date_bounds else ()
+    with col2:
+        specializations = st.multiselect(
+            "Specialization",
+            sorted(data['doctors']['Specialization'].dropna().unique())
+        )
+
+    start_date = date_range[0] if len(date_range) > 0 else None
+    end_date = date_range[1] if len(date_range) > 1 else start_date
+    doctor_stats = load_doctor_workload(start_date, end_date, tuple(specializations))
+
+    fig = px.bar(
+        x=doctor_stats['Doctor'],
+        y=doctor_stats['Patients'],
+        title="Patients per Doctor",
+        labels={'Doctor': 'Doctor Name', 'Patients': 'Number of Patients'}
+    )
+    st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,192 @@
+"""
+Dashboard page: headline metrics, inventory and disease alerts, charts
+"""
+import plotly.express as px
+import streamlit as st
+
+from opd_data import load_aggregates
+
+
+def render(data):
+    """Render the page"""
+    aggregates = load_aggregates()
+
+    # Medical Logo
+    st.markdown("""
+    <div style="text-align: center; margin-bottom: 20px;">
+        <svg width="120" height="120" viewBox="0 0 200 200" xmlns="http://www.w3.org/2000/svg">
+            <!-- Outer Circle -->
+            <circle cx="100" cy="100" r="95" fill="#f0f9ff" stroke="#667eea" stroke-width="3"/>
+            
+            <!-- Inner Decorative Circle -->
+            <circle cx="100" cy="100" r="85" fill="none" stroke="#764ba2" stroke-width="2" opacity="0.3"/>
+            
+            <!-- Medical Cross - Main -->
+            <g id="medical-cross">
+                <!-- Vertical Bar -->
+                <rect x="85" y="55" width="30" height="90" fill="#667eea" rx="5"/>
+                <!-- Horizontal Bar -->
+                <rect x="55" y="85" width="90" height="30" fill="#667eea" rx="5"/>
+            </g>
+            
+            <!-- Heartbeat Pattern -->
+            <g id="heartbeat" opacity="0.2">
+                <line x1="140" y1="130" x2="155" y2="130" stroke="#ff6b6b" stroke-width="2" stroke-linecap="round"/>
+                <polyline points="155,130 165,115 175,140 185,130" fill="none" stroke="#ff6b6b" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+            </g>
+            
+            <!-- Pulse Dots -->
+            <circle cx="50" cy="100" r="3" fill="#764ba2" opacity="0.4"/>
+            <circle cx="150" cy="100" r="3" fill="#764ba2" opacity="0.4"/>
+            <circle cx="100" cy="50" r="3" fill="#764ba2" opacity="0.4"/>
+            <circle cx="100" cy="150" r="3" fill="#764ba2" opacity="0.4"/>
+        </svg>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.title("🏥 Hospital OPD Dashboard")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.markdown("""
+        <div class="metric-card" style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);">
+        <p style="margin: 0; color: rgba(255,255,255,0.9); font-size: 14px;">👥 Total Patients</p>
+        <p style="margin: 10px 0 0 0; color: white; font-size: 28px; font-weight: 800;">100</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("""
+        <div class="metric-card" style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);">
+        <p style="margin: 0; color: rgba(255,255,255,0.9); font-size: 14px;">💊 Medicines</p>
+        <p style="margin: 10px 0 0 0; color: white; font-size: 28px; font-weight: 800;">8</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown("""
+        <div class="metric-card" style="background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);">
+        <p style="margin: 0; color: rgba(255,255,255,0.9); font-size: 14px;">👨‍⚕️ Doctors</p>
+        <p style="margin: 10px 0 0 0; color: white; font-size: 28px; font-weight: 800;">6</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col4:
+        st.markdown("""
+        <div class="metric-card" style="background: linear-gradient(135deg, #43e97b 0%, #38f9d7 100%);">
+        <p style="margin: 0; color: rgba(255,255,255,0.9); font-size: 14px;">🦠 Diseases</p>
+        <p style="margin: 10px 0 0 0; color: white; font-size: 28px; font-weight: 800;">8</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.divider()
+    
+    # Summary Cards
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.markdown("""
+        <div class="alert-success">
+        <h3>✅ SAFE MEDICINES</h3>
+        <p class="stat-number">7</p>
+        <p class="desc-text">All medicines above reorder level</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("""
+        <div class="alert-warning">
+        <h3>⚠️ MONITOR</h3>
+        <p class="stat-number">1</p>
+        <p class="desc-text">ORS + Zinc: 31 days remaining</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown("""
+        <div class="alert-danger">
+        <h3>🚨 ALERTS</h3>
+        <p class="stat-number">3</p>
+        <p class="desc-text">Disease outbreaks being monitored</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.divider()
+    
+    # Key Metrics
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📦 Inventory Status")
+        inv_summary = data['inventory'][['Medicine_Name', 'Alert_Color', 'Days_to_Stockout']].copy()
+        
+        color_map = {'Green': '🟢', 'Yellow': '🟡', 'Red': '🔴'}
+        inv_summary['Status'] = inv_summary['Alert_Color'].map(color_map) + ' ' + inv_summary['Alert_Color']
+        
+        for _, row in inv_summary.iterrows():
+            col_a, col_b, col_c = st.columns([2, 1, 1])
+            with col_a:
+                st.text(row['Medicine_Name'])
+            with col_b:
+                st.text(row['Status'])
+            with col_c:
+                st.text(f"{row['Days_to_Stockout']:.0f}d")
+    
+    with col2:
+        st.subheader("🦠 Disease Alerts")
+        disease_alerts = data['diseases'][['Disease_Name', 'Alert_Status', 'Cases_Last_30Days']].copy()
+        disease_alerts = disease_alerts[disease_alerts['Alert_Status'].isin(['Red', 'Orange', 'Yellow', 'Green'])].head(5)
+        
+        alert_map = {'Red': '🔴', 'Orange': '🟠', 'Yellow': '🟡', 'Green': '🟢'}
+        disease_alerts['Icon'] = disease_alerts['Alert_Status'].map(alert_map)
+        
+        for _, row in disease_alerts.iterrows():
+            col_a, col_b, col_c = st.columns([2, 1, 1])
+            with col_a:
+                st.text(row['Disease_Name'])
+            with col_b:
+                st.text(f"{row['Icon']} {row['Alert_Status']}")
+            with col_c:
+                st.text(f"{row['Cases_Last_30Days']} cases")
+    
+    st.divider()
+    
+    # Charts
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📊 Severity Distribution")
+        severity_names, severity_values = aggregates.top(aggregates.severity)
+        fig = px.pie(
+            values=severity_values,
+            names=severity_names,
+            color_discrete_map={'Mild': '#00d084', 'Moderate': '#ff9500', 'Severe': '#ff3838', 'Critical': '#d63031'},
+            title="Patient Severity Distribution"
+        )
+        fig.update_traces(textposition='inside', textinfo='percent+label', marker=dict(line=dict(color='white', width=2)))
+        fig.update_layout(font=dict(size=12, color='white'), paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        st.subheader("🏥 Top Diseases")
+        disease_names, disease_values = aggregates.top(aggregates.disease, 6)
+        fig = px.bar(
+            x=disease_values,
+            y=disease_names,
+            orientation='h',
+            title="Top 6 Diseases",
+            labels={'x': 'Cases', 'y': 'Disease'},
+            color=disease_values,
+            color_continuous_scale=['#ff3838', '#ff6b35', '#ff9500', '#ffc107', '#00d084', '#00a652']
+        )
+        fig.update_traces(marker=dict(line=dict(color='white', width=2)))
+        fig.update_layout(
+            font=dict(size=12),
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            showlegend=False,
+            xaxis=dict(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)'),
+            yaxis=dict(showgrid=False)
+        )
+        st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,113 @@
+"""
+Data Entry page: fast patient registration form
+"""
+from datetime import datetime
+
+import streamlit as st
+
+
+def render(data):
+    """Render the page"""
+    st.title("➕ Patient Data Entry")
+    st.info("Fast & efficient patient registration system (< 2 minutes per patient)")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("1️⃣ Patient Information")
+        cnic = st.text_input("CNIC", placeholder="30161-3658505-6")
+        age = st.number_input("Age", min_value=0, max_value=120, value=30)
+        gender = st.selectbox("Gender", ["M", "F"])
+    
+    with col2:
+        st.subheader("2️⃣ Clinical Information")
+        disease_code = st.selectbox(
+            "Disease Code",
+            data['diseases_ref']['Disease_Code'].values,
+            format_func=lambda x: f"{x} - {data['diseases_ref'][data['diseases_ref']['Disease_Code']==x]['Disease_Name'].values[0] if len(data['diseases_ref'][data['diseases_ref']['Disease_Code']==x]) > 0 else 'Unknown'}"
+        )
+        
+        # Get disease details
+        disease_info = data['diseases_ref'][data['diseases_ref']['Disease_Code'] == disease_code]
+        if len(disease_info) > 0:
+            disease_name = disease_info.iloc[0]['Disease_Name']
+            best_medicine = disease_info.iloc[0]['Most_Effective_Medicine']
+            st.success(f"✓ Disease: {disease_name}")
+            st.info(f"💊 Recommended Medicine: {best_medicine}")
+    
+    st.divider()
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.subheader("3️⃣ Severity")
+        severity_map = {
+            'M': 'Mild (Green)',
+            'MOD': 'Moderate (Yellow)',
+            'SEV': 'Severe (Orange)',
+            'CRI': 'Critical (Red)'
+        }
+        severity = st.selectbox(
+            "Severity Level",
+            ["M", "MOD", "SEV", "CRI"],
+            format_func=lambda x: f"{x} - {severity_map[x]}"
+        )
+    
+    with col2:
+        st.subheader("4️⃣ Medicine")
+        medicine = st.selectbox("Select Medicine", data['medicines']['Medicine_Name'].values)
+        
+        # Get medicine details
+        med_info = data['medicines'][data['medicines']['Medicine_Name'] == medicine]
+        if len(med_info) > 0:
+            st.text(f"Dosage: {med_info.iloc[0]['Standard_Dosage']}")
+    
+    with col3:
+        st.subheader("5️⃣ Quantity")
+        quantity = st.number_input("Quantity", min_value=1, value=1)
+    
+    st.divider()
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("6️⃣ Doctor Assignment")
+        doctor = st.selectbox("Assign Doctor", data['doctors']['Doctor_Name'].values)
+        doctor_spec = data['doctors'][data['doctors']['Doctor_Name'] == doctor].iloc[0]['Specialization']
+        st.text(f"Specialty: {doctor_spec}")
+    
+    with col2:
+        st.subheader("7️⃣ Additional Notes")
+        notes = st.text_area("Notes (optional)", height=80)
+    
+    st.divider()
+    
+    # Save Button
+    col1, col2, col3 = st.columns([1, 1, 2])
+    
+    with col1:
+        if st.button("✅ SAVE", use_container_width=True):
+            # Validate
+            if not cnic or len(cnic) < 10:
+                st.error("❌ Invalid CNIC")
+            elif not age or age < 0 or age > 120:
+                st.error("❌ Invalid Age")
+            else:
+                st.success("✅ Patient registered successfully!")
+                st.balloons()
+                
+                # Show summary
+                st.json({
+                    "CNIC": cnic,
+                    "Age": age,
+                    "Gender": gender,
+                    "Disease": disease_name,
+                    "Medicine": medicine,
+                    "Severity": severity,
+                    "Doctor": doctor,
+                    "Timestamp": datetime.now().isoformat()
+                })
+    
+    with col2:
+        if st.button("🔄 RESET", use_container_width=True):
+            st.rerun()
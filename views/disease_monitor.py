@@ -0,0 +1,95 @@
+"""
+Disease Monitor page: 30-day outbreak status
+"""
+import plotly.express as px
+import streamlit as st
+
+from opd_data import load_aggregates, load_outbreaks
+
+
+def render(data):
+    """Render the page"""
+    aggregates = load_aggregates()
+
+    st.title("🦠 Disease Outbreak Monitoring (30-Day)")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        green_d = aggregates.disease_alerts['Green']
+        st.metric("🟢 Normal", green_d)
+    
+    with col2:
+        yellow_d = aggregates.disease_alerts['Yellow'] + aggregates.disease_alerts['Orange']
+        st.metric("⚠️ Alert", yellow_d)
+    
+    with col3:
+        red_d = aggregates.disease_alerts['Red']
+        st.metric("🔴 Outbreak", red_d)
+    
+    with col4:
+        total_cases = aggregates.total_cases_30d
+        st.metric("🦠 Total Cases", total_cases)
+    
+    st.divider()
+    
+    # Disease Summary
+    st.subheader("Disease Status Summary")
+    
+    disease_display = data['diseases'][['Disease_Name', 'Cases_Last_30Days', 'Daily_Average', 'Trend', 'Alert_Status']].copy()
+    disease_display['Status_Icon'] = disease_display['Alert_Status'].map({
+        'Green': '🟢', 'Yellow': '🟡', 'Orange': '🟠', 'Red': '🔴'
+    })
+    disease_display = disease_display[['Status_Icon', 'Disease_Name', 'Cases_Last_30Days', 'Daily_Average', 'Trend']]
+    disease_display.columns = ['Alert', 'Disease', 'Cases (30d)', 'Daily Avg', 'Trend']
+    
+    st.dataframe(disease_display, use_container_width=True, hide_index=True)
+    
+    st.divider()
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("🚨 HIGH ALERT DISEASES")
+        alerts = data['diseases'][data['diseases']['Alert_Status'].isin(['Orange', 'Red'])]
+        if len(alerts) > 0:
+            for _, row in alerts.iterrows():
+                icon = '🔴' if row['Alert_Status'] == 'Red' else '🟠'
+                st.markdown(f"""
+                {icon} **{row['Disease_Name']}**
+                - Cases: {row['Cases_Last_30Days']} (Daily avg: {row['Daily_Average']:.2f})
+                - Severity: {row['Severity_Distribution']}
+                - Trend: {row['Trend']}
+                - Most affected: {row['Most_Affected_Age']}
+                """)
+        else:
+            st.success("✓ No high alert diseases")
+    
+    with col2:
+        st.subheader("📊 Disease Cases (30-Day)")
+        disease_chart_data = data['diseases'].nlargest(8, 'Cases_Last_30Days')
+        fig = px.bar(
+            x=disease_chart_data['Cases_Last_30Days'],
+            y=disease_chart_data['Disease_Name'],
+            orientation='h',
+            title="Top Diseases by Case Count",
+            labels={'x': 'Cases', 'y': 'Disease'}
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    st.divider()
+    
+    # Trends and alerts computed from the prescriptions themselves
+    st.subheader("🔬 Detected from Prescriptions")
+    detector = load_outbreaks()
+    detected = detector.summary()
+    if len(detected) > 0:
+        detected['Alert'] = detected['Alert_Status'].map({
+            'Green': '🟢', 'Yellow': '🟡', 'Orange': '🟠', 'Red': '🔴'
+        })
+        detected = detected[['Alert', 'Disease_Name', 'Cases_Last_30Days', 'Daily_Average', 'Trend', 'Growth_Rate', 'Peak_Date']]
+        detected.columns = ['Alert', 'Disease', 'Cases (30d)', 'Daily Avg', 'Trend', 'Growth', 'Peak']
+        st.caption(f"{detector.window_days}-day window; growth compares the last {detector.trend_days} days with the {detector.trend_days} before")
+        st.dataframe(detected, use_container_width=True, hide_index=True)
+    else:
+        st.info("No prescriptions to analyze yet")
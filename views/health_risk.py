@@ -0,0 +1,499 @@
+"""
+Health Risk Assessment page: risk scoring, assessment history and trends
+"""
+from datetime import datetime
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from opd_data import load_assessment_store
+
+
+def calculate_bmi(weight_kg, height_cm):
+    """Calculate BMI from weight and height"""
+    height_m = height_cm / 100
+    return weight_kg / (height_m ** 2)
+
+def predict_health_risks(age, weight, height, systolic_bp, diastolic_bp, cholesterol, glucose, exercise_freq, smoking, diet_quality):
+    """
+    Predict health risks based on user metrics using rule-based and simple ML logic
+    Returns: dict with risk scores (0-100) for different conditions
+    """
+    
+    # Calculate BMI
+    bmi = calculate_bmi(weight, height)
+    
+    # Initialize risk scores
+    risks = {
+        'Diabetes': 0,
+        'Heart_Disease': 0,
+        'Hypertension': 0,
+        'High_Cholesterol': 0
+    }
+    
+    # ===== DIABETES RISK =====
+    # Base risk from age
+    risks['Diabetes'] += min(age * 0.5, 30)
+    
+    # BMI factor: overweight/obese increases risk
+    if bmi >= 30:
+        risks['Diabetes'] += 35
+    elif bmi >= 25:
+        risks['Diabetes'] += 20
+    
+    # Glucose factor: fasting glucose > 100 indicates prediabetes
+    if glucose >= 126:
+        risks['Diabetes'] += 40
+    elif glucose >= 100:
+        risks['Diabetes'] += 25
+    
+    # Exercise reduces risk
+    exercise_map = {'Rarely': 0, '1x/week': 5, '2x/week': 10, '3x/week': 15, '4x/week': 20, '5x/week': 25}
+    risks['Diabetes'] -= exercise_map.get(exercise_freq, 0)
+    
+    # ===== HYPERTENSION RISK =====
+    # Blood pressure is primary factor
+    if systolic_bp >= 180 or diastolic_bp >= 120:
+        risks['Hypertension'] = 85
+    elif systolic_bp >= 160 or diastolic_bp >= 100:
+        risks['Hypertension'] = 70
+    elif systolic_bp >= 140 or diastolic_bp >= 90:
+        risks['Hypertension'] = 55
+    elif systolic_bp >= 130 or diastolic_bp >= 80:
+        risks['Hypertension'] = 35
+    else:
+        risks['Hypertension'] = 15
+    
+    # Age and BMI contribute
+    risks['Hypertension'] += min(age * 0.3, 20)
+    if bmi >= 30:
+        risks['Hypertension'] += 15
+    
+    # ===== HEART DISEASE RISK =====
+    # Multiple factors
+    risks['Heart_Disease'] += min(age * 0.6, 35)
+    
+    # Blood pressure is significant
+    if systolic_bp >= 140 or diastolic_bp >= 90:
+        risks['Heart_Disease'] += 25
+    
+    # BMI factor
+    if bmi >= 30:
+        risks['Heart_Disease'] += 20
+    elif bmi >= 25:
+        risks['Heart_Disease'] += 10
+    
+    # Cholesterol factor
+    if cholesterol >= 240:
+        risks['Heart_Disease'] += 30
+    elif cholesterol >= 200:
+        risks['Heart_Disease'] += 15
+    
+    # Smoking significantly increases risk
+    if smoking.lower() == 'yes':
+        risks['Heart_Disease'] += 40
+    elif smoking.lower() == 'former':
+        risks['Heart_Disease'] += 20
+    
+    # Exercise reduces risk
+    exercise_reduction = exercise_map.get(exercise_freq, 0)
+    risks['Heart_Disease'] -= min(exercise_reduction, 20)
+    
+    # ===== HIGH CHOLESTEROL RISK =====
+    # Direct cholesterol measurement
+    if cholesterol >= 240:
+        risks['High_Cholesterol'] = 80
+    elif cholesterol >= 200:
+        risks['High_Cholesterol'] = 55
+    elif cholesterol >= 180:
+        risks['High_Cholesterol'] = 35
+    else:
+        risks['High_Cholesterol'] = 15
+    
+    # BMI and exercise affect cholesterol
+    if bmi >= 30:
+        risks['High_Cholesterol'] += 15
+    risks['High_Cholesterol'] -= exercise_map.get(exercise_freq, 0)
+    
+    # Diet quality factor
+    diet_map = {'Poor': 15, 'Fair': 10, 'Good': 0, 'Excellent': -5}
+    risks['High_Cholesterol'] += diet_map.get(diet_quality, 0)
+    
+    # Cap all risks at 100
+    for condition in risks:
+        risks[condition] = max(0, min(100, round(risks[condition])))
+    
+    return risks
+
+def get_risk_level(risk_score):
+    """Categorize risk level"""
+    if risk_score >= 70:
+        return "🔴 HIGH"
+    elif risk_score >= 40:
+        return "🟡 MODERATE"
+    else:
+        return "🟢 LOW"
+
+def generate_recommendations(risks, age, bmi, systolic_bp, cholesterol, glucose, smoking, exercise_freq):
+    """Generate personalized recommendations based on risk scores"""
+    recommendations = {}
+    
+    if risks['Diabetes'] >= 70:
+        recommendations['Diabetes'] = "⚠️ HIGH RISK: Consult endocrinologist, monitor blood glucose daily, reduce refined carbs, increase physical activity to 30+ min/day"
+    elif risks['Diabetes'] >= 40:
+        recommendations['Diabetes'] = "🟡 MODERATE RISK: Get blood glucose test, reduce sugar intake, exercise 150 min/week, maintain healthy BMI"
+    else:
+        recommendations['Diabetes'] = "🟢 LOW RISK: Maintain current lifestyle, annual diabetes screening"
+    
+    if risks['Heart_Disease'] >= 70:
+        recommendations['Heart_Disease'] = "⚠️ HIGH RISK: Schedule cardiology consultation, monitor BP daily, reduce sodium, limit saturated fats, consider medication"
+    elif risks['Heart_Disease'] >= 40:
+        recommendations['Heart_Disease'] = "🟡 MODERATE RISK: Increase aerobic exercise, reduce red meat, manage stress, monthly BP checks"
+    else:
+        recommendations['Heart_Disease'] = "🟢 LOW RISK: Continue healthy habits, annual cardiac screening"
+    
+    if risks['Hypertension'] >= 70:
+        recommendations['Hypertension'] = "⚠️ HIGH RISK: Immediate BP monitoring, consult cardiologist, reduce salt to <2g/day, limit alcohol, daily exercise"
+    elif risks['Hypertension'] >= 40:
+        recommendations['Hypertension'] = "🟡 MODERATE RISK: Weekly BP monitoring, reduce salt, increase potassium-rich foods, reduce caffeine"
+    else:
+        recommendations['Hypertension'] = "🟢 LOW RISK: Monthly BP checks, maintain current salt intake"
+    
+    if risks['High_Cholesterol'] >= 70:
+        recommendations['High_Cholesterol'] = "⚠️ HIGH RISK: Consult lipidologist, consider statin therapy, increase fiber (oats, beans), reduce fried foods"
+    elif risks['High_Cholesterol'] >= 40:
+        recommendations['High_Cholesterol'] = "🟡 MODERATE RISK: Increase soluble fiber, reduce saturated fats, increase exercise, retest in 3 months"
+    else:
+        recommendations['High_Cholesterol'] = "🟢 LOW RISK: Maintain healthy diet, annual cholesterol screening"
+    
+    return recommendations
+
+
+def render(data):
+    """Render the page"""
+    # Medical Logo
+    st.markdown("""
+    <div style="text-align: center; margin-bottom: 20px;">
+        <svg width="100" height="100" viewBox="0 0 200 200" xmlns="http://www.w3.org/2000/svg">
+            <circle cx="100" cy="100" r="95" fill="#f0f9ff" stroke="#667eea" stroke-width="3"/>
+            <circle cx="100" cy="100" r="85" fill="none" stroke="#764ba2" stroke-width="2" opacity="0.3"/>
+            <rect x="85" y="55" width="30" height="90" fill="#667eea" rx="5"/>
+            <rect x="55" y="85" width="90" height="30" fill="#667eea" rx="5"/>
+            <g id="heartbeat" opacity="0.2">
+                <line x1="140" y1="130" x2="155" y2="130" stroke="#ff6b6b" stroke-width="2" stroke-linecap="round"/>
+                <polyline points="155,130 165,115 175,140 185,130" fill="none" stroke="#ff6b6b" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+            </g>
+            <circle cx="50" cy="100" r="3" fill="#764ba2" opacity="0.4"/>
+            <circle cx="150" cy="100" r="3" fill="#764ba2" opacity="0.4"/>
+            <circle cx="100" cy="50" r="3" fill="#764ba2" opacity="0.4"/>
+            <circle cx="100" cy="150" r="3" fill="#764ba2" opacity="0.4"/>
+        </svg>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.title("🏥 Health Risk Assessment & Analysis")
+    st.info("HealthNexus AI: Comprehensive health risk prediction and personalized recommendations")
+    
+    # Indexed assessment store; pages fetch only the rows they display
+    store = load_assessment_store()
+    total_assessments = store.count()
+    
+    # Navigation tabs
+    tab1, tab2, tab3 = st.tabs(["📝 New Assessment", "📊 Assessment History", "📈 Risk Trends"])
+    
+    # ===== TAB 1: NEW ASSESSMENT =====
+    with tab1:
+        st.markdown("""
+        <div class="input-card">
+        <h3 style="color: #667eea; margin-top: 0;">👤 Patient Information</h3>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            patient_id = st.text_input("Patient ID", "P" + str(total_assessments + 1).zfill(3))
+            age = st.number_input("Age (years)", 18, 100, 45)
+        with col2:
+            cnic = st.text_input("CNIC", "12345678901234")
+            weight = st.number_input("Weight (kg)", 30.0, 200.0, 75.0)
+        with col3:
+            doctor = st.selectbox("Assigned Doctor", data['doctors']['Doctor_Name'].values if 'doctors' in data else ["Dr. Ahmed"])
+            height = st.number_input("Height (cm)", 100.0, 220.0, 170.0)
+        
+        st.divider()
+        
+        st.markdown("""
+        <div class="input-card">
+        <h3 style="color: #667eea; margin-top: 0;">🩺 Vital Signs</h3>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            systolic = st.number_input("Systolic BP (mmHg)", 80, 220, 120)
+        with col2:
+            diastolic = st.number_input("Diastolic BP (mmHg)", 40, 140, 80)
+        with col3:
+            cholesterol = st.number_input("Cholesterol (mg/dL)", 100, 400, 200)
+        with col4:
+            glucose = st.number_input("Fasting Glucose (mg/dL)", 50, 250, 100)
+        
+        st.divider()
+        
+        st.markdown("""
+        <div class="input-card">
+        <h3 style="color: #667eea; margin-top: 0;">🏃 Lifestyle Factors</h3>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            exercise = st.selectbox("Exercise Frequency", ["Rarely", "1x/week", "2x/week", "3x/week", "4x/week", "5x/week"])
+        with col2:
+            smoking = st.selectbox("Smoking Status", ["No", "Yes", "Former"])
+        with col3:
+            diet = st.selectbox("Diet Quality", ["Poor", "Fair", "Good", "Excellent"])
+        with col4:
+            alcohol = st.selectbox("Alcohol Consumption", ["None", "Light", "Moderate", "Heavy"])
+        
+        st.divider()
+        
+        # Calculate risks
+        if st.button("🔍 Analyze Health Risks", use_container_width=True, type="primary"):
+            bmi = calculate_bmi(weight, height)
+            risks = predict_health_risks(age, weight, height, systolic, diastolic, cholesterol, glucose, exercise, smoking, diet)
+            recommendations = generate_recommendations(risks, age, bmi, systolic, cholesterol, glucose, smoking, exercise)
+            
+            # Display Risk Scores
+            st.subheader("📊 Risk Assessment Results")
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.markdown("#### Individual Risk Scores")
+                
+                for condition, score in risks.items():
+                    condition_display = condition.replace('_', ' ')
+                    risk_level = get_risk_level(score)
+                    
+                    # Determine which risk box class to use
+                    if score >= 70:
+                        box_class = "risk-box-high"
+                        icon = "🔴"
+                    elif score >= 40:
+                        box_class = "risk-box-moderate"
+                        icon = "🟡"
+                    else:
+                        box_class = "risk-box-low"
+                        icon = "🟢"
+                    
+                    st.markdown(f"""
+                    <div class="{box_class}">
+                    <strong>{icon} {condition_display}</strong><br/>
+                    Risk Score: <strong style="font-size: 20px;">{score}%</strong> | {risk_level}
+                    </div>
+                    """, unsafe_allow_html=True)
+            
+            with col2:
+                st.markdown("#### Overall Assessment")
+                avg_risk = sum(risks.values()) / len(risks)
+                overall_level = get_risk_level(avg_risk)
+                
+                st.markdown(f"""
+                <div class="assessment-result" style="text-align: center;">
+                <h2 style="color: #667eea; margin-bottom: 15px;">📊 Average Risk Score</h2>
+                <h1 style="font-size: 52px; margin: 15px 0; color: #764ba2;">{avg_risk:.1f}%</h1>
+                <h3 style="color: #667eea; font-size: 20px;">{overall_level}</h3>
+                </div>
+                """, unsafe_allow_html=True)
+            
+            st.divider()
+            
+            # Recommendations
+            st.subheader("💡 Personalized Recommendations")
+            
+            for condition, recommendation in recommendations.items():
+                condition_display = condition.replace('_', ' ')
+                st.markdown(f"""
+                <div class="recommendation-box">
+                <strong style="font-size: 16px; color: #0066ff;">💊 {condition_display}</strong><br/>
+                <span style="color: #333; font-size: 14px; line-height: 1.6;">{recommendation}</span>
+                </div>
+                """, unsafe_allow_html=True)
+            
+            st.divider()
+            
+            # Save Assessment
+            st.subheader("💾 Save Assessment")
+            
+            if st.button("Save Assessment to Database", use_container_width=True):
+                new_assessment = {
+                    'Assessment_ID': f"A{str(total_assessments + 1).zfill(3)}",
+                    'Date': datetime.now().strftime("%Y-%m-%d"),
+                    'Patient_ID': patient_id,
+                    'CNIC': cnic,
+                    'Age': age,
+                    'Weight_kg': weight,
+                    'Height_cm': height,
+                    'BMI': round(bmi, 2),
+                    'Systolic_BP': systolic,
+                    'Diastolic_BP': diastolic,
+                    'Cholesterol_mg_dL': cholesterol,
+                    'Glucose_mg_dL': glucose,
+                    'Exercise_Frequency': exercise,
+                    'Smoking_Status': smoking,
+                    'Diet_Quality': diet,
+                    'Alcohol_Consumption': alcohol,
+                    'Diabetes_Risk': risks['Diabetes'],
+                    'Heart_Disease_Risk': risks['Heart_Disease'],
+                    'Hypertension_Risk': risks['Hypertension'],
+                    'Cholesterol_Risk': risks['High_Cholesterol'],
+                    'Overall_Risk_Level': overall_level.replace('🔴', '').replace('🟡', '').replace('🟢', '').strip(),
+                    'Primary_Recommendation': list(recommendations.values())[0],
+                    'Secondary_Recommendation': list(recommendations.values())[1] if len(recommendations) > 1 else "",
+                    'Doctor_Name': doctor,
+                    'Status': 'Complete'
+                }
+                
+                store.append(new_assessment)
+                st.success("✅ Assessment saved successfully!")
+                st.balloons()
+    
+    # ===== TAB 2: ASSESSMENT HISTORY =====
+    with tab2:
+        st.markdown("""
+        <div class="info-card-light">
+        <h3 style="color: #667eea; margin-top: 0;">📋 Patient Assessment History</h3>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        if total_assessments > 0:
+            # Display options
+            col1, col2 = st.columns(2)
+            with col1:
+                display_cols = st.multiselect(
+                    "Select columns to display",
+                    ['Patient_ID', 'Date', 'Age', 'BMI', 'Diabetes_Risk', 'Heart_Disease_Risk', 'Hypertension_Risk', 'Cholesterol_Risk', 'Overall_Risk_Level', 'Doctor_Name'],
+                    default=['Patient_ID', 'Date', 'Diabetes_Risk', 'Heart_Disease_Risk', 'Hypertension_Risk', 'Overall_Risk_Level']
+                )
+            with col2:
+                risk_filter = st.selectbox("Filter by Risk Level", ["All", "🟢 LOW", "🟡 MODERATE", "🔴 HIGH"])
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                date_range = st.date_input("Date range", value=(), key="history_dates")
+            with col2:
+                doctor_filter = st.selectbox("Doctor", ["All"] + store.distinct('Doctor_Name'), key="history_doctor")
+            with col3:
+                patient_filter = st.text_input("Patient ID", key="history_patient").strip()
+            
+            # Filters run inside the store against its indexes
+            filters = {
+                'risk_level': risk_filter.split()[-1] if risk_filter != "All" else None,
+                'start_date': date_range[0] if len(date_range) > 0 else None,
+                'end_date': date_range[-1] if len(date_range) > 0 else None,
+                'doctor': doctor_filter if doctor_filter != "All" else None,
+                'patient_id': patient_filter or None,
+            }
+            matching = store.count(**filters)
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                page_size = st.selectbox("Rows per page", [25, 50, 100, 250], key="history_page_size")
+            page_count = max((matching + page_size - 1) // page_size, 1)
+            with col2:
+                page_number = st.number_input("Page", min_value=1, max_value=page_count, value=1, key="history_page")
+            
+            page_rows = store.query_page(page_number, page_size, columns=display_cols, **filters)
+            st.dataframe(page_rows, use_container_width=True, hide_index=True)
+            st.caption(f"Page {page_number} of {page_count} · {matching} matching assessments")
+            
+            # Export is only serialized when requested
+            col1, col2 = st.columns(2)
+            with col1:
+                export_format = st.radio("Export format", ["CSV", "Parquet"], horizontal=True, key="history_export_format")
+            with col2:
+                if st.button("📦 Prepare Export", use_container_width=True):
+                    try:
+                        st.session_state['history_export'] = (
+                            export_format, filters, store.export(export_format.lower(), **filters)
+                        )
+                    except ImportError:
+                        st.error("❌ Parquet export requires pyarrow")
+            
+            prepared = st.session_state.get('history_export')
+            if prepared and prepared[:2] == (export_format, filters):
+                payload = prepared[2]
+                st.download_button(
+                    label="📥 Download Assessment History",
+                    data=payload,
+                    file_name=f"health_risk_assessments.{export_format.lower()}",
+                    mime="text/csv" if export_format == "CSV" else "application/octet-stream"
+                )
+        else:
+            st.info("No assessments recorded yet. Create one in the 'New Assessment' tab.")
+    
+    # ===== TAB 3: RISK TRENDS =====
+    with tab3:
+        st.markdown("""
+        <div class="info-card-light">
+        <h3 style="color: #667eea; margin-top: 0;">📈 Risk Score Trends Over Time</h3>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        if total_assessments > 0 and 'Date' in store.columns:
+            # Search-as-you-type patient picker backed by the Patient_ID index
+            search = st.text_input("Search Patient ID", key="trend_patient_search").strip()
+            patient_list = store.search_patients(search)
+            selected_patient = st.selectbox("Select Patient for Trend Analysis", patient_list)
+            
+            patient_data = store.patient_series(selected_patient) if selected_patient else pd.DataFrame()
+            if len(patient_data) > 0:
+                patient_data['Date'] = pd.to_datetime(patient_data['Date'])
+            
+            if len(patient_data) > 0:
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    # Risk trend chart
+                    fig = go.Figure()
+                    
+                    for condition in ['Diabetes_Risk', 'Heart_Disease_Risk', 'Hypertension_Risk', 'Cholesterol_Risk']:
+                        condition_name = condition.replace('_Risk', '').replace('_', ' ')
+                        fig.add_trace(go.Scatter(
+                            x=patient_data['Date'],
+                            y=patient_data[condition],
+                            name=condition_name,
+                            mode='lines+markers'
+                        ))
+                    
+                    fig.update_layout(
+                        title=f"Risk Score Trends - {selected_patient}",
+                        xaxis_title="Date",
+                        yaxis_title="Risk Score (%)",
+                        hovermode='x unified',
+                        height=400
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+                
+                with col2:
+                    # Metrics comparison
+                    st.markdown("""
+                    <div class="info-card-light">
+                    <h4 style="color: #667eea; margin: 0;">📊 Latest Assessment Metrics</h4>
+                    </div>
+                    """, unsafe_allow_html=True)
+                    latest = patient_data.iloc[-1]
+                    
+                    metrics_cols = st.columns(4)
+                    with metrics_cols[0]:
+                        st.metric("Diabetes", f"{latest['Diabetes_Risk']:.0f}%")
+                    with metrics_cols[1]:
+                        st.metric("Heart Disease", f"{latest['Heart_Disease_Risk']:.0f}%")
+                    with metrics_cols[2]:
+                        st.metric("Hypertension", f"{latest['Hypertension_Risk']:.0f}%")
+                    with metrics_cols[3]:
+                        st.metric("Cholesterol", f"{latest['Cholesterol_Risk']:.0f}%")
+        else:
+            st.info("No trend data available. Create multiple assessments for a patient to see trends.")
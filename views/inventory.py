@@ -0,0 +1,84 @@
+"""
+Inventory page: stock status, reorder list and days-to-stockout chart
+"""
+import plotly.express as px
+import streamlit as st
+
+from opd_data import load_aggregates, load_stock_forecast
+
+
+def render(data):
+    """Render the page"""
+    aggregates = load_aggregates()
+
+    st.title("📦 Inventory Management")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    green_count = aggregates.inventory_colors['Green']
+    yellow_count = aggregates.inventory_colors['Yellow']
+    red_count = aggregates.inventory_colors['Red']
+    
+    with col1:
+        st.metric("🟢 Safe", green_count)
+    with col2:
+        st.metric("🟡 Caution", yellow_count)
+    with col3:
+        st.metric("🔴 Critical", red_count)
+    with col4:
+        st.metric("📊 Total", aggregates.total_medicines)
+    
+    st.divider()
+    
+    # Detailed Inventory Table
+    st.subheader("Detailed Inventory Status")
+    
+    inv_display = data['inventory'][['Medicine_Name', 'Current_Stock', 'Days_to_Stockout', 'Alert_Color', 'Action_Required']].copy()
+    inv_display['Status'] = inv_display['Alert_Color'].map({'Green': '🟢', 'Yellow': '🟡', 'Red': '🔴'})
+    inv_display = inv_display[['Status', 'Medicine_Name', 'Current_Stock', 'Days_to_Stockout', 'Action_Required']]
+    inv_display.columns = ['Status', 'Medicine', 'Stock', 'Days Left', 'Action']
+    
+    st.dataframe(inv_display, use_container_width=True, hide_index=True)
+    
+    st.divider()
+    
+    # Stock Predictions
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("⚠️ Medicines Needing Orders")
+        to_order = data['inventory'][data['inventory']['Alert_Color'].isin(['Yellow', 'Red'])]
+        for _, row in to_order.iterrows():
+            color_icon = "🟡" if row['Alert_Color'] == 'Yellow' else "🔴"
+            st.markdown(f"""
+            {color_icon} **{row['Medicine_Name']}**
+            - Current: {row['Current_Stock']} units
+            - Days left: {row['Days_to_Stockout']:.0f}
+            - Order: {row['Recommended_Order_Qty']} units
+            - {row['Action_Required']}
+            """)
+    
+    with col2:
+        st.subheader("📈 Stock Trend")
+        stock_data = data['inventory'][['Medicine_Name', 'Days_to_Stockout']].sort_values('Days_to_Stockout')
+        fig = px.bar(
+            x=stock_data['Days_to_Stockout'],
+            y=stock_data['Medicine_Name'],
+            orientation='h',
+            title="Days Until Stockout",
+            labels={'x': 'Days', 'y': 'Medicine'},
+            color=stock_data['Days_to_Stockout'],
+            color_continuous_scale=['red', 'yellow', 'green']
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    st.divider()
+    
+    # Forecast from actual consumption rather than the precomputed column
+    st.subheader("📉 Consumption-Based Forecast")
+    forecaster = load_stock_forecast()
+    forecast = forecaster.forecast()
+    if forecaster.as_of is not None:
+        st.caption(f"Average daily use over the {forecaster.window_days} days ending {forecaster.as_of:%Y-%m-%d}")
+    forecast.columns = ['Medicine', 'Stock', 'Daily Use', 'Days Left', 'Order Qty']
+    st.dataframe(forecast, use_container_width=True, hide_index=True)